@@ -0,0 +1,36 @@
+# Generated by Django 3.1 on 2026-10-18 16:23
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+NAME_FIELDS = ('first_name', 'last_name')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_auto_20200831_2126'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='auth_user_first_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='auth_user_last_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        *(
+            migrations.RunSQL(
+                sql=(
+                    f'CREATE INDEX auth_user_{field}_upper_like '
+                    f'ON auth_user (UPPER({field}) varchar_pattern_ops);'
+                ),
+                reverse_sql=f'DROP INDEX auth_user_{field}_upper_like;',
+            )
+            for field in NAME_FIELDS
+        ),
+    ]
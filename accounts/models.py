@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.dispatch import Signal
 
@@ -17,6 +18,18 @@ class User(AbstractUser):
     class Meta:
         db_table = "auth_user"
         ordering = ["first_name", "last_name"]
+        indexes = [
+            GinIndex(
+                fields=["first_name"],
+                name="auth_user_first_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["last_name"],
+                name="auth_user_last_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
 
 user_registrated = Signal(providing_args=["instance"])
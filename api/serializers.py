@@ -143,3 +143,18 @@ class CommentToPersonSerializer(serializers.ModelSerializer):
     class Meta:
         model = CommentToPerson
         fields = ("cinema_person", "author", "content", "created_at")
+
+
+class LatestCommentSerializer(serializers.Serializer):
+    """Serializer for getting of latest comments to movies, blu-ray movies,
+    cinema news and cinema persons.
+
+    It is connected with items of latest comments feed.
+    """
+
+    kind = serializers.CharField()
+    author = serializers.CharField()
+    content = serializers.CharField()
+    created_at = serializers.DateTimeField()
+    target = serializers.CharField()
+    url = serializers.CharField()
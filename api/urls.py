@@ -9,6 +9,7 @@ from .views import (
     comments_to_film,
     comments_to_news,
     comments_to_person,
+    latest_comments,
 )
 
 urlpatterns = [
@@ -20,4 +21,5 @@ urlpatterns = [
     path("films/<int:pk>/comments/", comments_to_film),
     path("news/<int:pk>/comments/", comments_to_news),
     path("movie-persons/<int:pk>/comments/", comments_to_person),
+    path("comments/latest/", latest_comments),
 ]
@@ -1,7 +1,9 @@
+from django.core.paginator import InvalidPage
 from rest_framework.decorators import (
     api_view,
     permission_classes,
 )
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import (
     ListAPIView,
     RetrieveAPIView,
@@ -21,6 +23,7 @@ from cinema.models import (
     Film,
     News,
 )
+from cinema.services import get_latest_comments
 
 from .serializers import (
     CinemaPersonDetailSerializer,
@@ -29,6 +32,7 @@ from .serializers import (
     CommentToPersonSerializer,
     FilmDetailSerializer,
     FilmListSerializer,
+    LatestCommentSerializer,
     NewsDetailSerializer,
     NewsListSerializer,
 )
@@ -143,3 +147,21 @@ def comments_to_person(request, pk):
         )
         serializer = CommentToPersonSerializer(comments, many=True)
         return Response(serializer.data)
+
+
+@api_view(["GET"])
+def latest_comments(request):
+    """Display latest comments to movies, blu-ray movies, cinema news and
+    cinema persons in 'JSON' and 'API' formats.
+
+    Next page of comments is selected by cursor passed in 'cursor'
+    parameter of URL.
+    """
+    try:
+        comments, next_cursor = get_latest_comments(
+            request.query_params.get("cursor")
+        )
+    except InvalidPage as error:
+        raise NotFound(str(error)) from error
+    serializer = LatestCommentSerializer(comments, many=True)
+    return Response({"next": next_cursor, "results": serializer.data})
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import (
+    ArchivedComment,
     CinemaFilmPersonProfession,
     CinemaPerson,
     CinemaProfession,
@@ -18,6 +19,7 @@ from .models import (
     News,
     Product,
 )
+from .pagination import CachedCountPaginator
 
 
 @admin.register(Country)
@@ -102,6 +104,9 @@ class FilmAdmin(admin.ModelAdmin):
     Django.
     """
 
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
     list_display = (
         "title",
         "year",
@@ -109,7 +114,7 @@ class FilmAdmin(admin.ModelAdmin):
         "budget",
         "usa_gross",
         "world_gross",
-        "imdb_rating",
+        "imdb_rating_value",
         "mpaa_rating",
         "oscar_awards",
     )
@@ -143,6 +148,9 @@ class CinemaPersonAdmin(admin.ModelAdmin):
     site Django.
     """
 
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
     list_display = ("fullname", "gender", "country", "birthday", "oscar_awards")
     list_display_links = ("fullname", "birthday")
     list_filter = ("gender", "country", "oscar_awards")
@@ -177,6 +185,9 @@ class CinemaFilmPersonProfessionAdmin(admin.ModelAdmin):
     interface of admin site Django.
     """
 
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
 
 class ProductAdmin(admin.ModelAdmin):
     """Editor of 'Product' model.
@@ -185,6 +196,9 @@ class ProductAdmin(admin.ModelAdmin):
     Django.
     """
 
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
     list_display = ("film", "price", "in_stock", "created_at")
     list_display_links = ("film", "price")
     list_filter = ("price", "in_stock")
@@ -200,6 +214,9 @@ class NewsAdmin(admin.ModelAdmin):
     Django.
     """
 
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
     list_display = ("title", "news_source", "news_author", "created_at")
     list_display_links = ("title", "news_source", "news_author")
     list_filter = ("news_source", "news_author")
@@ -221,6 +238,9 @@ class CommentToPersonAdmin(admin.ModelAdmin):
     site Django.
     """
 
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
     list_display = (
         "author",
         "content",
@@ -272,6 +292,29 @@ class CommentToProductAdmin(CommentToPersonAdmin):
     fields = ("product", "author", "content", "created_at", "is_active")
 
 
+class ArchivedCommentAdmin(admin.ModelAdmin):
+    """Editor of 'ArchivedComment' model.
+
+    Set parameters of 'ArchivedComment' model view in interface of admin
+    site Django. Archived comments are only displayed.
+    """
+
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+    list_display = ("author", "content", "created_at", "kind", "target_id")
+    list_display_links = ("author", "content")
+    list_filter = ("kind",)
+    search_fields = ("author", "content")
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(Film, FilmAdmin)
 admin.site.register(CinemaPerson, CinemaPersonAdmin)
 admin.site.register(Product, ProductAdmin)
@@ -280,3 +323,4 @@ admin.site.register(CommentToPerson, CommentToPersonAdmin)
 admin.site.register(CommentToFilm, CommentToFilmAdmin)
 admin.site.register(CommentToNews, CommentToNewsAdmin)
 admin.site.register(CommentToProduct, CommentToProductAdmin)
+admin.site.register(ArchivedComment, ArchivedCommentAdmin)
@@ -6,3 +6,8 @@ class CinemaConfig(AppConfig):
 
     name = "cinema"
     verbose_name = "World of Cinema"
+
+    def ready(self):
+        from .signals import connect_signals
+
+        connect_signals()
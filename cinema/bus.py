@@ -0,0 +1,141 @@
+import json
+import logging
+import threading
+import time
+from uuid import uuid4
+
+import redis
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from .cache import invalidate_models_cache
+
+LOGGER = logging.getLogger(__name__)
+
+INVALIDATION_BUS = getattr(settings, "CINEMA_INVALIDATION_BUS", False)
+INVALIDATION_CHANNEL = "cinema:invalidation"
+RECONNECT_DELAY = 5
+PROCESS_ID = uuid4().hex
+
+_local_caches = []
+
+
+def register_local_cache(*models):
+    """Decorator for functions, which drop data kept in memory of process.
+
+    Function is called when data of any of passed models has been
+    changed on other node.
+    """
+
+    def decorator(func):
+        _local_caches.append((frozenset(models), func))
+        return func
+
+    return decorator
+
+
+def drop_local_caches(models=None):
+    """Drop data kept in memory of process, which depends on passed models, or
+    all data if models are not passed.
+
+    If local memory cache is used, versions of models are changed too,
+    so all data cached by this process is outdated.
+    """
+    for cache_models, clear in _local_caches:
+        if models is None or cache_models & set(models):
+            clear()
+    if isinstance(caches["default"], LocMemCache):
+        if models is None:
+            caches["default"].clear()
+        else:
+            invalidate_models_cache(*models)
+
+
+def is_invalidation_bus_enabled():
+    """Check that invalidation bus is enabled in settings and cache of website
+    is kept in memory of process.
+
+    Versions of models kept in shared cache already invalidate data of
+    all nodes, so messages would only duplicate them.
+    """
+    return bool(INVALIDATION_BUS) and isinstance(caches["default"], LocMemCache)
+
+
+def get_redis_client():
+    """Get client of redis used as broker of celery."""
+    return redis.Redis.from_url(settings.CELERY_BROKER_URL)
+
+
+def publish_models_change(*models):
+    """Send message about changing data of models to all nodes."""
+    # pylint: disable=protected-access
+    message = json.dumps(
+        {
+            "sender": PROCESS_ID,
+            "models": [model._meta.label_lower for model in models],
+        }
+    )
+    try:
+        get_redis_client().publish(INVALIDATION_CHANNEL, message)
+    except redis.RedisError:
+        LOGGER.exception("Message about changing of models is not sent.")
+
+
+def publish_models_change_on_commit(*models):
+    """Send message about changing data of models to all nodes after
+    transaction is committed, if invalidation bus is enabled."""
+    if is_invalidation_bus_enabled():
+        transaction.on_commit(lambda: publish_models_change(*models))
+
+
+def handle_message(data):
+    """Drop data depending on models from message sent by other process."""
+    try:
+        message = json.loads(data)
+        models = [apps.get_model(label) for label in message["models"]]
+    except Exception:  # pylint: disable=broad-except
+        LOGGER.warning("Invalid message of invalidation bus: %r", data)
+        return
+    if message.get("sender") != PROCESS_ID:
+        drop_local_caches(models)
+
+
+def listen_models_changes():
+    """Receive messages about changing data of models sent by all nodes.
+
+    After connection is lost, messages could be missed, so all data kept
+    in memory of process is dropped after reconnecting.
+    """
+    while True:
+        try:
+            pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            drop_local_caches()
+            for message in pubsub.listen():
+                try:
+                    handle_message(message["data"])
+                except redis.RedisError:
+                    raise
+                except Exception:  # pylint: disable=broad-except
+                    LOGGER.exception("Message of invalidation bus is lost.")
+        except redis.RedisError:
+            LOGGER.exception("Connection to invalidation bus is lost.")
+            time.sleep(RECONNECT_DELAY)
+
+
+def start_invalidation_listener():
+    """Start thread receiving messages about changing data of models, if
+    invalidation bus is enabled.
+
+    Function is called by web processes only, other processes (workers
+    of celery, management commands) don't serve cached data.
+    """
+    if is_invalidation_bus_enabled():
+        threading.Thread(
+            target=listen_models_changes,
+            name="cinema-invalidation-bus",
+            daemon=True,
+        ).start()
@@ -0,0 +1,115 @@
+from functools import wraps
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_TIMEOUT = getattr(settings, "CINEMA_CACHE_TIMEOUT", 60 * 60)
+
+
+def get_version_key(model, pk=None):
+    """Get cache key, which keeps current version of data of model, or of data
+    of single record of model, if its primary key is passed."""
+    # pylint: disable=protected-access
+    key = f"cinema:version:{model._meta.label_lower}"
+    return key if pk is None else f"{key}:{pk}"
+
+
+def get_models_version(models, records=()):
+    """Get current version of cached data, which depends on data of models and
+    of records passed as pairs of model and primary key.
+
+    Version of model appears at first request and changes every time,
+    when record of model is created, changed or deleted. Version of
+    record changes only when its data is invalidated explicitly.
+    """
+    keys = [get_version_key(model) for model in models]
+    keys.extend(get_version_key(model, pk) for model, pk in records)
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = uuid4().hex
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return ".".join(versions[key] for key in keys)
+
+
+def invalidate_models_cache(*models):
+    """Change versions of models, so all cached data depending on them becomes
+    outdated."""
+    cache.set_many(
+        {get_version_key(model): uuid4().hex for model in models}, None
+    )
+
+
+def invalidate_models_cache_on_commit(*models):
+    """Change versions of models now and after transaction is committed.
+
+    Data cached by other requests before commit is built from old
+    records, so it is outdated by second change of versions.
+    """
+    invalidate_models_cache(*models)
+    transaction.on_commit(lambda: invalidate_models_cache(*models))
+
+
+def invalidate_records_cache(model, *pks):
+    """Change versions of records of model, so cached data depending on them
+    becomes outdated, while data depending on other records is kept."""
+    cache.set_many(
+        {get_version_key(model, pk): uuid4().hex for pk in pks}, None
+    )
+
+
+def invalidate_records_cache_on_commit(model, *pks):
+    """Change versions of records of model now and after transaction is
+    committed."""
+    invalidate_records_cache(model, *pks)
+    transaction.on_commit(lambda: invalidate_records_cache(model, *pks))
+
+
+def get_cache_key(name, args, models, records=()):
+    """Get cache key of data returned by function with passed arguments.
+
+    Versions of models and records are hashed, so length of key doesn't
+    depend on number of models.
+    """
+    args_hash = md5(repr(args).encode()).hexdigest()
+    version_hash = md5(get_models_version(models, records).encode()).hexdigest()
+    return f"cinema:{name}:{args_hash}:{version_hash}"
+
+
+def cached_data(*models, records=None):
+    """Decorator for functions, which build data from records of models.
+
+    Result of function is kept in cache under key containing versions of
+    models, so it is computed again only after data of any of these
+    models has been changed. Result must be pickleable.
+
+    Data, which depends on few records only, is bound to versions of
+    records returned by 'records' function called with arguments of
+    decorated function.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = get_cache_key(
+                name,
+                (args, sorted(kwargs.items())),
+                models,
+                records(*args, **kwargs) if records else (),
+            )
+            data = cache.get(key)
+            if data is None:
+                data = func(*args, **kwargs)
+                cache.set(key, data, CACHE_TIMEOUT)
+            return data
+
+        return wrapper
+
+    return decorator
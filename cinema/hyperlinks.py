@@ -0,0 +1,133 @@
+import re
+from functools import lru_cache
+
+from django.urls import reverse
+
+from accounts.models import User
+
+from .bus import register_local_cache
+from .cache import get_models_version
+from .models import (
+    CinemaPerson,
+    Film,
+)
+
+
+def get_trie_pattern(words):
+    """Get regular expression pattern matching any of passed words.
+
+    Words are kept in prefix tree, so common prefixes of words are
+    compared with text only once and longer words are preferred over
+    their prefixes.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _get_node_pattern(trie) or "(?!)"
+
+
+def _get_node_pattern(node):
+    """Get regular expression pattern of prefix tree node."""
+    branches = [
+        re.escape(char) + _get_node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1:
+        pattern = branches[0]
+    else:
+        pattern = f"(?:{'|'.join(branches)})"
+    if "" in node:
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+
+def build_hyperlinks_matcher():
+    """Build compiled pattern and hyperlinks for names of all cinema persons
+    and titles of all movies.
+
+    Names of cinema persons are matched case-insensitively, titles of
+    movies are matched exactly. Name of cinema person consists of not
+    blank parts, persons without name are skipped.
+    """
+    persons_links = {}
+    for person in CinemaPerson.persons.get_brief_data():
+        person_name = " ".join(
+            filter(None, (person.user__first_name, person.user__last_name))
+        )
+        if not person_name:
+            continue
+        url_path = reverse(
+            "cinema:movie-person-detail", kwargs={"pk": person.pk}
+        )
+        persons_links.setdefault(
+            person_name.lower(), f"<a href='{url_path}'>{person_name}</a>"
+        )
+    films_links = {}
+    for film in Film.films.get_brief_data():
+        url_path = reverse("cinema:film-detail", args=(film.pk,))
+        films_links.setdefault(
+            film.title, f"<a href='{url_path}'>{film.title}</a>"
+        )
+    pattern = re.compile(
+        rf"(?<!\w)(?:(?P<film>{get_trie_pattern(films_links)})"
+        rf"|(?P<person>(?i:{get_trie_pattern(persons_links)})))(?!\w)"
+    )
+    return pattern, persons_links, films_links
+
+
+@lru_cache(maxsize=1)
+def _get_versioned_matcher(version):
+    """Get matcher built for version of data of cinema persons and movies.
+
+    Only matcher of last version is kept in memory of process.
+    """
+    return build_hyperlinks_matcher()
+
+
+@register_local_cache(CinemaPerson, User, Film)
+def clear_hyperlinks_matcher():
+    """Drop matcher kept in memory of process."""
+    _get_versioned_matcher.cache_clear()
+
+
+def get_hyperlinks_matcher():
+    """Get matcher of names of cinema persons and titles of movies.
+
+    Matcher is kept in memory of process and built again only after data
+    of cinema persons or movies has been changed.
+    """
+    return _get_versioned_matcher(
+        get_models_version((CinemaPerson, User, Film))
+    )
+
+
+def get_text_hyperlinks(text, matcher=None):
+    """Replace names of cinema persons and titles of movies in text with
+    hyperlinks to their pages by single pass over text.
+
+    If matcher is not passed, matcher kept in memory of process is used.
+    """
+    pattern, persons_links, films_links = matcher or get_hyperlinks_matcher()
+
+    def get_hyperlink(match):
+        if match.group("film") is not None:
+            return films_links[match.group("film")]
+        return persons_links[match.group("person").lower()]
+
+    return pattern.sub(get_hyperlink, text)
+
+
+def get_texts_hyperlinks(texts, matcher=None):
+    """Replace names of cinema persons and titles of movies with hyperlinks in
+    all passed texts, e.g. texts displayed on current page.
+
+    Matcher is fetched once and shared by all texts.
+    """
+    matcher = matcher or get_hyperlinks_matcher()
+    return [get_text_hyperlinks(text, matcher) for text in texts]
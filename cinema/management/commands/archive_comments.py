@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from cinema.services import (
+    COMMENTS_ARCHIVE_BATCH_SIZE,
+    COMMENTS_ARCHIVE_DAYS,
+    archive_comments,
+)
+from cinema.tasks import archive_old_comments
+
+
+class Command(BaseCommand):
+    """Move old inactive comments to movies, blu-ray movies, news and cinema
+    persons to archive.
+
+    Command is launched periodically (e.g. by cron), so tables of
+    comments models keep only comments, which are displayed or recently
+    hidden.
+    """
+
+    help = "Move old inactive comments to archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=COMMENTS_ARCHIVE_DAYS,
+            help="Age of archived comments in days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=COMMENTS_ARCHIVE_BATCH_SIZE,
+            help="Number of comments moved by single query.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Move comments by celery task with default options.",
+        )
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            archive_old_comments.delay()
+            self.stdout.write(self.style.SUCCESS("Archiving queued."))
+            return
+        archived = archive_comments(options["days"], options["batch_size"])
+        for model_name, number in archived.items():
+            self.stdout.write(f"{model_name}: {number}")
+        self.stdout.write(self.style.SUCCESS("Comments archived."))
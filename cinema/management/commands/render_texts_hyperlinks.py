@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from cinema.services import update_texts_hyperlinks
+
+
+class Command(BaseCommand):
+    """Render hyperlinks in texts of all movies, cinema persons and news.
+
+    Texts of existing records are rendered by migration adding fields
+    keeping them, command renders them again on demand.
+    """
+
+    help = "Render hyperlinks in texts of all movies, cinema persons and news."
+
+    def handle(self, *args, **options):
+        update_texts_hyperlinks()
+        self.stdout.write(self.style.SUCCESS("Texts hyperlinks rendered."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from cinema.services import recount_comments
+
+
+class Command(BaseCommand):
+    """Count again active comments of all movies, blu-ray movies, news and
+    cinema persons.
+
+    Command is used to fill numbers of comments of records, which were
+    saved before adding of fields keeping them, and to repair numbers
+    changed by bulk updates of comments, which do not send signals.
+    """
+
+    help = "Count again active comments of movies, blu-ray movies, news and persons."
+
+    def handle(self, *args, **options):
+        recount_comments()
+        self.stdout.write(self.style.SUCCESS("Comments counted."))
@@ -0,0 +1,54 @@
+# Generated by Django 3.1 on 2026-10-18 16:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+RANKING_FIELDS = {
+    'imdb_rating': 'imdb_rating__value',
+    'budget': 'budget',
+    'usa_gross': 'usa_gross',
+    'world_gross': 'world_gross',
+}
+
+
+def create_films_rankings(apps, schema_editor):
+    Film = apps.get_model('cinema', 'Film')
+    FilmRanking = apps.get_model('cinema', 'FilmRanking')
+    for criterion, field in RANKING_FIELDS.items():
+        films_pk = Film.objects.order_by(
+            models.F(field).desc(nulls_last=True), '-pk'
+        ).values_list('pk', flat=True)
+        FilmRanking.objects.bulk_create(
+            FilmRanking(criterion=criterion, position=position, film_id=pk)
+            for position, pk in enumerate(films_pk, start=1)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0003_auto_20200831_2152'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilmRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criterion', models.CharField(choices=[('imdb_rating', 'IMDb Rating'), ('budget', 'Budget'), ('usa_gross', 'USA Gross'), ('world_gross', 'World Gross')], max_length=16)),
+                ('position', models.PositiveIntegerField()),
+                ('film', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='cinema.Film')),
+            ],
+            options={
+                'ordering': ['criterion', 'position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='filmranking',
+            constraint=models.UniqueConstraint(fields=('criterion', 'position'), name='unique_film_ranking_position'),
+        ),
+        migrations.RunPython(
+            create_films_rankings, migrations.RunPython.noop
+        ),
+    ]
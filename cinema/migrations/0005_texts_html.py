@@ -0,0 +1,109 @@
+# Generated by Django 3.1 on 2026-10-18 16:17
+
+import re
+
+from django.db import migrations, models
+
+HYPERLINKED_FIELDS = (
+    ('Film', 'description'),
+    ('CinemaPerson', 'bio'),
+    ('News', 'description'),
+)
+
+
+# Frozen copy of matcher of 'cinema.hyperlinks' module, so later changes of
+# application code don't change texts rendered by this migration.
+def get_trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return get_node_pattern(trie) or '(?!)'
+
+
+def get_node_pattern(node):
+    branches = [
+        re.escape(char) + get_node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1:
+        pattern = branches[0]
+    else:
+        pattern = f"(?:{'|'.join(branches)})"
+    if '' in node:
+        pattern = f'(?:{pattern})?'
+    return pattern
+
+
+def build_hyperlinks_matcher(apps):
+    CinemaPerson = apps.get_model('cinema', 'CinemaPerson')
+    Film = apps.get_model('cinema', 'Film')
+    persons_links = {}
+    persons = CinemaPerson.objects.order_by('pk').values_list(
+        'pk', 'user__first_name', 'user__last_name'
+    )
+    for pk, first_name, last_name in persons:
+        person_name = ' '.join(filter(None, (first_name, last_name)))
+        if person_name:
+            persons_links.setdefault(
+                person_name.lower(),
+                f"<a href='/movie-persons/{pk}/'>{person_name}</a>",
+            )
+    films_links = {}
+    for pk, title in Film.objects.order_by('pk').values_list('pk', 'title'):
+        films_links.setdefault(title, f"<a href='/films/{pk}/'>{title}</a>")
+    pattern = re.compile(
+        rf'(?<!\w)(?:(?P<film>{get_trie_pattern(films_links)})'
+        rf'|(?P<person>(?i:{get_trie_pattern(persons_links)})))(?!\w)'
+    )
+
+    def get_hyperlink(match):
+        if match.group('film') is not None:
+            return films_links[match.group('film')]
+        return persons_links[match.group('person').lower()]
+
+    return lambda text: pattern.sub(get_hyperlink, text)
+
+
+def render_texts_hyperlinks(apps, schema_editor):
+    render_hyperlinks = build_hyperlinks_matcher(apps)
+    for model_name, field_name in HYPERLINKED_FIELDS:
+        model = apps.get_model('cinema', model_name)
+        texts = model.objects.values_list('pk', field_name)
+        for pk, text in texts.iterator():
+            model.objects.filter(pk=pk).update(
+                **{f'{field_name}_html': render_hyperlinks(text)}
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0004_film_ranking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cinemaperson',
+            name='bio_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='description_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='description_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(
+            render_texts_hyperlinks, migrations.RunPython.noop
+        ),
+    ]
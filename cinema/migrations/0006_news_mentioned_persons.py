@@ -0,0 +1,39 @@
+# Generated by Django 3.1 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+def create_news_mentions(apps, schema_editor):
+    CinemaPerson = apps.get_model('cinema', 'CinemaPerson')
+    News = apps.get_model('cinema', 'News')
+    NewsMentionedPersons = News.mentioned_persons.through
+    persons = CinemaPerson.objects.exclude(
+        user__first_name='', user__last_name=''
+    ).values_list('pk', 'user__first_name', 'user__last_name')
+    for pk, first_name, last_name in persons:
+        fullname = ' '.join(filter(None, (first_name, last_name)))
+        news_pk = News.objects.filter(
+            title__contains=fullname
+        ).values_list('pk', flat=True)
+        NewsMentionedPersons.objects.bulk_create(
+            NewsMentionedPersons(news_id=news_id, cinemaperson_id=pk)
+            for news_id in news_pk
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0005_texts_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='mentioned_persons',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='mentioned_news', to='cinema.CinemaPerson'),
+        ),
+        migrations.RunPython(
+            create_news_mentions, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.1 on 2026-10-18 16:23
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def update_search_vectors(apps, schema_editor):
+    search_vector = SearchVector(
+        'title', config='english', weight='A'
+    ) + SearchVector('description', config='english', weight='B')
+    for model_name in ('Film', 'News'):
+        model = apps.get_model('cinema', model_name)
+        model.objects.update(search_vector=search_vector)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0006_news_mentioned_persons'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='cinema_film_search__43eb2e_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='cinema_news_search__8dbf5e_gin'),
+        ),
+        migrations.RunPython(
+            update_search_vectors, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.1 on 2026-10-18 18:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_imdb_rating_values(apps, schema_editor):
+    Film = apps.get_model('cinema', 'Film')
+    ImdbRating = apps.get_model('cinema', 'ImdbRating')
+    Film.objects.update(
+        imdb_rating_value=Subquery(
+            ImdbRating.objects.filter(pk=OuterRef('imdb_rating')).values(
+                'value'
+            )
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0007_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='imdb_rating_value',
+            field=models.DecimalField(
+                decimal_places=1, editable=False, max_digits=2, null=True
+            ),
+        ),
+        migrations.RunPython(
+            copy_imdb_rating_values, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='film',
+            name='imdb_rating_value',
+            field=models.DecimalField(
+                db_index=True, decimal_places=1, editable=False, max_digits=2
+            ),
+        ),
+    ]
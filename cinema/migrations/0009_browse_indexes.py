@@ -0,0 +1,29 @@
+# Generated by Django 3.1 on 2026-10-18 18:35
+
+from django.db import migrations, models
+
+FILM_RELATIONS = ('country', 'genre', 'language', 'distributor')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0008_film_imdb_rating_value'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['release_data', '-imdb_rating_value'], name='cinema_film_release_rating_idx'),
+        ),
+        *(
+            migrations.RunSQL(
+                sql=(
+                    f'CREATE INDEX cinema_film_{relation}_browse_idx '
+                    f'ON cinema_film_{relation} ({relation}_id, film_id);'
+                ),
+                reverse_sql=f'DROP INDEX cinema_film_{relation}_browse_idx;',
+            )
+            for relation in FILM_RELATIONS
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.1 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0009_browse_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commenttofilm',
+            index=models.Index(fields=['film', 'is_active', '-created_at'], name='cinema_cmt_film_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commenttonews',
+            index=models.Index(fields=['news', 'is_active', '-created_at'], name='cinema_cmt_news_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commenttoperson',
+            index=models.Index(fields=['cinema_person', 'is_active', '-created_at'], name='cinema_cmt_person_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commenttoproduct',
+            index=models.Index(fields=['product', 'is_active', '-created_at'], name='cinema_cmt_product_active_idx'),
+        ),
+    ]
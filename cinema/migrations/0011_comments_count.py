@@ -0,0 +1,63 @@
+# Generated by Django 3.1 on 2026-10-18 19:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+COMMENTS_TARGETS = (
+    ('CommentToPerson', 'CinemaPerson', 'cinema_person'),
+    ('CommentToFilm', 'Film', 'film'),
+    ('CommentToNews', 'News', 'news'),
+    ('CommentToProduct', 'Product', 'product'),
+)
+
+
+def count_comments(apps, schema_editor):
+    for comment_name, target_name, field_name in COMMENTS_TARGETS:
+        comment_model = apps.get_model('cinema', comment_name)
+        target_model = apps.get_model('cinema', target_name)
+        target_model.objects.update(
+            comments_count=Coalesce(
+                Subquery(
+                    comment_model.objects.filter(
+                        **{field_name: OuterRef('pk')}, is_active=True
+                    )
+                    .order_by()
+                    .values(field_name)
+                    .annotate(count=Count('pk'))
+                    .values('count')
+                ),
+                0,
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0010_comments_active_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cinemaperson',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
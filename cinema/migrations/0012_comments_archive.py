@@ -0,0 +1,55 @@
+# Generated by Django 3.1 on 2026-10-18 20:15
+
+from django.db import migrations, models
+
+COMMENTS_TABLES = (
+    ('person', 'cinema_commenttoperson'),
+    ('film', 'cinema_commenttofilm'),
+    ('news', 'cinema_commenttonews'),
+    ('product', 'cinema_commenttoproduct'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0011_comments_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('cinema_person', 'Person'), ('film', 'Film'), ('news', 'News'), ('product', 'Product')], max_length=16)),
+                ('comment_id', models.PositiveIntegerField()),
+                ('target_id', models.PositiveIntegerField()),
+                ('author', models.CharField(max_length=32)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Archived comments',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['kind', 'target_id', '-created_at'], name='cinema_cmt_archive_target_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivedcomment',
+            constraint=models.UniqueConstraint(fields=('kind', 'comment_id'), name='unique_archived_comment'),
+        ),
+        *(
+            migrations.RunSQL(
+                sql=(
+                    f'CREATE INDEX cinema_cmt_{kind}_inactive_idx '
+                    f'ON {table} (created_at) WHERE NOT is_active;'
+                ),
+                reverse_sql=f'DROP INDEX cinema_cmt_{kind}_inactive_idx;',
+            )
+            for kind, table in COMMENTS_TABLES
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.1 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0012_comments_archive"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="film",
+            index=models.Index(
+                fields=["title", "id"], name="cinema_film_title_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="film",
+            index=models.Index(
+                fields=["imdb_rating_value", "id"],
+                name="cinema_film_rating_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="film",
+            index=models.Index(
+                fields=["release_data", "id"], name="cinema_film_release_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="film",
+            index=models.Index(
+                fields=["usa_gross", "id"], name="cinema_film_usa_gross_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="film",
+            index=models.Index(
+                fields=["world_gross", "id"],
+                name="cinema_film_world_gross_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="news",
+            index=models.Index(
+                fields=["created_at", "id"], name="cinema_news_created_id_idx"
+            ),
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX cinema_film_budget_id_idx "
+                "ON cinema_film (budget DESC NULLS LAST, id DESC);"
+            ),
+            reverse_sql="DROP INDEX cinema_film_budget_id_idx;",
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1 on 2026-10-18 19:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0013_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='film',
+            name='cinema_film_release_rating_idx',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.1 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0014_remove_film_release_rating_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='filmranking',
+            name='unique_film_ranking_position',
+        ),
+        migrations.AddConstraint(
+            model_name='filmranking',
+            constraint=models.UniqueConstraint(deferrable=models.Deferrable['IMMEDIATE'], fields=('criterion', 'position'), name='unique_film_ranking_position'),
+        ),
+    ]
@@ -1,24 +1,87 @@
+import re
 from datetime import (
     date,
     timedelta,
 )
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramSimilarity,
+)
 from django.core.validators import (
     MinValueValidator,
     RegexValidator,
 )
 from django.db import models
-from django.db.models import Q
-from django.db.models.signals import post_save
+from django.db.models import (
+    Exists,
+    F,
+    OuterRef,
+    Q,
+    Value,
+)
+from django.db.models.functions import (
+    Concat,
+    StrIndex,
+    Trim,
+)
 
 from accounts.models import User
 
-from .tasks import send_new_product_notification
-
 GENDER_CHOICES = (
     ("M", "Male"),
     ("F", "Female"),
 )
+RANKING_CRITERION_CHOICES = (
+    ("imdb_rating", "IMDb Rating"),
+    ("budget", "Budget"),
+    ("usa_gross", "USA Gross"),
+    ("world_gross", "World Gross"),
+)
+RANKING_FIELDS = {
+    "imdb_rating": "imdb_rating_value",
+    "budget": "budget",
+    "usa_gross": "usa_gross",
+    "world_gross": "world_gross",
+}
+SEARCH_CONFIG = "english"
+
+
+def get_search_query(search_words):
+    """Get full text search query, which matches words starting with every word
+    entered by visitor.
+
+    Return None, if there are no words in search string.
+    """
+    words = re.findall(r"\w+", search_words)
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        config=SEARCH_CONFIG,
+        search_type="raw",
+    )
+
+
+def get_search_vector(*weighted_texts):
+    """Get search vector of texts of record with their weights."""
+    search_vector = None
+    for text, weight in weighted_texts:
+        text_vector = SearchVector(
+            Value(text, output_field=models.TextField()),
+            config=SEARCH_CONFIG,
+            weight=weight,
+        )
+        search_vector = (
+            text_vector
+            if search_vector is None
+            else search_vector + text_vector
+        )
+    return search_vector
 
 
 def upload_to_film(instance, filename):
@@ -67,6 +130,30 @@ class DateMixin(models.Model):
         abstract = True
 
 
+class CommentsCountMixin(models.Model):
+    """Mixin model, what extends commented models: Film, News, Product..."""
+
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, update_fields=None, **kwargs):
+        """Save record without number of comments, unless it is specified in
+        'update_fields', since number is changed by F() expressions."""
+        if update_fields is None and not (
+            self._state.adding or self.pk is None or kwargs.get("force_insert")
+        ):
+            deferred_fields = self.get_deferred_fields()
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not (field.primary_key or field.attname in deferred_fields)
+                and field.name != "comments_count"
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
 class Country(models.Model):
     """Save country data needed for 'Film' and 'CinemaPerson' models."""
 
@@ -187,17 +274,51 @@ class CinemaPersonManager(models.Manager):
 
     def filter_by_search_word(self, search_words):
         """Return QuerySet object, value of selected field corresponds to
-        search word entered by visitor."""
-        separate_search_words = search_words.split()
-        q = (
-            (
-                Q(user__first_name__istartswith=separate_search_words[0])
-                & Q(user__last_name__iendswith=separate_search_words[-1])
+        search word entered by visitor.
+
+        First and last names are compared with every entered word by
+        trigram similarity, so names with typos are found too, and by
+        prefix, so short beginnings of names are found. Both comparisons
+        are served by indexes of names. Cinema persons are ordered by
+        similarity of full name to search words.
+        """
+        q = Q()
+        for search_word in search_words.split():
+            q |= (
+                Q(user__first_name__trigram_similar=search_word)
+                | Q(user__last_name__trigram_similar=search_word)
+                | Q(user__first_name__istartswith=search_word)
+                | Q(user__last_name__istartswith=search_word)
             )
-            | Q(user__first_name__icontains=search_words)
-            | Q(user__last_name__icontains=search_words)
+        if not q:
+            return self.none()
+        return (
+            self.all()
+            .filter(q)
+            .annotate(
+                rank=TrigramSimilarity(
+                    Concat("user__first_name", Value(" "), "user__last_name"),
+                    search_words,
+                )
+            )
+            .order_by("-rank", "pk")
+        )
+
+    def filter_mentioned_in(self, text):
+        """Return QuerySet object with cinema persons, which full names are
+        mentioned in text.
+
+        Full name consists of not blank names, so single name of cinema
+        person is matched too, persons without names are skipped.
+        """
+        fullname = Concat("user__first_name", Value(" "), "user__last_name")
+        return (
+            super()
+            .get_queryset()
+            .exclude(user__first_name="", user__last_name="")
+            .annotate(fullname_position=StrIndex(Value(text), Trim(fullname)))
+            .filter(fullname_position__gt=0)
         )
-        return self.all().filter(q)
 
     def get_related_data(self, fields_names):
         """Return QuerySet object with data of specified fields of
@@ -209,7 +330,7 @@ class CinemaPersonManager(models.Manager):
         )
 
 
-class CinemaPerson(ExtendedProfileMixin):
+class CinemaPerson(ExtendedProfileMixin, CommentsCountMixin):
     """Save data about actors, directors, writers needed for 'Film' model.
 
     Model related with next models:
@@ -217,11 +338,13 @@ class CinemaPerson(ExtendedProfileMixin):
     - Film, News (many-to-many relationship);
     - CommentToPerson (many-to-one relationship).
 
-    Class of this model inherits from 'ExtendedProfileMixin' class.
+    Class of this model inherits from 'ExtendedProfileMixin' and
+    'CommentsCountMixin' classes.
     """
 
     user = models.OneToOneField(User, on_delete=models.PROTECT)
     bio = models.TextField()
+    bio_html = models.TextField(blank=True, default="", editable=False)
     oscar_awards = models.PositiveSmallIntegerField(default=0)
     avatar = models.ImageField(
         upload_to=upload_to_cinema_person, blank=True, null=True
@@ -257,11 +380,7 @@ class FilmManager(models.Manager):
 
     def all(self):
         """Return QuerySet object with cached data of some related models."""
-        return (
-            super()
-            .get_queryset()
-            .select_related("imdb_rating", "mpaa_rating", "product")
-        )
+        return super().get_queryset().select_related("mpaa_rating", "product")
 
     def get_brief_data(self):
         """Return QuerySet object with data of specified fields of 'Film'
@@ -274,43 +393,46 @@ class FilmManager(models.Manager):
         return (
             self.all()
             .filter(release_data__year=selected_year)
-            .order_by("-imdb_rating__value")
+            .order_by("-imdb_rating_value")
         )
 
-    def filter_by_selected_genre(self, selected_genre):
-        """Return QuerySet object filtered by selected genre and order by imdb
-        rating of movies."""
+    def filter_by_selected_genre(self, genre_pk):
+        """Return QuerySet object filtered by primary key of selected genre and
+        order by imdb rating of movies, empty for unknown genre."""
+        if genre_pk is None:
+            return self.none()
+        return self.all().filter(genre=genre_pk).order_by("-imdb_rating_value")
+
+    def filter_by_selected_country(self, country_pk):
+        """Return QuerySet object filtered by primary key of selected country
+        and order by imdb rating of movies, empty for unknown country."""
+        if country_pk is None:
+            return self.none()
         return (
-            self.all()
-            .filter(genre__name=selected_genre)
-            .order_by("-imdb_rating__value")
+            self.all().filter(country=country_pk).order_by("-imdb_rating_value")
         )
 
-    def filter_by_selected_country(self, selected_country):
-        """Return QuerySet object filtered by selected country and order by
-        imdb rating of movies."""
+    def filter_by_selected_language(self, language_pk):
+        """Return QuerySet object filtered by primary key of selected language
+        and order by imdb rating of movies, empty for unknown language."""
+        if language_pk is None:
+            return self.none()
         return (
             self.all()
-            .filter(country__name=selected_country)
-            .order_by("-imdb_rating__value")
+            .filter(language=language_pk)
+            .order_by("-imdb_rating_value")
         )
 
-    def filter_by_selected_language(self, selected_language):
-        """Return QuerySet object filtered by selected language and order by
-        imdb rating of movies."""
-        return (
-            self.all()
-            .filter(language__name=selected_language)
-            .order_by("-imdb_rating__value")
-        )
-
-    def filter_by_selected_distributor(self, selected_distributor):
-        """Return QuerySet object filtered by selected distributor and order by
-        imdb rating of movies."""
+    def filter_by_selected_distributor(self, distributor_pk):
+        """Return QuerySet object filtered by primary key of selected
+        distributor and order by imdb rating of movies, empty for unknown
+        distributor."""
+        if distributor_pk is None:
+            return self.none()
         return (
             self.all()
-            .filter(distributor__name=selected_distributor)
-            .order_by("-imdb_rating__value")
+            .filter(distributor=distributor_pk)
+            .order_by("-imdb_rating_value")
         )
 
     def filter_by_selected_mpaa_rating(self, selected_mpaa_rating):
@@ -319,25 +441,55 @@ class FilmManager(models.Manager):
         return (
             self.all()
             .filter(mpaa_rating__pk=selected_mpaa_rating)
-            .order_by("-imdb_rating__value")
+            .order_by("-imdb_rating_value")
         )
 
     def filter_by_search_word(self, search_word):
         """Return QuerySet object, value of selected field corresponds to
-        search word entered by visitor."""
-        return self.all().filter(title__icontains=search_word)
+        search word entered by visitor.
+
+        Movies are found by full text search in title and description
+        and ordered by rank of search.
+        """
+        search_query = get_search_query(search_word)
+        if search_query is None:
+            return self.none()
+        return (
+            self.all()
+            .filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "title")
+        )
 
-    def get_related_data(self, fields_names):
-        """Return QuerySet object with data of specified fields of 'Film' model
-        and some related models."""
+    def get_related_values(self, films_pk, *fields_names):
+        """Return QuerySet object with data of specified fields of one related
+        model of selected movies.
+
+        Each row contains primary key of movie and values of related
+        record, so number of rows equals to number of related records.
+        """
+        return (
+            super()
+            .get_queryset()
+            .filter(pk__in=films_pk)
+            .values_list("pk", *fields_names, named=True)
+        )
+
+    def order_by_ranking(self, criterion):
+        """Return QuerySet object ordered by positions of movies in ranking by
+        selected criterion.
+
+        Positions are kept in 'FilmRanking' model, so movies are not
+        sorted by value of criterion on every request.
+        """
         return (
             self.all()
-            .values_list("pk", *fields_names, "news__title", named=True)
-            .order_by("-news__created_at")
+            .filter(rankings__criterion=criterion)
+            .order_by("rankings__position")
         )
 
 
-class Film(models.Model):
+class Film(CommentsCountMixin):
     """The most main model storing film data.
 
     Model related with next models:
@@ -358,15 +510,20 @@ class Film(models.Model):
     world_gross = models.PositiveIntegerField(default=0)
     run_time = models.DurationField()
     description = models.TextField()
+    description_html = models.TextField(blank=True, default="", editable=False)
     release_data = models.DateField()
     language = models.ManyToManyField(Language)
     distributor = models.ManyToManyField(Distributor)
     imdb_rating = models.ForeignKey(ImdbRating, on_delete=models.PROTECT)
+    imdb_rating_value = models.DecimalField(
+        max_digits=2, decimal_places=1, editable=False, db_index=True
+    )
     mpaa_rating = models.ForeignKey(
         MpaaRating, on_delete=models.PROTECT, default=1
     )
     oscar_awards = models.PositiveSmallIntegerField(default=0)
     poster = models.ImageField(upload_to=upload_to_film, blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = models.Manager()
     films = FilmManager()
@@ -381,6 +538,57 @@ class Film(models.Model):
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            models.Index(
+                fields=["title", "id"], name="cinema_film_title_id_idx"
+            ),
+            models.Index(
+                fields=["imdb_rating_value", "id"],
+                name="cinema_film_rating_id_idx",
+            ),
+            models.Index(
+                fields=["release_data", "id"], name="cinema_film_release_id_idx"
+            ),
+            models.Index(
+                fields=["usa_gross", "id"], name="cinema_film_usa_gross_id_idx"
+            ),
+            models.Index(
+                fields=["world_gross", "id"],
+                name="cinema_film_world_gross_id_idx",
+            ),
+        ]
+
+
+class FilmRanking(models.Model):
+    """Save position of movie in ranking by selected criterion.
+
+    Positions are precomputed after changing data of movies, so pages
+    with movies ordered by criterion read range of positions from index
+    instead of sorting all movies. Uniqueness of positions is checked
+    after every statement, so positions are shifted by single update.
+    """
+
+    criterion = models.CharField(
+        max_length=16, choices=RANKING_CRITERION_CHOICES
+    )
+    position = models.PositiveIntegerField()
+    film = models.ForeignKey(
+        Film, on_delete=models.CASCADE, related_name="rankings"
+    )
+
+    def __str__(self):
+        return f"{self.criterion} #{self.position}: {self.film_id}"
+
+    class Meta:
+        ordering = ["criterion", "position"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["criterion", "position"],
+                name="unique_film_ranking_position",
+                deferrable=models.Deferrable.IMMEDIATE,
+            )
+        ]
 
 
 class CinemaProfession(models.Model):
@@ -403,12 +611,17 @@ class CinemaFilmPersonProfessionManager(models.Manager):
     'CinemaFilmPersonProfession' model.
     """
 
-    def get_full_cast(self):
-        """Return QuerySet object with cached data of some related models."""
+    def get_full_cast(self, films_pk=None):
+        """Return QuerySet object with cached data of some related models.
+
+        If primary keys of movies are passed, QuerySet object contains
+        cast and crew of these movies only.
+        """
+        queryset = super().get_queryset()
+        if films_pk is not None:
+            queryset = queryset.filter(film__pk__in=films_pk)
         return (
-            super()
-            .get_queryset()
-            .select_related("film", "cinema_person__user", "profession")
+            queryset.select_related("film", "cinema_person__user", "profession")
             .values_list(
                 "film__pk",
                 "profession__name",
@@ -465,38 +678,80 @@ class NewsManager(models.Manager):
         model."""
         return super().get_queryset().values_list("pk", "title", named=True)
 
-    def get_news_about_celebrities(self, celebrity_news_id):
-        """Return QuerySet object with news data about celebrities."""
-        return super().get_queryset().filter(pk__in=celebrity_news_id)
+    def get_news_about_celebrities(self):
+        """Return QuerySet object with news data about celebrities.
+
+        News are selected by table of cinema persons mentioned in titles
+        of news, which is updated after saving news or names of persons.
+        """
+        mentions = self.model.mentioned_persons.through.objects.filter(
+            news=OuterRef("pk")
+        )
+        return super().get_queryset().filter(Exists(mentions))
+
+    def filter_mentioning(self, cinema_person):
+        """Return QuerySet object with news, which titles mention full name of
+        cinema person.
+
+        Like in 'filter_mentioned_in' method of 'CinemaPersonManager',
+        full name consists of not blank names of cinema person.
+        """
+        user = cinema_person.user
+        fullname = " ".join(filter(None, (user.first_name, user.last_name)))
+        if not fullname:
+            return self.none()
+        return super().get_queryset().filter(title__contains=fullname)
 
     def filter_by_search_word(self, search_word):
         """Return QuerySet object, value of selected field corresponds to
-        search word entered by visitor."""
-        return super().get_queryset().filter(title__icontains=search_word)
+        search word entered by visitor.
+
+        News are found by full text search in title and description and
+        ordered by rank of search.
+        """
+        search_query = get_search_query(search_word)
+        if search_query is None:
+            return self.none()
+        return (
+            super()
+            .get_queryset()
+            .filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-created_at")
+        )
 
 
-class News(DateMixin):
+class News(DateMixin, CommentsCountMixin):
     """Save news data about world cinema.
 
     Model related with next models:
     - Film, CinemaPerson (many-to-many relationship);
     - CommentToNews (many-to-one relationship).
 
-    Class of this model inherits from 'DateMixin' class.
+    Class of this model inherits from 'DateMixin' and 'CommentsCountMixin'
+    classes.
     """
 
     title = models.CharField(max_length=128, unique=True)
     description = models.TextField()
+    description_html = models.TextField(blank=True, default="", editable=False)
     news_source = models.CharField(max_length=32)
     news_author = models.CharField(max_length=64)
     film = models.ManyToManyField(Film, blank=True)
     cinema_person = models.ManyToManyField(CinemaPerson, blank=True)
+    mentioned_persons = models.ManyToManyField(
+        CinemaPerson,
+        blank=True,
+        editable=False,
+        related_name="mentioned_news",
+    )
     news_feed_photo = models.ImageField(
         upload_to=upload_photo_to_news_feed, blank=True, null=True
     )
     news_detail_photo = models.ImageField(
         upload_to=upload_photo_to_news_detail, blank=True, null=True
     )
+    search_vector = SearchVectorField(null=True, editable=False)
     objects = models.Manager()
     news = NewsManager()
 
@@ -506,6 +761,12 @@ class News(DateMixin):
     class Meta:
         verbose_name_plural = "News"
         ordering = ["-created_at"]
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            models.Index(
+                fields=["created_at", "id"], name="cinema_news_created_id_idx"
+            ),
+        ]
 
 
 class ProductManager(models.Manager):
@@ -518,9 +779,7 @@ class ProductManager(models.Manager):
     def all(self):
         """Return QuerySet object with cached data of related models."""
         return (
-            super()
-            .get_queryset()
-            .select_related("film", "film__imdb_rating", "film__mpaa_rating")
+            super().get_queryset().select_related("film", "film__mpaa_rating")
         )
 
     def order_by_name(self):
@@ -534,7 +793,7 @@ class ProductManager(models.Manager):
         return (
             self.all()
             .only("pk", "price", "film", "in_stock")
-            .order_by("-film__imdb_rating__value")
+            .order_by("-film__imdb_rating_value")
         )
 
     def order_by_release_data(self):
@@ -548,18 +807,31 @@ class ProductManager(models.Manager):
 
     def filter_by_search_word(self, search_word):
         """Return QuerySet object, value of selected field corresponds to
-        search word entered by visitor."""
-        return self.all().filter(film__title__icontains=search_word)
+        search word entered by visitor.
+
+        Blu-ray movies are found by full text search in title and
+        description of movies and ordered by rank of search.
+        """
+        search_query = get_search_query(search_word)
+        if search_query is None:
+            return self.none()
+        return (
+            self.all()
+            .filter(film__search_vector=search_query)
+            .annotate(rank=SearchRank(F("film__search_vector"), search_query))
+            .order_by("-rank", "film__title")
+        )
 
 
-class Product(DateMixin):
+class Product(DateMixin, CommentsCountMixin):
     """Save information about movies on blu-ray.
 
     Model related with next models:
     - Film (one-to-one relationship);
     - CommentToProduct (many-to-one relationship).
 
-    Class of this model inherits from 'DateMixin' class.
+    Class of this model inherits from 'DateMixin' and 'CommentsCountMixin'
+    classes.
     """
 
     price = models.DecimalField(
@@ -608,6 +880,12 @@ class CommentToPerson(CommentMixin, DateMixin):
     class Meta:
         verbose_name_plural = "Comments to persons"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["cinema_person", "is_active", "-created_at"],
+                name="cinema_cmt_person_active_idx",
+            )
+        ]
 
 
 class CommentToFilm(CommentMixin, DateMixin):
@@ -622,6 +900,12 @@ class CommentToFilm(CommentMixin, DateMixin):
     class Meta:
         verbose_name_plural = "Comments to films"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["film", "is_active", "-created_at"],
+                name="cinema_cmt_film_active_idx",
+            )
+        ]
 
 
 class CommentToNews(CommentMixin, DateMixin):
@@ -636,6 +920,12 @@ class CommentToNews(CommentMixin, DateMixin):
     class Meta:
         verbose_name_plural = "Comments to news"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["news", "is_active", "-created_at"],
+                name="cinema_cmt_news_active_idx",
+            )
+        ]
 
 
 class CommentToProduct(CommentMixin, DateMixin):
@@ -650,21 +940,60 @@ class CommentToProduct(CommentMixin, DateMixin):
     class Meta:
         verbose_name_plural = "Comments to products"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["product", "is_active", "-created_at"],
+                name="cinema_cmt_product_active_idx",
+            )
+        ]
 
 
-def post_save_dispatcher(sender, instance, created, **kwargs):
-    """Signal handler function.
-
-    After saving record of 'Product' model in database, 'post_save' signal
-    will be send, which calls this signal handler.
-    Call function that sends notification messages to registered users about
-    appearance of new movie on blu-ray.
+class ArchivedComment(models.Model):
+    """Save old inactive comments moved from tables of comments models.
 
-    'send_new_product_notification' is celery task that will run in task
-    queue (keeps in redis) and launch in background.
+    Comments are moved by 'archive_comments' management command, so
+    tables of comments models and their indexes keep only comments,
+    which are displayed or recently hidden.
     """
-    if created:
-        send_new_product_notification.delay(instance.pk)
+
+    KINDS = (
+        ("cinema_person", "Person"),
+        ("film", "Film"),
+        ("news", "News"),
+        ("product", "Product"),
+    )
+
+    kind = models.CharField(max_length=16, choices=KINDS)
+    comment_id = models.PositiveIntegerField()
+    target_id = models.PositiveIntegerField()
+    author = models.CharField(max_length=32)
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.target_id}: {self.author}"
+
+    class Meta:
+        verbose_name_plural = "Archived comments"
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "comment_id"],
+                name="unique_archived_comment",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["kind", "target_id", "-created_at"],
+                name="cinema_cmt_archive_target_idx",
+            )
+        ]
 
 
-post_save.connect(post_save_dispatcher, sender=Product)
+COMMENTS_TARGETS = {
+    CommentToPerson: "cinema_person",
+    CommentToFilm: "film",
+    CommentToNews: "news",
+    CommentToProduct: "product",
+}
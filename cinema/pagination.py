@@ -0,0 +1,382 @@
+import json
+from base64 import (
+    urlsafe_b64decode,
+    urlsafe_b64encode,
+)
+from collections.abc import Sequence
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import (
+    EmptyResultSet,
+    ValidationError,
+)
+from django.core.paginator import (
+    InvalidPage,
+    Paginator,
+)
+from django.db import connections
+from django.db.models import (
+    F,
+    Q,
+    QuerySet,
+)
+from django.http import (
+    Http404,
+    HttpResponsePermanentRedirect,
+    HttpResponseRedirect,
+)
+from django.utils.functional import cached_property
+
+from .cache import (
+    CACHE_TIMEOUT,
+    get_cache_key,
+)
+
+ESTIMATED_COUNT_THRESHOLD = getattr(
+    settings, "CINEMA_ESTIMATED_COUNT_THRESHOLD", 10000
+)
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(direction, values):
+    """Get opaque string, which keeps direction of pagination and values of
+    ordering fields of boundary object of page."""
+    data = json.dumps([direction, values], default=str).encode()
+    return urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor, fields):
+    """Get direction of pagination and values of ordering fields from cursor.
+
+    Values are converted to python types of passed model fields, so
+    tampered cursor is rejected before querying database.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        direction, values = json.loads(urlsafe_b64decode(cursor + padding))
+    except (TypeError, ValueError) as error:
+        raise InvalidCursor("Cursor is not valid") from error
+    if direction not in ("next", "previous") or not (
+        isinstance(values, list) and len(values) == len(fields)
+    ):
+        raise InvalidCursor("Cursor is not valid")
+    try:
+        values = [
+            None if value is None else field.to_python(value)
+            for field, value in zip(fields, values)
+        ]
+    except (ValidationError, TypeError, ValueError) as error:
+        raise InvalidCursor("Cursor is not valid") from error
+    return direction, values
+
+
+def get_queryset_models(queryset):
+    """Get models, which tables are used by query of queryset, including
+    intermediate models of many-to-many relationships."""
+    # pylint: disable=protected-access
+    tables = {join.table_name for join in queryset.query.alias_map.values()} | {
+        queryset.model._meta.db_table
+    }
+    return sorted(
+        (
+            model
+            for model in apps.get_models(include_auto_created=True)
+            if model._meta.db_table in tables
+        ),
+        key=lambda model: model._meta.label_lower,
+    )
+
+
+def get_ordering_field(model, path):
+    """Get model field reached by path of lookups of ordering field and check
+    if its value may be null.
+
+    Path may contain 'pk' alias of primary key. Relations followed in
+    reverse direction, like rankings of movies, are expected to be
+    filtered by queryset, so they don't make value nullable.
+    """
+    # pylint: disable=protected-access
+    nullable = False
+    for name in path.split("__"):
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        nullable = nullable or (field.concrete and field.null)
+        model = field.related_model
+    return field, nullable
+
+
+def get_estimated_count(queryset):
+    """Get number of rows of queryset estimated by PostgreSQL planner.
+
+    Return None for other database backends.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, that keeps number of objects in cache.
+
+    Number is kept under key containing versions of models used by
+    query, so it is counted again only after data of these models has
+    been changed. If planner of PostgreSQL estimates more rows than
+    threshold, estimate is used instead of exact count.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        if queryset.query.can_filter():
+            queryset = queryset.order_by()
+        try:
+            query = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        key = get_cache_key("count", query, get_queryset_models(queryset))
+        count = cache.get(key)
+        if count is None:
+            count = get_estimated_count(queryset)
+            if count is None or count < ESTIMATED_COUNT_THRESHOLD:
+                count = queryset.count()
+            cache.set(key, count, CACHE_TIMEOUT)
+        return count
+
+
+class KeysetPaginator:
+    """Paginator, that selects page by values of ordering fields of boundary
+    object of neighbouring page instead of offset.
+
+    Ordering is passed explicitly and must be unique, e.g. completed by
+    primary key, so every page is fetched by single query reading range
+    of index on ordering columns, and its cost doesn't depend on depth
+    of page. Number of pages is not counted.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        names = self.get_keys_names(self.ordering)
+        self.queryset = queryset.annotate(
+            **{
+                name: F(field.lstrip("-"))
+                for name, field in zip(names, self.ordering)
+            }
+        )
+        self.keys = []
+        self.fields = []
+        for name, field in zip(names, self.ordering):
+            model_field, nullable = get_ordering_field(
+                queryset.model, field.lstrip("-")
+            )
+            self.keys.append((name, field.startswith("-"), nullable))
+            self.fields.append(model_field)
+
+    @staticmethod
+    def get_keys_names(ordering):
+        """Get names of annotations keeping values of ordering fields."""
+        return [f"keyset_{number}" for number in range(len(ordering))]
+
+    def get_ordering(self, reverse):
+        """Get ordering expressions of keys, nulls of nullable keys are placed
+        after all values."""
+        return [
+            F(name).desc(
+                nulls_first=nullable and reverse,
+                nulls_last=nullable and not reverse,
+            )
+            if descending != reverse
+            else F(name).asc(
+                nulls_first=nullable and reverse,
+                nulls_last=nullable and not reverse,
+            )
+            for name, descending, nullable in self.keys
+        ]
+
+    def get_keyset_filter(self, values, reverse):
+        """Get condition selecting objects placed after object with passed
+        values of keys, or before it if reverse is true.
+
+        If first of several keys is not nullable, condition is limited
+        by its range, so index is scanned from boundary object instead
+        of first one.
+        """
+        conditions = []
+        equal = Q()
+        for (name, descending, nullable), value in zip(self.keys, values):
+            if value is None:
+                following = Q(**{f"{name}__isnull": False}) if reverse else None
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                lookup = "lt" if descending != reverse else "gt"
+                following = Q(**{f"{name}__{lookup}": value})
+                if nullable and not reverse:
+                    following |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            if following is not None:
+                conditions.append(equal & following)
+            equal &= same
+        condition = reduce(or_, conditions, Q(pk__in=[]))
+        (name, descending, nullable), value = self.keys[0], values[0]
+        if len(self.keys) > 1 and not nullable:
+            lookup = "lte" if descending != reverse else "gte"
+            condition &= Q(**{f"{name}__{lookup}": value})
+        return condition
+
+    def get_cursor(self, direction, obj):
+        """Get cursor of page following or preceding passed object."""
+        return encode_cursor(
+            direction, [getattr(obj, name) for name, _, _ in self.keys]
+        )
+
+    def get_page_cursor(self, number):
+        """Get cursor of page with passed number counted from first page.
+
+        Boundary object of preceding page is selected by offset, so it
+        is used only to convert old links with page numbers to cursors.
+        Return None for first page.
+        """
+        if number == 1:
+            return None
+        offset = (number - 1) * self.per_page
+        queryset = self.queryset.order_by(*self.get_ordering(False))
+        object_list = list(queryset[offset - 1 : offset + 1])
+        if len(object_list) < 2:
+            raise InvalidPage("That page contains no results")
+        return self.get_cursor("next", object_list[0])
+
+    def page(self, cursor=None):
+        """Return KeysetPage object for cursor, first page if cursor is not
+        passed."""
+        direction, values = "next", None
+        if cursor:
+            direction, values = decode_cursor(cursor, self.fields)
+        reverse = direction == "previous"
+        queryset = self.queryset.order_by(*self.get_ordering(reverse))
+        if values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(values, reverse))
+        object_list = list(queryset[: self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[: self.per_page]
+        if reverse:
+            object_list.reverse()
+            return KeysetPage(object_list, self, has_more, True)
+        return KeysetPage(object_list, self, values is not None, has_more)
+
+
+class KeysetPage(Sequence):
+    """Page of objects selected by KeysetPaginator object."""
+
+    def __init__(self, object_list, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<Page of {len(self)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.get_cursor("next", self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.get_cursor("previous", self.object_list[0])
+
+
+class KeysetPaginationMixin:
+    """Mixin for list views, that paginates objects by cursors passed in
+    'cursor' parameter of URL.
+
+    Objects are ordered by fields of 'keyset_ordering' attribute, which
+    must be unique. Links with 'page' parameter are redirected to page
+    with cursor of same position, so deep pages are selected by offset
+    only once.
+    """
+
+    cursor_kwarg = "cursor"
+    keyset_ordering = ("-pk",)
+
+    def get(self, request, *args, **kwargs):
+        if self.page_kwarg in request.GET:
+            return self.redirect_to_cursor(request.GET[self.page_kwarg])
+        return super().get(request, *args, **kwargs)
+
+    def get_ordering(self):
+        return self.get_keyset_ordering()
+
+    def get_keyset_ordering(self):
+        """Return unique ordering of objects used by paginator."""
+        return self.keyset_ordering
+
+    def get_paginator(self, queryset, per_page, orphans=0, **kwargs):
+        return KeysetPaginator(queryset, per_page, self.get_keyset_ordering())
+
+    def redirect_to_cursor(self, page_number):
+        """Redirect link with page number to page with cursor of same position.
+
+        Link of first page is redirected permanently, links of other
+        pages are redirected temporarily, because cursors of their
+        positions change with data.
+        """
+        try:
+            number = int(page_number)
+            if number < 1:
+                raise InvalidPage("That page number is less than 1")
+            queryset = self.get_queryset()
+            cursor = self.get_paginator(
+                queryset, self.get_paginate_by(queryset)
+            ).get_page_cursor(number)
+        except (ValueError, InvalidPage) as error:
+            raise Http404(str(error)) from error
+        query = self.request.GET.copy()
+        del query[self.page_kwarg]
+        if cursor is not None:
+            query[self.cursor_kwarg] = cursor
+        url = self.request.path
+        if query:
+            url = f"{url}?{query.urlencode()}"
+        if cursor is None:
+            return HttpResponsePermanentRedirect(url)
+        return HttpResponseRedirect(url)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error)) from error
+        return paginator, page, page.object_list, page.has_other_pages()
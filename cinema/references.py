@@ -0,0 +1,105 @@
+import threading
+from functools import lru_cache
+
+from .bus import register_local_cache
+from .cache import get_models_version
+from .models import (
+    CinemaProfession,
+    Country,
+    Distributor,
+    Genre,
+    Language,
+    MpaaRating,
+)
+
+REFERENCE_MODELS = {
+    Country: "name",
+    Genre: "name",
+    Language: "name",
+    Distributor: "name",
+    MpaaRating: "value",
+    CinemaProfession: "name",
+}
+
+_request_state = threading.local()
+
+
+def build_references():
+    """Build data of all reference models.
+
+    Records of every model are keyed by primary keys, primary keys are
+    also keyed by names of records.
+    """
+    references = {}
+    for model, name_field in REFERENCE_MODELS.items():
+        records = {
+            record["id"]: dict(record, pk=record["id"])
+            for record in model.objects.values()
+        }
+        references[model] = (
+            records,
+            {record[name_field]: pk for pk, record in records.items()},
+        )
+    return references
+
+
+@lru_cache(maxsize=1)
+def _get_versioned_references(version):
+    """Get data of reference models built for version of their records.
+
+    Only data of last version is kept in memory of process.
+    """
+    return build_references()
+
+
+@register_local_cache(*REFERENCE_MODELS)
+def clear_references():
+    """Drop data of reference models kept in memory of process."""
+    _get_versioned_references.cache_clear()
+
+
+def forget_references_version(**kwargs):
+    """Forget version of reference models checked by current request, e.g.
+    after changing their records, so it is checked again."""
+    _request_state.version = None
+
+
+def start_request_references(**kwargs):
+    """Start keeping version of reference models checked by new request of
+    thread, so it is read from cache once per request."""
+    _request_state.version = None
+    _request_state.active = True
+
+
+def finish_request_references(**kwargs):
+    """Stop keeping version of reference models checked by request, so code
+    running outside of requests checks it on every call."""
+    _request_state.version = None
+    _request_state.active = False
+
+
+def get_references():
+    """Get data of reference models.
+
+    Data is kept in memory of process and built again only after records
+    of any reference model have been changed. Version of their records
+    is read from cache once per request.
+    """
+    version = getattr(_request_state, "version", None)
+    if version is None:
+        version = get_models_version(REFERENCE_MODELS)
+        if getattr(_request_state, "active", False):
+            _request_state.version = version
+    return _get_versioned_references(version)
+
+
+def get_reference(model, pk):
+    """Get data of record of reference model by primary key, None if record
+    does not exist."""
+    return get_references()[model][0].get(pk)
+
+
+def get_reference_pk(model, name):
+    """Get primary key of record of reference model by name, None if record
+    does not exist."""
+    return get_references()[model][1].get(name)
@@ -1,35 +1,141 @@
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import (
+    connection,
+    models,
+    transaction,
+)
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils import timezone
+from easy_thumbnails.exceptions import EasyThumbnailsError
+from easy_thumbnails.files import get_thumbnailer
+
+from accounts.models import User
+
+from .bus import publish_models_change_on_commit
+from .cache import (
+    cached_data,
+    invalidate_models_cache,
+    invalidate_models_cache_on_commit,
+)
+from .hyperlinks import (
+    build_hyperlinks_matcher,
+    get_text_hyperlinks,
+)
 from .models import (
+    COMMENTS_TARGETS,
+    RANKING_FIELDS,
+    ArchivedComment,
     CinemaFilmPersonProfession,
     CinemaPerson,
+    CinemaProfession,
+    CommentToFilm,
+    CommentToNews,
+    CommentToPerson,
+    CommentToProduct,
+    Country,
+    Distributor,
     Film,
+    FilmRanking,
+    Genre,
+    ImdbRating,
+    Language,
     News,
+    Product,
+)
+from .pagination import (
+    CachedCountPaginator,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+)
+
+FILMS_RANKINGS_LOCK_ID = 20201201
+
+HYPERLINKED_FIELDS = (
+    (Film, "description"),
+    (CinemaPerson, "bio"),
+    (News, "description"),
+)
+
+COMMENTS_PER_PAGE = 10
+
+LATEST_COMMENTS_NUMBER = 5
+
+COMMENTS_FEED_CURSOR_FIELDS = (
+    models.DateTimeField(),
+    models.IntegerField(),
+    models.IntegerField(),
 )
 
+COMMENTS_ARCHIVE_DAYS = getattr(settings, "CINEMA_COMMENTS_ARCHIVE_DAYS", 180)
+COMMENTS_ARCHIVE_BATCH_SIZE = 1000
 
+COMMENTS_TARGETS_URLS = {
+    CommentToPerson: "cinema:movie-person-detail",
+    CommentToFilm: "cinema:film-detail",
+    CommentToNews: "cinema:news-detail",
+    CommentToProduct: "cinema:product-detail",
+}
+
+HOMEPAGE_PRODUCTS_NUMBER = 12
+HOMEPAGE_SLIDER_NEWS_NUMBER = 5
+HOMEPAGE_BOX_NEWS_NUMBER = 4
+
+
+@cached_data(Film, ImdbRating)
 def get_films_ratings_sets():
-    """Get sets from top 5 movies ordered by differ criterion name."""
-    criteria = ("imdb_rating__value", "budget", "usa_gross", "world_gross")
+    """Get sets from top 5 movies ordered by differ criterion name.
+
+    Sets are keyed by names of template context variables, so all of
+    them can be passed to page by single call of function.
+    """
+    criteria = {
+        "imdb_top_5": "imdb_rating_value",
+        "budget_top_5": "budget",
+        "usa_gross_top_5": "usa_gross",
+        "world_gross_top_5": "world_gross",
+    }
     cached_films_data = Film.films.all()
     films_ratings_sets = {}
-    for criterion in criteria:
-        top_5 = cached_films_data.order_by(f"-{criterion}")[:5].values_list(
-            "pk", "title", f"{criterion}", named=True
+    for name, criterion in criteria.items():
+        top_5 = cached_films_data.order_by(f"-{criterion}")[:5].values(
+            "pk", "title", f"{criterion}"
         )
-        films_ratings_sets[criterion] = top_5
+        films_ratings_sets[name] = list(top_5)
     return films_ratings_sets
 
 
-def get_cast_and_crew():
-    """Get cast and crew by professions for all movies."""
+@cached_data(CinemaFilmPersonProfession, CinemaPerson, CinemaProfession, User)
+def get_cast_and_crew(films_pk):
+    """Get cast and crew by professions for selected movies.
+
+    Only records of movies, primary keys of which are passed, are
+    fetched from database, e.g. movies displayed on current page.
+    """
     professions = ("Director", "Actor", "Writer")
-    films_full_cast = CinemaFilmPersonProfession.cfppm.get_full_cast()
-    cast_and_crew = {}
+    films_full_cast = CinemaFilmPersonProfession.cfppm.get_full_cast(films_pk)
+    cast_and_crew = {
+        film_pk: {profession: [] for profession in professions}
+        for film_pk in films_pk
+    }
     for cast in films_full_cast:
-        if cast.film__pk not in cast_and_crew:
-            cast_and_crew[cast.film__pk] = {}
-            for profession in professions:
-                cast_and_crew[cast.film__pk][profession] = []
-        cast_and_crew[cast.film__pk][cast.profession__name].append(
+        film_cast_and_crew = cast_and_crew[cast.film__pk]
+        film_cast_and_crew.setdefault(cast.profession__name, []).append(
             {
                 "pk": cast.cinema_person__pk,
                 "name": f"{cast.cinema_person__user__first_name} "
@@ -39,143 +145,579 @@ def get_cast_and_crew():
     return cast_and_crew
 
 
-def get_films_info():
-    """Get information about all movies from related models."""
-    film_fields = (
+@cached_data(Film, Country, Genre, Language, Distributor, News)
+def get_films_info(films_pk):
+    """Get information about selected movies from related models.
+
+    Every related model is loaded by separate query, so number of
+    fetched rows grows linearly with amount of movie related data.
+    """
+    related_fields = (
         "country__name",
         "genre__name",
         "language__name",
         "distributor__name",
-        "news__pk",
     )
-    films_data = Film.films.get_related_data(film_fields)
-
     films_info = {}
-    for film in films_data:
-        if film.pk not in films_info:
-            films_info[film.pk] = {}
-
-        for field in film_fields:
-            if "news" not in films_info[film.pk]:
-                films_info[film.pk]["news"] = {}
-            if (
-                field == "news__pk"
-                and film.news__pk
-                and film.news__pk not in films_info[film.pk]["news"]
-            ):
-                films_info[film.pk]["news"][film.news__pk] = film.news__title
-            else:
-                if field not in films_info[film.pk]:
-                    films_info[film.pk][field] = []
-                if (
-                    field == "country__name"
-                    and film.country__name not in films_info[film.pk][field]
-                ):
-                    films_info[film.pk][field].append(film.country__name)
-                elif (
-                    field == "genre__name"
-                    and film.genre__name not in films_info[film.pk][field]
-                ):
-                    films_info[film.pk][field].append(film.genre__name)
-                elif (
-                    field == "language__name"
-                    and film.language__name not in films_info[film.pk][field]
-                ):
-                    films_info[film.pk][field].append(film.language__name)
-                elif (
-                    field == "distributor__name"
-                    and film.distributor__name not in films_info[film.pk][field]
-                ):
-                    films_info[film.pk][field].append(film.distributor__name)
+    for film_pk in films_pk:
+        films_info[film_pk] = {field: [] for field in related_fields}
+        films_info[film_pk]["news"] = {}
+
+    for field in related_fields:
+        films_data = Film.films.get_related_values(films_pk, field)
+        for film_pk, value in films_data.order_by(field):
+            if value is not None:
+                films_info[film_pk][field].append(value)
+
+    films_news = Film.films.get_related_values(
+        films_pk, "news__pk", "news__title"
+    ).order_by("-news__created_at")
+    for film in films_news:
+        if film.news__pk:
+            films_info[film.pk]["news"][film.news__pk] = film.news__title
     return films_info
 
 
-def get_persons_info():
-    """Get information about all cinema persons from related models."""
-    person_fields = ("film__genre__name", "news__pk")
-    persons_data = CinemaPerson.persons.get_related_data(person_fields)
-    persons_info = {}
-    for person in persons_data:
-        if person.pk not in persons_info:
-            persons_info[person.pk] = {}
-        for field in person_fields:
-            if "news" not in persons_info[person.pk]:
-                persons_info[person.pk]["news"] = {}
-            if field == "film__genre__name":
-                if field not in persons_info[person.pk]:
-                    persons_info[person.pk][field] = []
-                if (
-                    person.film__genre__name
-                    not in persons_info[person.pk][field]
-                ):
-                    persons_info[person.pk][field].append(
-                        person.film__genre__name
-                    )
-            elif (
-                field == "news__pk"
-                and person.news__pk
-                and person.news__pk not in persons_info[person.pk]["news"]
-            ):
-                persons_info[person.pk]["news"][
-                    person.news__pk
-                ] = person.news__title
-    return persons_info
-
-
-def get_celebrity_news_id():
-    """Get id of news related to celebrities."""
-    persons_data = CinemaPerson.persons.get_brief_data()
-    celebrities = [
-        f"{person.user__first_name} {person.user__last_name}"
-        for person in persons_data
+@cached_data(Genre, records=lambda person_pk: [(CinemaPerson, person_pk)])
+def get_person_info(person_pk):
+    """Get information about selected cinema person from related models.
+
+    Only genres of movies and news of this cinema person are fetched,
+    and data is kept in cache under separate key for every cinema
+    person. Data is invalidated by version of cinema person, which is
+    changed after changing credits, genres of movies or news of person.
+    """
+    genres = (
+        Genre.objects.filter(
+            film__cinemafilmpersonprofession__cinema_person=person_pk
+        )
+        .values_list("name", flat=True)
+        .distinct()
+    )
+    news = News.objects.filter(cinema_person=person_pk).values_list(
+        "pk", "title"
+    )
+    return {"film__genre__name": list(genres), "news": dict(news)}
+
+
+def get_comments_page(comments, page_number, comments_count=None):
+    """Get page of active comments, newest comments are displayed first.
+
+    Comments are selected by index of target, activity and creation date
+    of comments. If number of active comments kept by target is passed,
+    comments are not counted.
+    """
+    paginator = CachedCountPaginator(
+        comments.filter(is_active=True).order_by("-created_at", "-pk"),
+        COMMENTS_PER_PAGE,
+    )
+    if comments_count is not None:
+        paginator.count = comments_count
+    return paginator.get_page(page_number)
+
+
+def recount_comments():
+    """Count again active comments of all movies, blu-ray movies, news and
+    cinema persons and save numbers, which differ from kept ones."""
+    for comment_model, target_name in COMMENTS_TARGETS.items():
+        target_model = getattr(comment_model, target_name).field.related_model
+        comments_count = Coalesce(
+            Subquery(
+                comment_model.objects.filter(
+                    **{target_name: OuterRef("pk")}, is_active=True
+                )
+                .order_by()
+                .values(target_name)
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+        target_model.objects.annotate(actual_count=comments_count).exclude(
+            comments_count=F("actual_count")
+        ).update(comments_count=comments_count)
+
+
+def get_comments_feed(comment_model, rank, cursor_values, number):
+    """Get newest active comments of model as items of latest comments feed.
+
+    Comments are selected by index of creation date and only ones placed
+    after item with passed cursor values are returned.
+    """
+    target_name = COMMENTS_TARGETS[comment_model]
+    comments = comment_model.objects.filter(is_active=True)
+    if cursor_values is not None:
+        created_at, cursor_rank, pk = cursor_values
+        if rank < cursor_rank:
+            comments = comments.filter(created_at__lte=created_at)
+        elif rank == cursor_rank:
+            comments = comments.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, pk__lt=pk)
+            )
+        else:
+            comments = comments.filter(created_at__lt=created_at)
+    related = {
+        "cinema_person": "cinema_person__user",
+        "product": "product__film",
+    }.get(target_name, target_name)
+    for comment in comments.select_related(related).order_by(
+        "-created_at", "-pk"
+    )[:number]:
+        yield {
+            "kind": target_name,
+            "rank": rank,
+            "pk": comment.pk,
+            "author": comment.author,
+            "content": comment.content,
+            "created_at": comment.created_at,
+            "target": str(getattr(comment, target_name)),
+            "url": reverse(
+                COMMENTS_TARGETS_URLS[comment_model],
+                args=(getattr(comment, f"{target_name}_id"),),
+            ),
+        }
+
+
+def get_feed_item_key(item):
+    """Get key of item, by which latest comments feed is ordered."""
+    return item["created_at"], item["rank"], item["pk"]
+
+
+def decode_feed_cursor(cursor):
+    """Get creation date, rank of comment model and primary key of last item of
+    preceding page of latest comments feed from cursor."""
+    _, values = decode_cursor(cursor, COMMENTS_FEED_CURSOR_FIELDS)
+    if None in values:
+        raise InvalidCursor("Cursor is not valid")
+    return values
+
+
+def build_latest_comments(cursor, number):
+    """Build page of latest active comments to movies, blu-ray movies, news and
+    cinema persons and cursor of next page.
+
+    At most one more comment than page size is fetched from every
+    comment model, fetched comments are merged by creation date, so cost
+    of page doesn't depend on number of comments.
+    """
+    cursor_values = decode_feed_cursor(cursor) if cursor else None
+    feeds = [
+        get_comments_feed(comment_model, rank, cursor_values, number + 1)
+        for rank, comment_model in enumerate(COMMENTS_TARGETS)
     ]
-    news_data = News.news.get_brief_data()
-    news_titles = {news.pk: news.title for news in news_data}
-    celebrity_news_id = []
-    for pk, title in news_titles.items():
-        for celebrity in celebrities:
-            if celebrity in title:
-                celebrity_news_id.append(pk)
+    items = list(
+        islice(
+            heapq.merge(*feeds, key=get_feed_item_key, reverse=True),
+            number + 1,
+        )
+    )
+    next_cursor = None
+    if len(items) > number:
+        items = items[:number]
+        created_at, rank, pk = get_feed_item_key(items[-1])
+        next_cursor = encode_cursor("next", [created_at.isoformat(), rank, pk])
+    return items, next_cursor
+
+
+@cached_data(*COMMENTS_TARGETS, CinemaPerson, User, Film, News, Product)
+def get_first_latest_comments(number=LATEST_COMMENTS_NUMBER):
+    """Get first page of latest active comments and cursor of next page, page
+    is kept in cache until comments or their targets are changed."""
+    return build_latest_comments(None, number)
+
+
+def get_latest_comments(cursor=None, number=LATEST_COMMENTS_NUMBER):
+    """Get page of latest active comments selected by cursor and cursor of next
+    page.
+
+    Only first page is kept in cache, next pages are built by cursors
+    passed by clients, so they are fetched from database every time and
+    don't fill cache with key per cursor.
+    """
+    if not cursor:
+        return get_first_latest_comments(number)
+    return build_latest_comments(cursor, number)
+
+
+def move_comments_to_archive(comment_model, created_before, batch_size):
+    """Move batch of inactive comments of model created before passed date to
+    table of 'ArchivedComment' model.
+
+    Comments are deleted and inserted into archive by single statement,
+    so they are never lost or kept twice. Return number of moved
+    comments.
+    """
+    # pylint: disable=protected-access
+    target_name = COMMENTS_TARGETS[comment_model]
+    quote_name = connection.ops.quote_name
+    table = quote_name(comment_model._meta.db_table)
+    target_column = quote_name(
+        comment_model._meta.get_field(target_name).column
+    )
+    sql = f"""
+        WITH moved AS (
+            DELETE FROM {table}
+            WHERE id IN (
+                SELECT id FROM {table}
+                WHERE NOT is_active AND created_at < %s
+                ORDER BY created_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, {target_column}, author, content, created_at
+        )
+        INSERT INTO {quote_name(ArchivedComment._meta.db_table)}
+            (kind, comment_id, target_id, author, content, created_at,
+             archived_at)
+        SELECT %s, id, {target_column}, author, content, created_at, %s
+        FROM moved
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql, [created_before, batch_size, target_name, timezone.now()]
+        )
+        return cursor.rowcount
+
+
+def archive_comments(
+    days=COMMENTS_ARCHIVE_DAYS, batch_size=COMMENTS_ARCHIVE_BATCH_SIZE
+):
+    """Move inactive comments to movies, blu-ray movies, news and cinema
+    persons, which are older than number of days, to archive.
+
+    Comments are moved by batches, so tables are not locked for long
+    time. Return numbers of moved comments keyed by names of comments
+    models.
+    """
+    created_before = timezone.now() - timedelta(days=days)
+    archived = {}
+    for comment_model in COMMENTS_TARGETS:
+        archived[comment_model.__name__] = 0
+        while True:
+            moved = move_comments_to_archive(
+                comment_model, created_before, batch_size
+            )
+            archived[comment_model.__name__] += moved
+            if moved < batch_size:
                 break
-    return celebrity_news_id
+        if archived[comment_model.__name__]:
+            invalidate_models_cache(comment_model, ArchivedComment)
+            publish_models_change_on_commit(comment_model, ArchivedComment)
+    return archived
 
 
 def get_filmography_and_extra_info(cinema_person):
-    """Get filmography and extra information about all cinema persons."""
-    person_professions = sorted(
-        set(
-            cinema_person.cinemafilmpersonprofession_set.values_list(
-                "profession__name", flat=True
-            )
+    """Get filmography and extra information about cinema person.
+
+    Movies of all professions of cinema person are fetched by single
+    query and grouped by names of professions, which are sorted.
+    """
+    person_films = (
+        CinemaFilmPersonProfession.objects.filter(cinema_person=cinema_person)
+        .values_list(
+            "profession__name",
+            "film__pk",
+            "film__title",
+            "film__release_data__year",
+            "film__imdb_rating_value",
         )
+        .order_by("-film__release_data", "film__pk")
     )
     filmography = {}
-    for person_profession in person_professions:
-        films_for_profession = (
-            cinema_person.film_set.filter(
-                cinemafilmpersonprofession__profession__name=person_profession
-            )
-            .values_list(
-                "pk",
-                "title",
-                "release_data__year",
-                "imdb_rating__value",
-                named=True,
-            )
-            .order_by("-release_data")
+    films_years = {}
+    for profession, pk, title, year, imdb_rating in person_films:
+        filmography.setdefault(profession, []).append(
+            {
+                "pk": pk,
+                "title": title,
+                "release_data__year": year,
+                "imdb_rating_value": imdb_rating,
+            }
         )
-        filmography[person_profession] = films_for_profession
+        films_years[pk] = year
+    person_professions = tuple(sorted(filmography))
+    films_years_range = (
+        f"{min(films_years.values())} - {max(films_years.values())}"
+        if films_years
+        else ""
+    )
+    return (
+        {
+            profession: filmography[profession]
+            for profession in person_professions
+        },
+        person_professions,
+        len(films_years),
+        films_years_range,
+    )
 
-    films_number = []
-    films_years = []
-    for person_films in filmography.values():
-        for person_film in person_films:
-            films_number.append(person_film.pk)
-            films_years.append(person_film.release_data__year)
 
+@cached_data(FilmRanking)
+def get_ranked_criteria():
+    """Get criteria of rankings, which positions of movies have been built
+    for."""
+    return set(
+        FilmRanking.objects.order_by()
+        .values_list("criterion", flat=True)
+        .distinct()
+    )
+
+
+def update_films_rankings(criteria=None):
+    """Update positions of movies in rankings by selected criteria.
+
+    Only positions, which movie has been changed, are written to
+    database, so movies with unchanged figures keep their records.
+    Updates are serialized by advisory lock of PostgreSQL, so concurrent
+    tasks don't create same positions.
+    """
+    for criterion in criteria or RANKING_FIELDS:
+        field = RANKING_FIELDS[criterion]
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s)", [FILMS_RANKINGS_LOCK_ID]
+                )
+            films_pk = list(
+                Film.objects.order_by(
+                    F(field).desc(nulls_last=True), "-pk"
+                ).values_list("pk", flat=True)
+            )
+            rankings = {
+                ranking.position: ranking
+                for ranking in FilmRanking.objects.select_for_update().filter(
+                    criterion=criterion
+                )
+            }
+            changed_rankings = []
+            new_rankings = []
+            for position, film_pk in enumerate(films_pk, start=1):
+                ranking = rankings.pop(position, None)
+                if ranking is None:
+                    new_rankings.append(
+                        FilmRanking(
+                            criterion=criterion,
+                            position=position,
+                            film_id=film_pk,
+                        )
+                    )
+                elif ranking.film_id != film_pk:
+                    ranking.film_id = film_pk
+                    changed_rankings.append(ranking)
+            FilmRanking.objects.filter(
+                pk__in=[ranking.pk for ranking in rankings.values()]
+            ).delete()
+            FilmRanking.objects.bulk_update(changed_rankings, ["film"])
+            FilmRanking.objects.bulk_create(new_rankings)
+    invalidate_models_cache(FilmRanking)
+    publish_models_change_on_commit(FilmRanking)
+
+
+def get_preceding_ranking_position(criterion, film_pk, value):
+    """Get position of movie ranked right before selected movie with passed
+    figure by criterion.
+
+    Return 0, if selected movie is first in ranking, or None, if movie
+    ranked before it has no position, so ranking must be built again.
+    """
+    field = RANKING_FIELDS[criterion]
+    if value is None:
+        preceding = Film.objects.filter(
+            Q(**{f"{field}__isnull": False})
+            | Q(**{f"{field}__isnull": True}, pk__gt=film_pk)
+        ).order_by(F(field).asc(nulls_first=True), "pk")
+    else:
+        preceding = Film.objects.filter(
+            Q(**{f"{field}__gt": value}) | Q(**{field: value}, pk__gt=film_pk)
+        ).order_by(F(field).asc(), "pk")
+    preceding_pk = preceding.values_list("pk", flat=True).first()
+    if preceding_pk is None:
+        return 0
     return (
-        filmography,
-        tuple(person_professions),
-        len(films_number),
-        f"{min(films_years)} - {max(films_years)}",
+        FilmRanking.objects.filter(criterion=criterion, film_id=preceding_pk)
+        .values_list("position", flat=True)
+        .first()
     )
+
+
+def update_film_rankings(film_pk, criteria=None):
+    """Move movie to its positions in rankings by selected criteria.
+
+    Only positions between old and new positions of movie are shifted,
+    so rankings are not sorted again and new movie is ranked at once.
+    Positions of deleted movies are left as gaps. Criteria of rankings,
+    which have not been built or lost positions of movies, are returned
+    to be built again outside of request.
+    """
+    unranked_criteria = []
+    for criterion in criteria or RANKING_FIELDS:
+        field = RANKING_FIELDS[criterion]
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s)", [FILMS_RANKINGS_LOCK_ID]
+                )
+            film = Film.objects.filter(pk=film_pk).values(field).first()
+            rankings = FilmRanking.objects.filter(criterion=criterion)
+            preceding_position = (
+                get_preceding_ranking_position(criterion, film_pk, film[field])
+                if film is not None and rankings.exists()
+                else None
+            )
+            if preceding_position is None:
+                unranked_criteria.append(criterion)
+                continue
+            old_position = (
+                rankings.filter(film_id=film_pk)
+                .values_list("position", flat=True)
+                .first()
+            )
+            if old_position is None:
+                new_position = preceding_position + 1
+                rankings.filter(position__gte=new_position).update(
+                    position=F("position") + 1
+                )
+                FilmRanking.objects.create(
+                    criterion=criterion, position=new_position, film_id=film_pk
+                )
+            elif old_position > preceding_position + 1:
+                new_position = preceding_position + 1
+                rankings.filter(
+                    Q(film_id=film_pk)
+                    | Q(position__gte=new_position, position__lt=old_position)
+                ).update(
+                    position=Case(
+                        When(film_id=film_pk, then=Value(new_position)),
+                        default=F("position") + 1,
+                    )
+                )
+            elif old_position <= preceding_position:
+                new_position = preceding_position
+                rankings.filter(
+                    Q(film_id=film_pk)
+                    | Q(position__gt=old_position, position__lte=new_position)
+                ).update(
+                    position=Case(
+                        When(film_id=film_pk, then=Value(new_position)),
+                        default=F("position") - 1,
+                    )
+                )
+            else:
+                continue
+            invalidate_models_cache_on_commit(FilmRanking)
+            publish_models_change_on_commit(FilmRanking)
+    return unranked_criteria
+
+
+def update_texts_hyperlinks(name=None, url_path=None):
+    """Render again hyperlinks in texts of movies, cinema persons and news.
+
+    If name and path of page of cinema person or movie are passed, only
+    texts mentioning this name or containing hyperlink to this page are
+    rendered, otherwise all texts are rendered.
+    """
+    matcher = build_hyperlinks_matcher()
+    for model, field_name in HYPERLINKED_FIELDS:
+        html_field_name = f"{field_name}_html"
+        texts = model.objects.all()
+        if name is not None:
+            texts = texts.filter(
+                Q(**{f"{field_name}__icontains": name})
+                | Q(**{f"{html_field_name}__contains": f"href='{url_path}'"})
+            )
+        for pk, text in texts.values_list("pk", field_name).iterator():
+            model.objects.filter(pk=pk).update(
+                **{html_field_name: get_text_hyperlinks(text, matcher)}
+            )
+
+
+def get_thumbnail_url(image, alias):
+    """Get url of thumbnail of image by alias.
+
+    Like 'thumbnail' template tag, return empty string if thumbnail can
+    not be generated, e.g. when image file is missing.
+    """
+    if not image:
+        return ""
+    try:
+        return get_thumbnailer(image)[alias].url
+    except (EasyThumbnailsError, OSError):
+        return ""
+
+
+def get_homepage_products(products):
+    """Get data of blu-ray movies displayed in carousel of home page."""
+    return [
+        {
+            "pk": product.pk,
+            "price": product.price,
+            "in_stock": product.in_stock,
+            "film": {"pk": product.film.pk, "title": product.film.title},
+            "poster_url": get_thumbnail_url(product.film.poster, "index"),
+        }
+        for product in products[:HOMEPAGE_PRODUCTS_NUMBER]
+    ]
+
+
+def get_homepage_news(news_list, alias):
+    """Get data of news displayed in slider or boxes of home page."""
+    return [
+        {
+            "pk": news.pk,
+            "title": news.title,
+            "news_source": news.news_source,
+            "created_at": news.created_at,
+            "photo_url": get_thumbnail_url(news.news_detail_photo, alias),
+        }
+        for news in news_list
+    ]
+
+
+@cached_data(
+    Product,
+    Film,
+    ImdbRating,
+    News,
+    CinemaFilmPersonProfession,
+    CinemaPerson,
+    CinemaProfession,
+    User,
+)
+def get_homepage_snapshot():
+    """Get data of all carousels of home page.
+
+    Number of blu-ray movies and news is limited, thumbnails are
+    generated and cast of movies is fetched in advance, so home page is
+    rendered from single object. Data is kept in cache until data of any
+    displayed model has been changed.
+    """
+    top_rated_products = get_homepage_products(
+        Product.products.order_by_imdb_rating()
+    )
+    new_releases_products = get_homepage_products(
+        Product.products.order_by_release_data()
+    )
+    news_number = HOMEPAGE_SLIDER_NEWS_NUMBER + HOMEPAGE_BOX_NEWS_NUMBER
+    news_list = list(News.objects.all()[:news_number])
+    films_pk = {
+        product["film"]["pk"]
+        for product in top_rated_products + new_releases_products
+    }
+    return {
+        "top_rated_products": top_rated_products,
+        "new_releases_products": new_releases_products,
+        "slider_news": get_homepage_news(
+            news_list[:HOMEPAGE_SLIDER_NEWS_NUMBER], "slider_news"
+        ),
+        "box_news": get_homepage_news(
+            news_list[HOMEPAGE_SLIDER_NEWS_NUMBER:], "box_news"
+        ),
+        "films_cast_and_crew": get_cast_and_crew(sorted(films_pk)),
+    }
+
+
+def update_homepage_snapshot():
+    """Build data of home page for current versions of models in advance, so it
+    is not built on request of visitor."""
+    return get_homepage_snapshot()
@@ -0,0 +1,666 @@
+import threading
+
+from django.core.signals import (
+    request_finished,
+    request_started,
+)
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.urls import reverse
+
+from accounts.models import User
+
+from .bus import publish_models_change_on_commit
+from .cache import (
+    invalidate_models_cache_on_commit,
+    invalidate_records_cache_on_commit,
+)
+from .hyperlinks import get_text_hyperlinks
+from .models import (
+    COMMENTS_TARGETS,
+    RANKING_FIELDS,
+    ArchivedComment,
+    CinemaFilmPersonProfession,
+    CinemaPerson,
+    CinemaProfession,
+    CommentToFilm,
+    CommentToNews,
+    CommentToPerson,
+    CommentToProduct,
+    Country,
+    Distributor,
+    Film,
+    Genre,
+    ImdbRating,
+    Language,
+    MpaaRating,
+    News,
+    Product,
+    get_search_vector,
+)
+from .references import (
+    REFERENCE_MODELS,
+    finish_request_references,
+    forget_references_version,
+    start_request_references,
+)
+from .services import update_film_rankings
+from .tasks import (
+    refresh_films_rankings,
+    refresh_homepage_snapshot,
+    send_new_product_notification,
+    update_texts_hyperlinks,
+)
+
+
+def post_save_dispatcher(sender, instance, created, **kwargs):
+    """Signal handler function.
+
+    After saving record of 'Product' model in database, 'post_save' signal
+    will be send, which calls this signal handler.
+    Call function that sends notification messages to registered users about
+    appearance of new movie on blu-ray.
+
+    'send_new_product_notification' is celery task that will run in task
+    queue (keeps in redis) and launch in background.
+    """
+    if created:
+        send_new_product_notification.delay(instance.pk)
+
+
+def film_imdb_rating_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    Before saving record of 'Film' model in database, 'pre_save' signal
+    will be send, which calls this signal handler. Copy value of imdb
+    rating of movie to its record, so movies are sorted by imdb rating
+    without joining 'ImdbRating' model.
+    """
+    instance.imdb_rating_value = instance.imdb_rating.value
+
+
+def imdb_rating_value_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After saving record of 'ImdbRating' model, 'post_save' signal will
+    be send, which calls this signal handler. Update copied value of
+    imdb rating in records of movies with this rating.
+    """
+    if (
+        Film.objects.filter(imdb_rating=instance)
+        .exclude(imdb_rating_value=instance.value)
+        .update(imdb_rating_value=instance.value)
+    ):
+        invalidate_models_cache_on_commit(Film)
+        publish_models_change_on_commit(Film)
+        transaction.on_commit(
+            lambda: refresh_films_rankings.delay(["imdb_rating"])
+        )
+
+
+SAVED_VALUES_FIELDS = {
+    Film: ("title", *RANKING_FIELDS.values()),
+    CinemaPerson: ("user_id",),
+    CinemaFilmPersonProfession: ("cinema_person_id",),
+}
+
+
+def saved_values_dispatcher(sender, instance, raw=False, **kwargs):
+    """Signal handler function.
+
+    Before saving record of 'Film', 'CinemaPerson' or
+    'CinemaFilmPersonProfession' model in database, 'pre_save' signal
+    will be send, which calls this signal handler. Keep values of saved
+    record compared by other signal handlers, so record is selected only
+    once for all of them.
+    """
+    saved_values = None
+    if instance.pk is not None and not raw:
+        saved_values = (
+            sender.objects.filter(pk=instance.pk)
+            .values(*SAVED_VALUES_FIELDS[sender])
+            .first()
+        )
+    instance._saved_values = saved_values  # pylint: disable=protected-access
+
+
+def film_ranking_values_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    Before saving record of 'Film' model in database, 'pre_save' signal
+    will be send, which calls this signal handler. Keep criteria of
+    rankings, which figures of movie have been changed, so only these
+    rankings are updated after saving.
+    """
+    saved_values = getattr(instance, "_saved_values", None)
+    criteria = [
+        criterion
+        for criterion, field in RANKING_FIELDS.items()
+        if saved_values is None
+        or saved_values[field] != getattr(instance, field)
+    ]
+    instance._changed_criteria = criteria  # pylint: disable=protected-access
+
+
+def films_rankings_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After saving record of 'Film' model, 'post_save' signal will be
+    send, which calls this signal handler. Move movie to its positions
+    in rankings, which figures of movie have been changed, so new or
+    changed movie is displayed in its place at once. Rankings, which
+    have not been built, are built by task after commit.
+    """
+    criteria = instance.__dict__.pop("_changed_criteria", list(RANKING_FIELDS))
+    if criteria:
+        unranked_criteria = update_film_rankings(instance.pk, criteria)
+        if unranked_criteria:
+            transaction.on_commit(
+                lambda: refresh_films_rankings.delay(unranked_criteria)
+            )
+
+
+def pre_save_hyperlinks_dispatcher(sender, instance, raw=False, **kwargs):
+    """Signal handler function.
+
+    Before saving record of 'Film', 'CinemaPerson' or 'News' model in
+    database, 'pre_save' signal will be send, which calls this signal
+    handler. Keep text of record with hyperlinks to pages of cinema
+    persons and movies, so that it is not rendered on every request of
+    page.
+    """
+    if raw:
+        return
+    field_name = "bio" if sender is CinemaPerson else "description"
+    setattr(
+        instance,
+        f"{field_name}_html",
+        get_text_hyperlinks(getattr(instance, field_name)),
+    )
+
+
+def get_hyperlinks_name(instance):
+    """Get name of movie or cinema person, which is linked in texts."""
+    return instance.title if isinstance(instance, Film) else instance.fullname
+
+
+def hyperlinks_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After saving or deleting record of 'Film' or 'CinemaPerson' model,
+    'post_save' or 'post_delete' signal will be send, which calls this signal
+    handler.
+    Call function that renders again texts mentioning movie or cinema person
+    after transaction is committed.
+
+    Texts are not rendered after saving record, which name has not been
+    changed.
+
+    'update_texts_hyperlinks' is celery task that will run in task queue
+    (keeps in redis) and launch in background.
+    """
+    saved_values = instance.__dict__.pop("_saved_values", None)
+    name_field = "title" if sender is Film else "user_id"
+    if (
+        "created" in kwargs
+        and saved_values is not None
+        and saved_values[name_field] == getattr(instance, name_field)
+    ):
+        return
+    name = get_hyperlinks_name(instance)
+    if sender is Film:
+        url_path = reverse("cinema:film-detail", args=(instance.pk,))
+    else:
+        url_path = reverse(
+            "cinema:movie-person-detail", kwargs={"pk": instance.pk}
+        )
+    transaction.on_commit(lambda: update_texts_hyperlinks.delay(name, url_path))
+
+
+def news_mentions_dispatcher(sender, instance, raw=False, **kwargs):
+    """Signal handler function.
+
+    After saving record of 'News' model in database, 'post_save' signal
+    will be send, which calls this signal handler. Keep cinema persons,
+    which full names are mentioned in title of news.
+    """
+    if not raw:
+        instance.mentioned_persons.set(
+            CinemaPerson.persons.filter_mentioned_in(instance.title)
+        )
+
+
+def person_mentions_dispatcher(sender, instance, raw=False, **kwargs):
+    """Signal handler function.
+
+    After saving record of 'CinemaPerson' model in database, 'post_save'
+    signal will be send, which calls this signal handler. Keep news,
+    which titles mention full name of cinema person.
+    """
+    if not raw:
+        instance.mentioned_news.set(News.news.filter_mentioning(instance))
+
+
+def pre_save_user_names_dispatcher(
+    sender, instance, update_fields=None, raw=False, **kwargs
+):
+    """Signal handler function.
+
+    Before saving record of 'User' model in database, 'pre_save' signal
+    will be send, which calls this signal handler. Keep saved names of
+    user, so texts and cached data are not built again if names have not
+    been changed.
+    """
+    saved_names = None
+    if (
+        not raw
+        and instance.pk is not None
+        and (
+            update_fields is None
+            or {"first_name", "last_name"} & set(update_fields)
+        )
+    ):
+        saved_names = (
+            User.objects.filter(pk=instance.pk)
+            .values_list("first_name", "last_name")
+            .first()
+        )
+    instance._saved_names = saved_names  # pylint: disable=protected-access
+
+
+def have_user_names_changed(instance, created=False):
+    """Check if names of saved user have been changed.
+
+    Names of new user are not considered changed, because user can't be
+    linked to cinema person yet.
+    """
+    saved_names = getattr(instance, "_saved_names", None)
+    return (
+        not created
+        and saved_names is not None
+        and saved_names != (instance.first_name, instance.last_name)
+    )
+
+
+def user_names_dispatcher(sender, instance, created=False, **kwargs):
+    """Signal handler function.
+
+    After saving record of 'User' model, 'post_save' signal will be
+    send, which calls this signal handler. If names of cinema person
+    have been changed, render again texts mentioning this cinema person
+    and update news mentioning it.
+    """
+    if not have_user_names_changed(instance, created):
+        return
+    cinema_person = CinemaPerson.objects.filter(user=instance).first()
+    if cinema_person:
+        hyperlinks_dispatcher(CinemaPerson, cinema_person)
+        person_mentions_dispatcher(CinemaPerson, cinema_person)
+
+
+def search_vector_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    Before saving record of 'Film' or 'News' model in database,
+    'pre_save' signal will be send, which calls this signal handler.
+    Keep search vector of title and description of record, which is used
+    by full text search of website.
+    """
+    instance.search_vector = get_search_vector(
+        (instance.title, "A"), (instance.description, "B")
+    )
+
+
+def homepage_snapshot_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After saving or deleting record of model, which data is displayed on home
+    page, 'post_save' or 'post_delete' signal will be send, which calls this
+    signal handler.
+    Call function that builds data of home page again after transaction is
+    committed. Saving of user is skipped, if names have not been changed.
+
+    'refresh_homepage_snapshot' is celery task that will run in task queue
+    (keeps in redis) and launch in background.
+    """
+    if (
+        sender is User
+        and "created" in kwargs
+        and not have_user_names_changed(instance, kwargs["created"])
+    ):
+        return
+    transaction.on_commit(refresh_homepage_snapshot.delay)
+
+
+_deleted_targets = threading.local()
+
+
+def get_deleted_targets():
+    """Get set of targets of comments, which records are being deleted in
+    current thread."""
+    if not hasattr(_deleted_targets, "keys"):
+        _deleted_targets.keys = set()
+    return _deleted_targets.keys
+
+
+def comments_target_deletion_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    Before deleting record of target of comments, 'pre_delete' signal
+    will be send, which calls this signal handler. Mark target as
+    deleted, so that comments deleted by cascade don't update its number
+    of comments.
+    """
+    get_deleted_targets().add((sender, instance.pk))
+
+
+def deleted_comments_target_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After deleting record of target of comments, 'post_delete' signal
+    will be send, which calls this signal handler. Remove mark of
+    deleted target.
+    """
+    get_deleted_targets().discard((sender, instance.pk))
+
+
+def update_comments_count(comments_model, target_pk, delta):
+    """Change number of active comments of target of comments by delta."""
+    target_model = getattr(
+        comments_model, COMMENTS_TARGETS[comments_model]
+    ).field.related_model
+    target_model.objects.filter(pk=target_pk).update(
+        comments_count=Greatest(F("comments_count") + delta, 0)
+    )
+
+
+def comment_state_dispatcher(sender, instance, raw=False, **kwargs):
+    """Signal handler function.
+
+    Before saving record of comment in database, 'pre_save' signal will
+    be send, which calls this signal handler. Keep target and activity
+    of saved comment, so that number of comments can be corrected after
+    moderation of comment.
+    """
+    saved_state = None
+    if instance.pk is not None and not raw:
+        saved_state = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list(f"{COMMENTS_TARGETS[sender]}_id", "is_active")
+            .first()
+        )
+    instance._saved_state = saved_state  # pylint: disable=protected-access
+
+
+def comments_count_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After saving record of comment, 'post_save' signal will be send,
+    which calls this signal handler. Update numbers of active comments
+    of targets of comment by F() expression, if comment has been
+    created, moderated or moved to other target.
+    """
+    saved_state = getattr(instance, "_saved_state", None)
+    target_pk = getattr(instance, f"{COMMENTS_TARGETS[sender]}_id")
+    if saved_state == (target_pk, instance.is_active):
+        return
+    if saved_state is not None and saved_state[1]:
+        update_comments_count(sender, saved_state[0], -1)
+    if instance.is_active:
+        update_comments_count(sender, target_pk, 1)
+
+
+def deleted_comments_count_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After deleting record of comment, 'post_delete' signal will be send,
+    which calls this signal handler. Decrease number of active comments
+    of target of comment by F() expression, if comment was active and
+    target is not being deleted with its comments.
+    """
+    target_field = getattr(sender, COMMENTS_TARGETS[sender]).field
+    target_pk = getattr(instance, target_field.attname)
+    if (
+        instance.is_active
+        and (target_field.related_model, target_pk) not in get_deleted_targets()
+    ):
+        update_comments_count(sender, target_pk, -1)
+
+
+def cache_invalidation_dispatcher(sender, **kwargs):
+    """Signal handler function.
+
+    After saving or deleting record of model, which data is used by
+    functions of 'cinema.services' module, 'post_save' or 'post_delete'
+    signal will be send, which calls this signal handler. Change version
+    of model data now and after transaction is committed, so that cached
+    data built from records of this model will be computed again. Other
+    nodes are notified about change through invalidation bus.
+    """
+    invalidate_models_cache_on_commit(sender)
+    publish_models_change_on_commit(sender)
+
+
+def user_cache_invalidation_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After saving or deleting record of 'User' model, 'post_save' or
+    'post_delete' signal will be send, which calls this signal handler.
+    Change version of 'User' model data now and after transaction is
+    committed only after deleting user or changing names of saved user,
+    e.g. it is not done after registration of user or updating last
+    login date. Other nodes are notified about change through
+    invalidation bus.
+    """
+    if "created" in kwargs and not have_user_names_changed(
+        instance, kwargs["created"]
+    ):
+        return
+    invalidate_models_cache_on_commit(sender)
+    publish_models_change_on_commit(sender)
+
+
+def m2m_cache_invalidation_dispatcher(
+    sender, instance, action, model, **kwargs
+):
+    """Signal handler function.
+
+    After changing many-to-many relationship between records of models,
+    'm2m_changed' signal will be send, which calls this signal handler.
+    Change versions of data of both related models and of intermediate
+    model of relationship now and after transaction is committed. Other
+    nodes are notified about change through invalidation bus.
+    """
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_models_cache_on_commit(type(instance), model, sender)
+        publish_models_change_on_commit(type(instance), model, sender)
+
+
+def invalidate_persons_cache(persons_pk):
+    """Change versions of data of cinema persons now and after transaction is
+    committed."""
+    persons_pk = set(persons_pk) - {None}
+    if persons_pk:
+        invalidate_records_cache_on_commit(CinemaPerson, *persons_pk)
+
+
+def credits_persons_cache_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After saving or deleting record of 'CinemaFilmPersonProfession'
+    model, 'post_save' or 'post_delete' signal will be send, which calls
+    this signal handler. Change version of cached data of cinema person
+    of credit and of previous person, if credit has been moved to other
+    one.
+    """
+    saved_values = instance.__dict__.pop("_saved_values", None) or {}
+    invalidate_persons_cache(
+        (instance.cinema_person_id, saved_values.get("cinema_person_id"))
+    )
+
+
+def news_persons_cache_dispatcher(sender, instance, **kwargs):
+    """Signal handler function.
+
+    After saving or before deleting record of 'News' model, 'post_save'
+    or 'pre_delete' signal will be send, which calls this signal
+    handler. Change versions of cached data of cinema persons linked
+    with news.
+    """
+    invalidate_persons_cache(
+        instance.cinema_person.values_list("pk", flat=True)
+    )
+
+
+def m2m_persons_cache_dispatcher(sender, instance, action, pk_set, **kwargs):
+    """Signal handler function.
+
+    After changing genres of movies or cinema persons linked with news,
+    'm2m_changed' signal will be send, which calls this signal handler.
+    Change versions of cached data of cinema persons, which took part in
+    changed movies or are linked with changed news.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if sender is Film.genre.through:
+        if not kwargs["reverse"]:
+            films_pk = [instance.pk]
+        elif pk_set is None:
+            films_pk = instance.film_set.values_list("pk", flat=True)
+        else:
+            films_pk = pk_set
+        persons_pk = CinemaFilmPersonProfession.objects.filter(
+            film__in=films_pk
+        ).values_list("cinema_person", flat=True)
+    elif kwargs["reverse"]:
+        persons_pk = [instance.pk]
+    elif pk_set is None:
+        persons_pk = instance.cinema_person.values_list("pk", flat=True)
+    else:
+        persons_pk = pk_set
+    invalidate_persons_cache(persons_pk)
+
+
+def connect_signals():
+    """Connect signal handlers of models of application.
+
+    Function is called, when application is ready.
+    """
+    post_save.connect(post_save_dispatcher, sender=Product)
+
+    pre_save.connect(film_imdb_rating_dispatcher, sender=Film)
+    post_save.connect(imdb_rating_value_dispatcher, sender=ImdbRating)
+
+    for compared_model in SAVED_VALUES_FIELDS:
+        pre_save.connect(saved_values_dispatcher, sender=compared_model)
+    pre_save.connect(film_ranking_values_dispatcher, sender=Film)
+    post_save.connect(films_rankings_dispatcher, sender=Film)
+
+    for hyperlinked_model in (Film, CinemaPerson, News):
+        pre_save.connect(
+            pre_save_hyperlinks_dispatcher, sender=hyperlinked_model
+        )
+    for hyperlinks_target_model in (Film, CinemaPerson):
+        post_save.connect(hyperlinks_dispatcher, sender=hyperlinks_target_model)
+        post_delete.connect(
+            hyperlinks_dispatcher, sender=hyperlinks_target_model
+        )
+    post_save.connect(news_mentions_dispatcher, sender=News)
+    post_save.connect(person_mentions_dispatcher, sender=CinemaPerson)
+    pre_save.connect(pre_save_user_names_dispatcher, sender=User)
+    post_save.connect(user_names_dispatcher, sender=User)
+
+    pre_save.connect(search_vector_dispatcher, sender=Film)
+    pre_save.connect(search_vector_dispatcher, sender=News)
+
+    for comment_model, target_name in COMMENTS_TARGETS.items():
+        pre_save.connect(comment_state_dispatcher, sender=comment_model)
+        post_save.connect(comments_count_dispatcher, sender=comment_model)
+        post_delete.connect(
+            deleted_comments_count_dispatcher, sender=comment_model
+        )
+        target_model = getattr(comment_model, target_name).field.related_model
+        pre_delete.connect(
+            comments_target_deletion_dispatcher, sender=target_model
+        )
+        post_delete.connect(
+            deleted_comments_target_dispatcher, sender=target_model
+        )
+
+    for cached_model in (
+        Country,
+        Genre,
+        ImdbRating,
+        MpaaRating,
+        Language,
+        Distributor,
+        CinemaPerson,
+        Film,
+        CinemaProfession,
+        CinemaFilmPersonProfession,
+        News,
+        Product,
+        CommentToPerson,
+        CommentToFilm,
+        CommentToNews,
+        CommentToProduct,
+        ArchivedComment,
+    ):
+        post_save.connect(cache_invalidation_dispatcher, sender=cached_model)
+        post_delete.connect(cache_invalidation_dispatcher, sender=cached_model)
+    post_save.connect(user_cache_invalidation_dispatcher, sender=User)
+    post_delete.connect(user_cache_invalidation_dispatcher, sender=User)
+
+    # Home page is built again after versions of its models are changed,
+    # so it doesn't read outdated cached data
+    for homepage_model in (
+        Product,
+        Film,
+        ImdbRating,
+        News,
+        CinemaFilmPersonProfession,
+        CinemaPerson,
+        User,
+    ):
+        post_save.connect(homepage_snapshot_dispatcher, sender=homepage_model)
+        post_delete.connect(homepage_snapshot_dispatcher, sender=homepage_model)
+
+    post_save.connect(
+        credits_persons_cache_dispatcher, sender=CinemaFilmPersonProfession
+    )
+    post_delete.connect(
+        credits_persons_cache_dispatcher, sender=CinemaFilmPersonProfession
+    )
+    post_save.connect(news_persons_cache_dispatcher, sender=News)
+    pre_delete.connect(news_persons_cache_dispatcher, sender=News)
+    for m2m_field in (Film.genre, News.cinema_person):
+        m2m_changed.connect(
+            m2m_persons_cache_dispatcher, sender=m2m_field.through
+        )
+
+    for m2m_field in (
+        Film.country,
+        Film.genre,
+        Film.language,
+        Film.distributor,
+        News.film,
+        News.cinema_person,
+        News.mentioned_persons,
+    ):
+        m2m_changed.connect(
+            m2m_cache_invalidation_dispatcher, sender=m2m_field.through
+        )
+
+    request_started.connect(start_request_references)
+    request_finished.connect(finish_request_references)
+    for reference_model in REFERENCE_MODELS:
+        post_save.connect(forget_references_version, sender=reference_model)
+        post_delete.connect(forget_references_version, sender=reference_model)
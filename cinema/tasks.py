@@ -1,35 +1,96 @@
 import logging
 
+from celery import group
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.mail import (
+    EmailMessage,
+    get_connection,
+)
 from django.template.loader import render_to_string
 
 from django_cinema.celery import celery_app
 
 LOGGER = logging.getLogger(__name__)
 
+NEW_PRODUCT_NOTIFICATION_CHUNK_SIZE = getattr(
+    settings, "CINEMA_NOTIFICATION_CHUNK_SIZE", 500
+)
+
+
+def get_notified_users():
+    """Get registered users, which are notified about new movies on blu-ray."""
+    UserModel = get_user_model()
+    return UserModel.objects.exclude(email__endswith="hollywood.com")
+
+
+def get_pk_ranges(queryset, chunk_size):
+    """Get ranges of primary keys splitting records of queryset into chunks.
+
+    Primary keys are fetched by server-side cursor, so records of
+    queryset are never loaded to memory together.
+    """
+    pk_ranges = []
+    pks = queryset.order_by("pk").values_list("pk", flat=True)
+    for number, pk in enumerate(pks.iterator(chunk_size=chunk_size)):
+        if number % chunk_size == 0:
+            pk_ranges.append([pk, pk])
+        else:
+            pk_ranges[-1][1] = pk
+    return pk_ranges
+
 
 @celery_app.task
 def send_new_product_notification(product_id):
     """Function, that is called by 'post_save_dispatcher' signal handler.
 
     Send notification messages to registered users about appearance of new
-    movie on blu-ray.
+    movie on blu-ray. Users are split into chunks by ranges of primary
+    keys, every chunk is sent by separate task, so messages are sent by
+    all workers in parallel.
 
     This is celery task that will run in task queue (keeps in redis) and
     launch in background.
     """
     LOGGER.info("Run celery task - Send new product notification.")
 
-    UserModel = get_user_model()
-    users = UserModel.objects.exclude(email__endswith="hollywood.com")
+    pk_ranges = get_pk_ranges(
+        get_notified_users(), NEW_PRODUCT_NOTIFICATION_CHUNK_SIZE
+    )
+    if pk_ranges:
+        group(
+            send_new_product_notification_chunk.s(product_id, first_pk, last_pk)
+            for first_pk, last_pk in pk_ranges
+        ).apply_async()
+
+    LOGGER.info(
+        f"Queued {len(pk_ranges)} chunks of notification messages about "
+        f"appearance of new movie on blu-ray."
+    )
+
+
+@celery_app.task
+def send_new_product_notification_chunk(product_id, first_pk, last_pk):
+    """Function, that is called by 'send_new_product_notification' task.
+
+    Send notification messages about appearance of new movie on blu-ray to
+    registered users with primary keys in passed range. All messages are
+    sent by single connection to mail server.
+
+    This is celery task that will run in task queue (keeps in redis) and
+    launch in background.
+    """
+    LOGGER.info("Run celery task - Send chunk of new product notification.")
+
+    users = get_notified_users().filter(pk__range=(first_pk, last_pk))
     ip = settings.ALLOWED_HOSTS[0]
     if not settings.DEBUG:
         port = 80
     else:
         port = 8000
     host = f"http://{ip}:{port}"
-    for user in users:
+    messages = []
+    for user in users.order_by("pk").iterator():
         context = {
             "username": user.username,
             "host": host,
@@ -41,9 +102,88 @@ def send_new_product_notification(product_id):
         body_text = render_to_string(
             "email/new_product_letter_body.txt", context
         )
-        user.email_user(subject, body_text, fail_silently=False)
+        messages.append(EmailMessage(subject, body_text, to=[user.email]))
 
-        LOGGER.info(
-            f"Sent message to {user.username}'s e-mail about "
-            f"appearance of new movie on blu-ray."
-        )
+    with get_connection(fail_silently=False) as connection:
+        sent = connection.send_messages(messages)
+
+    LOGGER.info(
+        f"Sent {sent} messages to e-mails of users #{first_pk}-#{last_pk} "
+        f"about appearance of new movie on blu-ray."
+    )
+
+
+@celery_app.task
+def refresh_films_rankings(criteria=None):
+    """Function, that is called by 'imdb_rating_value_dispatcher' and
+    'films_rankings_dispatcher' signal handlers.
+
+    Update positions of movies in rankings by selected criteria, or by all
+    criteria if they are not passed, after figures of many movies have
+    been changed or when rankings have not been built yet.
+
+    This is celery task that will run in task queue (keeps in redis) and
+    launch in background.
+    """
+    from .services import update_films_rankings
+
+    LOGGER.info("Run celery task - Refresh films rankings.")
+
+    update_films_rankings(criteria)
+
+
+@celery_app.task
+def update_texts_hyperlinks(name, url_path):
+    """Function, that is called by 'hyperlinks_dispatcher' signal handler.
+
+    Render again hyperlinks in texts of movies, cinema persons and news, which
+    mention name of cinema person or title of movie or contain hyperlink to
+    its page.
+
+    This is celery task that will run in task queue (keeps in redis) and
+    launch in background.
+    """
+    from .services import update_texts_hyperlinks as render_texts_hyperlinks
+
+    LOGGER.info("Run celery task - Update texts hyperlinks.")
+
+    render_texts_hyperlinks(name, url_path)
+
+
+@celery_app.task
+def refresh_homepage_snapshot():
+    """Function, that is called by 'homepage_snapshot_dispatcher' signal
+    handler.
+
+    Build data of carousels of home page for changed data of models in
+    advance, so first visitor doesn't wait for it.
+
+    This is celery task that will run in task queue (keeps in redis) and
+    launch in background.
+    """
+    from .services import update_homepage_snapshot
+
+    LOGGER.info("Run celery task - Refresh homepage snapshot.")
+
+    update_homepage_snapshot()
+
+
+@celery_app.task
+def archive_old_comments():
+    """Function, that is called by 'archive_comments' management command.
+
+    It is called, if command is launched with '--background' option.
+
+    Move old inactive comments to movies, blu-ray movies, news and cinema
+    persons to archive.
+
+    This is celery task that will run in task queue (keeps in redis) and
+    launch in background.
+    """
+    from .services import archive_comments
+
+    LOGGER.info("Run celery task - Archive old comments.")
+
+    archived = archive_comments()
+
+    LOGGER.info(f"Archived comments: {archived}.")
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 from faker import Factory as FakerFactory
 from pytest_factoryboy import register
 
@@ -45,6 +46,11 @@ register(CommentToNewsFactory)
 register(CommentToProductFactory)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture
 def test_film(db):
     cinema_persons = []
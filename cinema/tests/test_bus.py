@@ -0,0 +1,125 @@
+import json
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django_redis.cache import RedisCache
+
+from cinema import (
+    bus,
+    hyperlinks,
+)
+from cinema.bus import (
+    PROCESS_ID,
+    drop_local_caches,
+    handle_message,
+    is_invalidation_bus_enabled,
+    listen_models_changes,
+    register_local_cache,
+)
+from cinema.cache import get_models_version
+from cinema.models import (
+    Film,
+    Genre,
+    News,
+)
+
+
+@pytest.fixture
+def dropped_caches(monkeypatch):
+    dropped = []
+    monkeypatch.setattr(bus, "_local_caches", [])
+    register_local_cache(Film, Genre)(lambda: dropped.append("films"))
+    return dropped
+
+
+def test_drop_local_caches_calls_functions_of_changed_models(dropped_caches):
+    drop_local_caches([News])
+    assert dropped_caches == []
+
+    drop_local_caches([Genre])
+    assert dropped_caches == ["films"]
+
+    drop_local_caches()
+    assert dropped_caches == ["films", "films"]
+
+
+def test_drop_local_caches_changes_versions_of_local_memory_cache():
+    version = get_models_version((Film,))
+    drop_local_caches([Film])
+
+    assert version != get_models_version((Film,))
+
+
+def test_message_of_other_process_drops_local_caches(dropped_caches):
+    handle_message(json.dumps({"sender": "other", "models": ["cinema.film"]}))
+
+    assert dropped_caches == ["films"]
+
+
+def test_message_of_current_process_is_ignored(dropped_caches):
+    handle_message(
+        json.dumps({"sender": PROCESS_ID, "models": ["cinema.film"]})
+    )
+
+    assert dropped_caches == []
+
+
+def test_invalid_message_is_ignored(dropped_caches):
+    handle_message(b"invalid")
+    handle_message(
+        json.dumps({"sender": "other", "models": ["cinema.unknown"]})
+    )
+    handle_message(json.dumps({"sender": "other", "models": [1]}))
+
+    assert dropped_caches == []
+
+
+def test_listener_survives_failure_of_message(mocker):
+    client = mocker.Mock()
+    client.pubsub.return_value.listen.return_value = [
+        {"data": "first"},
+        {"data": "second"},
+    ]
+    mocker.patch.object(
+        bus, "get_redis_client", side_effect=[client, SystemExit]
+    )
+    mocker.patch.object(bus, "drop_local_caches")
+    handle = mocker.patch.object(
+        bus, "handle_message", side_effect=[AttributeError, None]
+    )
+
+    with pytest.raises(SystemExit):
+        listen_models_changes()
+
+    assert [call.args for call in handle.call_args_list] == [
+        ("first",),
+        ("second",),
+    ]
+
+
+@pytest.mark.parametrize(
+    "enabled, cache_class, expected_result",
+    (
+        (1, LocMemCache, True),
+        (0, LocMemCache, False),
+        (1, RedisCache, False),
+    ),
+)
+def test_invalidation_bus_is_enabled_only_for_local_memory_cache(
+    monkeypatch, enabled, cache_class, expected_result
+):
+    monkeypatch.setattr(bus, "INVALIDATION_BUS", enabled)
+    monkeypatch.setattr(bus, "caches", {"default": cache_class("", {})})
+
+    assert is_invalidation_bus_enabled() == expected_result
+
+
+@pytest.mark.django_db
+def test_message_drops_hyperlinks_matcher(film_factory):
+    film_factory(title="Alien")
+    hyperlinks.get_hyperlinks_matcher()
+    film_factory(title="Aliens")
+    handle_message(json.dumps({"sender": "other", "models": ["cinema.film"]}))
+
+    _, _, films_links = hyperlinks.get_hyperlinks_matcher()
+    assert set(films_links) == {"Alien", "Aliens"}
@@ -0,0 +1,243 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from cinema import signals
+from cinema.cache import (
+    cached_data,
+    get_models_version,
+    invalidate_models_cache,
+    invalidate_records_cache,
+)
+from cinema.models import (
+    ArchivedComment,
+    CinemaPerson,
+    Film,
+    Genre,
+    News,
+)
+from cinema.services import get_films_ratings_sets
+from cinema.signals import (
+    cache_invalidation_dispatcher,
+    user_cache_invalidation_dispatcher,
+)
+
+
+def test_models_version_is_kept_between_calls():
+    version = get_models_version((Film, Genre))
+
+    assert version == get_models_version((Film, Genre))
+
+
+def test_models_version_is_built_if_added_version_is_evicted(monkeypatch):
+    monkeypatch.setattr(cache, "add", lambda *args: False)
+    monkeypatch.setattr(cache, "get_many", lambda keys: {})
+
+    version = get_models_version((Film, Genre))
+
+    assert len(version.split(".")) == 2
+
+
+def test_invalidate_models_cache_changes_version_of_selected_models_only():
+    film_version = get_models_version((Film,))
+    news_version = get_models_version((News,))
+    invalidate_models_cache(Film)
+
+    assert film_version != get_models_version((Film,))
+    assert news_version == get_models_version((News,))
+
+
+def test_invalidate_records_cache_changes_version_of_selected_records_only():
+    first_version = get_models_version((Genre,), [(CinemaPerson, 1)])
+    second_version = get_models_version((Genre,), [(CinemaPerson, 2)])
+    invalidate_records_cache(CinemaPerson, 1)
+
+    assert first_version != get_models_version((Genre,), [(CinemaPerson, 1)])
+    assert second_version == get_models_version((Genre,), [(CinemaPerson, 2)])
+
+
+def test_cached_data_computes_result_again_after_invalidation():
+    calls = []
+
+    @cached_data(Film)
+    def build_data(value):
+        calls.append(value)
+        return {"value": value}
+
+    assert build_data(1) == {"value": 1}
+    assert build_data(1) == {"value": 1}
+    assert build_data(2) == {"value": 2}
+    assert calls == [1, 2]
+
+    invalidate_models_cache(Film)
+
+    assert build_data(1) == {"value": 1}
+    assert calls == [1, 2, 1]
+
+
+def test_cached_data_computes_result_of_invalidated_record_only():
+    calls = []
+
+    @cached_data(Genre, records=lambda pk: [(CinemaPerson, pk)])
+    def build_data(pk):
+        calls.append(pk)
+        return pk
+
+    build_data(1)
+    build_data(2)
+    invalidate_records_cache(CinemaPerson, 2)
+    build_data(1)
+    build_data(2)
+
+    assert calls == [1, 2, 2]
+
+
+def test_cached_data_keeps_results_of_keyword_arguments_apart():
+    calls = []
+
+    @cached_data(Film)
+    def build_data(value, factor=1):
+        calls.append((value, factor))
+        return value * factor
+
+    assert build_data(2, factor=3) == 6
+    assert build_data(2, factor=3) == 6
+    assert build_data(2) == 2
+    assert calls == [(2, 3), (2, 1)]
+
+
+def test_cached_data_keeps_results_of_functions_with_same_name_apart():
+    def build_first():
+        @cached_data(Film)
+        def build_data():
+            return "first"
+
+        return build_data
+
+    def build_second():
+        @cached_data(Film)
+        def build_data():
+            return "second"
+
+        return build_data
+
+    assert build_first()() == "first"
+    assert build_second()() == "second"
+
+
+@pytest.mark.django_db
+def test_cache_invalidation_dispatcher_changes_version_of_sender():
+    version = get_models_version((Genre,))
+    cache_invalidation_dispatcher(sender=Genre)
+
+    assert version != get_models_version((Genre,))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_data_cached_before_commit_is_computed_again_after_commit(
+    genre_factory,
+):
+    calls = []
+
+    @cached_data(Genre)
+    def build_genres_names():
+        calls.append(None)
+        return list(Genre.objects.values_list("name", flat=True))
+
+    with transaction.atomic():
+        genre = genre_factory(name="Drama")
+        cache_invalidation_dispatcher(sender=Genre, instance=genre)
+        build_genres_names()
+
+        assert len(calls) == 1
+
+    assert build_genres_names() == ["Drama"]
+    assert len(calls) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_homepage_snapshot_is_refreshed_after_cache_invalidation(
+    monkeypatch, news_factory
+):
+    news = news_factory()
+    versions = []
+    monkeypatch.setattr(
+        signals.refresh_homepage_snapshot,
+        "delay",
+        lambda: versions.append(get_models_version((News,))),
+    )
+    with transaction.atomic():
+        news.delete()
+
+    assert versions == [get_models_version((News,))]
+
+
+@pytest.mark.django_db
+def test_user_cache_invalidation_dispatcher_ignores_saving_with_same_names(
+    django_user_model, user_factory
+):
+    user = user_factory()
+    version = get_models_version((django_user_model,))
+    user_cache_invalidation_dispatcher(
+        sender=django_user_model, instance=user, created=True
+    )
+    user.email = "new@example.com"
+    user.save()
+    user_cache_invalidation_dispatcher(
+        sender=django_user_model, instance=user, created=False
+    )
+    user.first_name = "New"
+    user.save(update_fields=["last_login"])
+    user_cache_invalidation_dispatcher(
+        sender=django_user_model, instance=user, created=False
+    )
+
+    assert version == get_models_version((django_user_model,))
+
+    user.save()
+    user_cache_invalidation_dispatcher(
+        sender=django_user_model, instance=user, created=False
+    )
+
+    assert version != get_models_version((django_user_model,))
+
+
+@pytest.mark.django_db
+def test_deleting_archived_comment_invalidates_cache():
+    comment = ArchivedComment.objects.create(
+        kind="film",
+        comment_id=1,
+        target_id=1,
+        author="author",
+        content="content",
+        created_at=timezone.now(),
+    )
+    version = get_models_version((ArchivedComment,))
+    comment.delete()
+
+    assert version != get_models_version((ArchivedComment,))
+
+
+@pytest.mark.django_db
+def test_m2m_changes_invalidate_cache_of_related_models(
+    film_factory, genre_factory
+):
+    film = film_factory()
+    genre = genre_factory()
+    film_version = get_models_version((Film,))
+    genre_version = get_models_version((Genre,))
+    film.genre.add(genre)
+
+    assert film_version != get_models_version((Film,))
+    assert genre_version != get_models_version((Genre,))
+
+
+@pytest.mark.django_db
+def test_cached_service_does_not_query_database_again(
+    django_assert_num_queries, create_12_films
+):
+    films_ratings_sets = get_films_ratings_sets()
+
+    with django_assert_num_queries(0):
+        assert get_films_ratings_sets() == films_ratings_sets
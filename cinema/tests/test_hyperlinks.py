@@ -0,0 +1,117 @@
+import re
+
+import pytest
+from django.urls import reverse
+
+from cinema.cache import invalidate_models_cache
+from cinema.hyperlinks import (
+    get_hyperlinks_matcher,
+    get_text_hyperlinks,
+    get_texts_hyperlinks,
+    get_trie_pattern,
+)
+from cinema.models import (
+    CinemaPerson,
+    Film,
+)
+
+
+def test_get_trie_pattern_matches_longest_word():
+    pattern = re.compile(get_trie_pattern(("The Dark", "The Dark Knight")))
+
+    assert pattern.match("The Dark Knight Rises").group() == "The Dark Knight"
+    assert pattern.match("The Darkest Hour").group() == "The Dark"
+    assert pattern.match("Dark") is None
+
+
+def test_get_trie_pattern_without_words_matches_nothing():
+    assert re.search(get_trie_pattern(()), "any text") is None
+
+
+@pytest.mark.django_db
+class TestGetTextHyperlinks:
+    def test_replaces_names_and_titles_with_hyperlinks(
+        self, cinema_person_factory, film_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Tom", user__last_name="Hanks"
+        )
+        film = film_factory(title="Forrest Gump")
+        person_url = reverse("cinema:movie-person-detail", args=(person.pk,))
+        film_url = reverse("cinema:film-detail", args=(film.pk,))
+        text = "TOM HANKS starred in Forrest Gump, tom hanks won Oscar."
+        invalidate_models_cache(CinemaPerson, Film)
+
+        assert get_text_hyperlinks(text) == (
+            f"<a href='{person_url}'>Tom Hanks</a> starred in "
+            f"<a href='{film_url}'>Forrest Gump</a>, "
+            f"<a href='{person_url}'>Tom Hanks</a> won Oscar."
+        )
+
+    def test_replaces_single_name_of_person(self, cinema_person_factory):
+        person = cinema_person_factory(
+            user__first_name="Madonna", user__last_name=""
+        )
+        person_url = reverse("cinema:movie-person-detail", args=(person.pk,))
+        invalidate_models_cache(CinemaPerson)
+
+        assert get_text_hyperlinks("Madonna sings.") == (
+            f"<a href='{person_url}'>Madonna</a> sings."
+        )
+
+    def test_skips_person_without_name(self, cinema_person_factory):
+        cinema_person_factory(user__first_name="", user__last_name="")
+        invalidate_models_cache(CinemaPerson)
+        text = "Madonna sings. \nTom Hanks"
+
+        assert get_text_hyperlinks(text) == text
+
+    def test_matches_whole_words_and_exact_titles_only(self, film_factory):
+        film_factory(title="Up")
+        invalidate_models_cache(Film)
+        text = "Upgrade is not up."
+
+        assert get_text_hyperlinks(text) == text
+
+    def test_prefers_longest_title(self, film_factory):
+        film_factory(title="The Godfather")
+        film = film_factory(title="The Godfather Part II")
+        film_url = reverse("cinema:film-detail", args=(film.pk,))
+        invalidate_models_cache(Film)
+
+        assert get_text_hyperlinks("The Godfather Part II") == (
+            f"<a href='{film_url}'>The Godfather Part II</a>"
+        )
+
+    def test_matcher_is_built_again_after_changing_films(
+        self, django_assert_num_queries, film_factory
+    ):
+        film_factory(title="Alien")
+        get_hyperlinks_matcher()
+
+        with django_assert_num_queries(0):
+            get_hyperlinks_matcher()
+
+        film_factory(title="Aliens")
+        invalidate_models_cache(Film)
+
+        with django_assert_num_queries(2):
+            _, _, films_links = get_hyperlinks_matcher()
+
+        assert set(films_links) == {"Alien", "Aliens"}
+
+    def test_get_texts_hyperlinks_shares_matcher_between_texts(
+        self, django_assert_num_queries, film_factory
+    ):
+        film = film_factory(title="Alien")
+        film_url = reverse("cinema:film-detail", args=(film.pk,))
+        invalidate_models_cache(Film)
+
+        with django_assert_num_queries(2):
+            texts = get_texts_hyperlinks(["Alien", "No film", "Alien 3"])
+
+        assert texts == [
+            f"<a href='{film_url}'>Alien</a>",
+            "No film",
+            f"<a href='{film_url}'>Alien</a> 3",
+        ]
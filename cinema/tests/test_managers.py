@@ -1,14 +1,24 @@
 from datetime import date
+from importlib import import_module
 
 import pytest
+from django.db import connection
+from django.db.migrations import RunSQL
 
 from cinema.models import (
     CinemaFilmPersonProfession,
     CinemaPerson,
+    Country,
+    Distributor,
     Film,
+    FilmRanking,
+    Genre,
+    Language,
+    MpaaRating,
     News,
     Product,
 )
+from cinema.references import get_reference_pk
 
 
 @pytest.mark.django_db
@@ -54,6 +64,89 @@ class TestCinemaPersonManager:
         for item in result:
             assert search_word in item.fullname
 
+    def test_filter_by_search_word_finds_names_with_typos(
+        self, cinema_person_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Steven",
+            user__last_name="Spielberg",
+        )
+        cinema_person_factory(
+            user__first_name="Steven",
+            user__last_name="Seagal",
+        )
+        cinema_person_factory(
+            user__first_name="Al",
+            user__last_name="Pacino",
+        )
+        result = CinemaPerson.persons.filter_by_search_word("Steven Spielburg")
+
+        assert len(result) == 2
+        assert result[0] == person
+
+    @pytest.mark.parametrize("search_word", ["Sc", "di"])
+    def test_filter_by_search_word_finds_names_by_short_prefix(
+        self, cinema_person_factory, search_word
+    ):
+        cinema_person_factory(
+            user__first_name="Martin", user__last_name="Scorsese"
+        )
+        cinema_person_factory(
+            user__first_name="Leonardo", user__last_name="DiCaprio"
+        )
+        cinema_person_factory(user__first_name="Al", user__last_name="Pacino")
+
+        result = CinemaPerson.persons.filter_by_search_word(search_word)
+
+        assert len(result) == 1
+        assert result[0].user.last_name.lower().startswith(search_word.lower())
+
+    def test_filter_by_search_word_uses_indexes_of_names(self):
+        # Prefix indexes are created by migration, which is not applied with
+        # tables created by '--no-migrations' option
+        migration = import_module(
+            "accounts.migrations.0004_user_names_trigram_indexes"
+        )
+        with connection.cursor() as cursor:
+            for operation in migration.Migration.operations:
+                if isinstance(operation, RunSQL):
+                    cursor.execute(operation.sql)
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+
+        plan = CinemaPerson.persons.filter_by_search_word("Sc").explain()
+
+        assert "Seq Scan on auth_user" not in plan
+        for index in ("trgm", "upper_like"):
+            assert f"auth_user_first_name_{index}" in plan
+            assert f"auth_user_last_name_{index}" in plan
+
+    def test_filter_mentioned_in(self, cinema_person_factory):
+        person = cinema_person_factory(
+            user__first_name="Tom",
+            user__last_name="Hanks",
+        )
+        cinema_person_factory(
+            user__first_name="Tom",
+            user__last_name="Cruise",
+        )
+        cinema_person_factory(user__first_name="", user__last_name="")
+        result = CinemaPerson.persons.filter_mentioned_in(
+            "Tom Hanks and tom cruise"
+        )
+
+        assert list(result) == [person]
+
+    def test_filter_mentioned_in_matches_single_name(
+        self, cinema_person_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="", user__last_name="Madonna"
+        )
+        result = CinemaPerson.persons.filter_mentioned_in("Madonna returns")
+
+        assert list(result) == [person]
+
     def test_get_related_data(
         self,
         cinema_film_person_profession_factory,
@@ -123,10 +216,15 @@ class TestFilmManager:
         film_factory.create_batch(3, genre=(genre_1,))
         film_factory.create_batch(5, genre=(genre_2,))
         film_factory.create_batch(8, genre=(genre_3,))
-        result = Film.films.filter_by_selected_genre("Comedy")
+        result = Film.films.filter_by_selected_genre(genre_2.pk)
 
         assert len(result) == 5
 
+    def test_filter_by_unknown_genre_returns_no_films(self, film_factory):
+        film_factory.create_batch(3)
+
+        assert not Film.films.filter_by_selected_genre(None).exists()
+
     def test_filter_by_selected_country(self, film_factory, country_factory):
         country_1 = country_factory(name="France")
         country_2 = country_factory(name="USA")
@@ -134,7 +232,7 @@ class TestFilmManager:
         film_factory.create_batch(3, country=(country_1,))
         film_factory.create_batch(5, country=(country_2,))
         film_factory.create_batch(8, country=(country_3,))
-        result = Film.films.filter_by_selected_country("USA")
+        result = Film.films.filter_by_selected_country(country_2.pk)
 
         assert len(result) == 5
 
@@ -145,7 +243,7 @@ class TestFilmManager:
         film_factory.create_batch(3, language=(language_1,))
         film_factory.create_batch(5, language=(language_2,))
         film_factory.create_batch(8, language=(language_3,))
-        result = Film.films.filter_by_selected_language("Spain")
+        result = Film.films.filter_by_selected_language(language_2.pk)
 
         assert len(result) == 5
 
@@ -160,7 +258,7 @@ class TestFilmManager:
         film_factory.create_batch(3, distributor=(distributor_1,))
         film_factory.create_batch(5, distributor=(distributor_2,))
         film_factory.create_batch(8, distributor=(distributor_3,))
-        result = Film.films.filter_by_selected_distributor("Paramount Pictures")
+        result = Film.films.filter_by_selected_distributor(distributor_2.pk)
 
         assert len(result) == 5
 
@@ -190,9 +288,9 @@ class TestFilmManager:
 
     def test_filter_by_search_word(self, film_factory):
         search_word = "Dark"
-        film_factory(title="The Dark Knight")
-        film_factory(title="Schindler's List")
-        film_factory(title="The Dark Knight Rises")
+        film_factory(title="The Dark Knight", description="Drama.")
+        film_factory(title="Schindler's List", description="Drama.")
+        film_factory(title="The Dark Knight Rises", description="Drama.")
         result = Film.films.filter_by_search_word(search_word)
 
         assert len(result) == 2
@@ -200,55 +298,158 @@ class TestFilmManager:
         for item in result:
             assert search_word in item.title
 
-    def test_get_related_data(
+    def test_filter_by_search_word_ranks_title_above_description(
+        self, film_factory
+    ):
+        film_1 = film_factory(
+            title="Schindler's List", description="Nazi Germany epic."
+        )
+        film_2 = film_factory(title="Germany Year Zero", description="Rome.")
+        film_factory(title="The Dark Knight", description="Gotham city.")
+        result = Film.films.filter_by_search_word("german")
+
+        assert list(result) == [film_2, film_1]
+
+    def test_get_related_values(
         self,
         film_factory,
         country_factory,
         genre_factory,
-        language_factory,
-        news_factory,
     ):
-        country_1 = country_factory()
-        country_2 = country_factory()
+        country_1 = country_factory(name="USA")
+        country_2 = country_factory(name="UK")
         genre_1 = genre_factory()
         genre_2 = genre_factory()
-        language_1 = language_factory()
-        language_2 = language_factory()
         film_1 = film_factory(
-            country=(country_1,),
-            genre=(genre_1,),
-            language=(language_1,),
+            country=(country_1, country_2),
+            genre=(genre_1, genre_2),
         )
-        film_2 = film_factory(
-            country=(country_2,),
-            genre=(genre_2,),
-            language=(language_2,),
-        )
-        news_1 = news_factory(film=(film_1,))
-        news_2 = news_factory(film=(film_2,))
+        film_factory(country=(country_1,), genre=(genre_1,))
         expected_data = [
-            {
-                "pk": film_1.pk,
-                "country__name": country_1.name,
-                "genre__name": genre_1.name,
-                "language__name": language_1.name,
-                "news__title": news_1.title,
-            },
-            {
-                "pk": film_2.pk,
-                "country__name": country_2.name,
-                "genre__name": genre_2.name,
-                "language__name": language_2.name,
-                "news__title": news_2.title,
-            },
+            {"pk": film_1.pk, "country__name": country_2.name},
+            {"pk": film_1.pk, "country__name": country_1.name},
         ]
-        result = Film.films.get_related_data(
-            ("country__name", "genre__name", "language__name"),
-        ).order_by("pk")
+        result = Film.films.get_related_values(
+            (film_1.pk,), "country__name"
+        ).order_by("country__name")
 
         assert len(result) == 2
         assert expected_data == list(map(lambda x: x._asdict(), result))
 
+    def test_order_by_ranking(self, film_factory):
+        films = film_factory.create_batch(3)
+        for position, film in enumerate(reversed(films), start=1):
+            FilmRanking.objects.create(
+                criterion="budget", position=position, film=film
+            )
+        FilmRanking.objects.create(
+            criterion="usa_gross", position=1, film=films[0]
+        )
+        result = Film.films.order_by_ranking("budget")
+
+        assert list(result) == films[::-1]
+
+
+@pytest.fixture
+def create_browse_catalogue(create_12_films):
+    # Browse indexes are created by migration, which is not applied with
+    # tables created by '--no-migrations' option
+    migration = import_module("cinema.migrations.0009_browse_indexes")
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for operation in migration.Migration.operations:
+            if isinstance(operation, RunSQL):
+                cursor.execute(operation.sql)
+    # Planner prefers sequential scans of small tables, so the catalogue
+    # is filled up to make the indexes worth using
+    template = Film.objects.order_by("pk").first()
+    mpaa_rating = MpaaRating.objects.create(value="X", description="X")
+    films = Film.objects.bulk_create(
+        Film(
+            title=f"Movie {number}",
+            run_time=template.run_time,
+            description="",
+            release_data=date(1900 + number % 100, 1, 1),
+            imdb_rating=template.imdb_rating,
+            imdb_rating_value=template.imdb_rating_value,
+            mpaa_rating=mpaa_rating,
+        )
+        for number in range(2000)
+    )
+    relations = ("genre", "country", "language", "distributor")
+    for model, relation in zip(
+        (Genre, Country, Language, Distributor), relations
+    ):
+        references = model.objects.bulk_create(
+            model(name=f"Browse {number}") for number in range(20)
+        )
+        through = getattr(Film, relation).through
+        through.objects.bulk_create(
+            through(
+                film_id=film.pk,
+                **{f"{relation}_id": references[index % 20].pk},
+            )
+            for index, film in enumerate(films)
+        )
+    tables = ["cinema_film"] + [f"cinema_film_{name}" for name in relations]
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {', '.join(tables)}")
+    yield
+    # Row counts collected by ANALYZE outlive rollback of test transaction,
+    # so they are collected again without the catalogue
+    films_pk = [film.pk for film in films]
+    with connection.cursor() as cursor:
+        for table in tables[1:]:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE film_id = ANY(%s)", [films_pk]
+            )
+        cursor.execute("DELETE FROM cinema_film WHERE id = ANY(%s)", [films_pk])
+        cursor.execute(f"ANALYZE {', '.join(tables)}")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "method_name, get_value, index_name",
+    (
+        (
+            "filter_by_selected_year",
+            lambda: 2020,
+            "cinema_film_release_id_idx",
+        ),
+        (
+            "filter_by_selected_genre",
+            lambda: get_reference_pk(Genre, "Drama"),
+            "cinema_film_genre_browse_idx",
+        ),
+        (
+            "filter_by_selected_country",
+            lambda: get_reference_pk(Country, "USA"),
+            "cinema_film_country_browse_idx",
+        ),
+        (
+            "filter_by_selected_language",
+            lambda: get_reference_pk(Language, "English"),
+            "cinema_film_language_browse_idx",
+        ),
+        (
+            "filter_by_selected_distributor",
+            lambda: get_reference_pk(Distributor, "Columbia Pictures"),
+            "cinema_film_distributor_browse_idx",
+        ),
+        (
+            "filter_by_selected_mpaa_rating",
+            lambda: Film.objects.order_by("pk").first().mpaa_rating_id,
+            "cinema_film_mpaa_rating_id_",
+        ),
+    ),
+)
+def test_browse_queries_use_indexes(
+    create_browse_catalogue, method_name, get_value, index_name
+):
+    plan = getattr(Film.films, method_name)(get_value()).explain()
+
+    assert index_name in plan
+
 
 @pytest.mark.django_db
 class TestCinemaFilmPersonProfessionManager:
@@ -296,6 +497,22 @@ class TestCinemaFilmPersonProfessionManager:
         assert len(result) == 2
         assert expected_data == list(map(lambda x: x._asdict(), result))
 
+    def test_get_full_cast_of_selected_films(
+        self,
+        film_factory,
+        cinema_film_person_profession_factory,
+    ):
+        film_1 = film_factory()
+        film_2 = film_factory()
+        cinema_film_person_profession_factory.create_batch(2, film=film_1)
+        cinema_film_person_profession_factory.create_batch(3, film=film_2)
+        result = CinemaFilmPersonProfession.cfppm.get_full_cast((film_2.pk,))
+
+        assert len(result) == 3
+
+        for item in result:
+            assert item.film__pk == film_2.pk
+
 
 @pytest.mark.django_db
 class TestNewsManager:
@@ -310,17 +527,49 @@ class TestNewsManager:
         assert len(result) == 2
         assert expected_data == list(map(lambda x: x._asdict(), result))
 
-    def test_get_news_about_celebrities(self, news_factory):
+    def test_get_news_about_celebrities(
+        self, news_factory, cinema_person_factory
+    ):
+        person = cinema_person_factory()
         news_1 = news_factory()
         news_2 = news_factory()
-        news_3 = news_factory()
-        expected_data = [news_1, news_2, news_3]
-        result = News.news.get_news_about_celebrities(
-            (news_1.pk, news_2.pk, news_3.pk),
-        ).order_by("pk")
-        assert len(result) == 3
+        news_factory()
+        news_1.mentioned_persons.add(person)
+        news_2.mentioned_persons.add(person, cinema_person_factory())
+        expected_data = [news_1, news_2]
+        result = News.news.get_news_about_celebrities().order_by("pk")
+        assert len(result) == 2
         assert expected_data == list(result)
 
+    def test_filter_mentioning(self, cinema_person_factory, news_factory):
+        person = cinema_person_factory(
+            user__first_name="Tom", user__last_name="Hanks"
+        )
+        news = news_factory(title="Tom Hanks returns")
+        news_factory(title="tom hanks returns")
+        news_factory(title="Tom Cruise returns")
+        result = News.news.filter_mentioning(person)
+
+        assert list(result) == [news]
+
+    def test_filter_mentioning_matches_single_name(
+        self, cinema_person_factory, news_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Madonna", user__last_name=""
+        )
+        news = news_factory(title="Madonna returns")
+
+        assert list(News.news.filter_mentioning(person)) == [news]
+
+    def test_filter_mentioning_skips_person_without_names(
+        self, cinema_person_factory, news_factory
+    ):
+        person = cinema_person_factory(user__first_name="", user__last_name="")
+        news_factory(title="Madonna returns")
+
+        assert not News.news.filter_mentioning(person).exists()
+
     def test_filter_by_search_word(self, news_factory):
         search_word = "Quentin Tarantino"
         news_factory(
@@ -385,9 +634,15 @@ class TestProductManager:
 
     def test_filter_by_search_word(self, product_factory):
         search_word = "Dark"
-        product_factory(film__title="The Dark Knight")
-        product_factory(film__title="Schindler's List")
-        product_factory(film__title="The Dark Knight Rises")
+        product_factory(
+            film__title="The Dark Knight", film__description="Drama."
+        )
+        product_factory(
+            film__title="Schindler's List", film__description="Drama."
+        )
+        product_factory(
+            film__title="The Dark Knight Rises", film__description="Drama."
+        )
         result = Product.products.filter_by_search_word(search_word)
 
         assert len(result) == 2
@@ -1,8 +1,19 @@
 from datetime import date
+from decimal import Decimal
 
 import pytest
+from django.db import (
+    connection,
+    transaction,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
+from accounts.models import User
+from cinema import signals
+from cinema.cache import invalidate_models_cache
 from cinema.models import (
+    RANKING_FIELDS,
     CinemaFilmPersonProfession,
     CinemaPerson,
     CinemaProfession,
@@ -13,6 +24,7 @@ from cinema.models import (
     Country,
     Distributor,
     Film,
+    FilmRanking,
     Genre,
     ImdbRating,
     Language,
@@ -24,6 +36,15 @@ from cinema.models import (
     upload_to_cinema_person,
     upload_to_film,
 )
+from cinema.signals import (
+    comments_count_dispatcher,
+    films_rankings_dispatcher,
+    hyperlinks_dispatcher,
+    imdb_rating_value_dispatcher,
+    news_mentions_dispatcher,
+    person_mentions_dispatcher,
+    user_names_dispatcher,
+)
 
 
 @pytest.mark.django_db
@@ -403,6 +424,7 @@ class TestCinemaPersonModel:
         ("birthday", "birthday"),
         ("user", "user"),
         ("bio", "bio"),
+        ("bio_html", "bio html"),
         ("oscar_awards", "oscar awards"),
         ("avatar", "avatar"),
     )
@@ -589,10 +611,12 @@ class TestFilmModel:
         ("world_gross", "world gross"),
         ("run_time", "run time"),
         ("description", "description"),
+        ("description_html", "description html"),
         ("release_data", "release data"),
         ("language", "language"),
         ("distributor", "distributor"),
         ("imdb_rating", "imdb rating"),
+        ("imdb_rating_value", "imdb rating value"),
         ("mpaa_rating", "mpaa rating"),
         ("oscar_awards", "oscar awards"),
         ("poster", "poster"),
@@ -607,6 +631,7 @@ class TestFilmModel:
         ("budget", "blank", True),
         ("usa_gross", "default", 0),
         ("world_gross", "default", 0),
+        ("imdb_rating_value", "db_index", True),
         ("mpaa_rating", "default", 1),
         ("oscar_awards", "default", 0),
         ("poster", "blank", True),
@@ -682,6 +707,150 @@ class TestFilmModel:
         expected_data = f"films/{film.title}_{film.pk}.jpg"
         assert upload_to_film(film, "") == expected_data
 
+    def test_imdb_rating_value_is_copied_on_saving(
+        self, film_factory, imdb_rating_factory
+    ):
+        film = film_factory(imdb_rating__value=7.5)
+        assert film.imdb_rating_value == Decimal("7.5")
+
+        film.imdb_rating = imdb_rating_factory(value=8.1)
+        film.save()
+        film.refresh_from_db()
+        assert film.imdb_rating_value == Decimal("8.1")
+
+    def test_imdb_rating_value_is_updated_after_changing_rating(
+        self, film_factory
+    ):
+        film = film_factory(imdb_rating__value=7.5)
+        imdb_rating = film.imdb_rating
+        imdb_rating.value = Decimal("7.7")
+        imdb_rating.save()
+        imdb_rating_value_dispatcher(sender=ImdbRating, instance=imdb_rating)
+
+        film.refresh_from_db()
+        assert film.imdb_rating_value == Decimal("7.7")
+
+    def test_rankings_are_updated_only_for_changed_figures(
+        self, monkeypatch, film_factory
+    ):
+        updated_criteria = []
+        monkeypatch.setattr(
+            signals,
+            "update_film_rankings",
+            lambda film_pk, criteria: updated_criteria.append(criteria),
+        )
+        film = film_factory(budget=100)
+        film.budget = 200
+        film.title = "New title"
+        film.save()
+        films_rankings_dispatcher(sender=Film, instance=film)
+
+        film.title = "Other title"
+        film.save()
+        films_rankings_dispatcher(sender=Film, instance=film)
+
+        films_rankings_dispatcher(
+            sender=Film, instance=Film.objects.get(pk=film.pk)
+        )
+
+        assert updated_criteria == [
+            ["budget"],
+            ["imdb_rating", "budget", "usa_gross", "world_gross"],
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rankings_not_built_yet_are_refreshed_by_task_after_commit(
+        self, monkeypatch, film_factory
+    ):
+        refreshed_criteria = []
+        monkeypatch.setattr(
+            signals.refresh_films_rankings,
+            "delay",
+            lambda criteria: refreshed_criteria.append(criteria),
+        )
+        film = film_factory(budget=100)
+        with transaction.atomic():
+            films_rankings_dispatcher(
+                sender=Film, instance=Film.objects.get(pk=film.pk)
+            )
+
+            assert refreshed_criteria == []
+
+        assert refreshed_criteria == [list(RANKING_FIELDS)]
+        assert not FilmRanking.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_texts_hyperlinks_are_updated_only_after_renaming(
+        self, monkeypatch, film_factory
+    ):
+        updated_names = []
+        monkeypatch.setattr(
+            signals.update_texts_hyperlinks,
+            "delay",
+            lambda name, url_path: updated_names.append(name),
+        )
+        film = film_factory(title="Old title")
+        with transaction.atomic():
+            film.budget = 200
+            film.save()
+            hyperlinks_dispatcher(sender=Film, instance=film, created=False)
+
+            film.title = "New title"
+            film.save()
+            hyperlinks_dispatcher(sender=Film, instance=film, created=False)
+
+        assert updated_names == ["New title"]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_texts_hyperlinks_are_updated_only_after_changing_user_names(
+        self, monkeypatch, cinema_person
+    ):
+        updated_names = []
+        monkeypatch.setattr(
+            signals.update_texts_hyperlinks,
+            "delay",
+            lambda name, url_path: updated_names.append(name),
+        )
+        user = cinema_person.user
+        with transaction.atomic():
+            user.email = "new@example.com"
+            user.save()
+            user_names_dispatcher(User, user)
+
+            user.last_name = "Hanks"
+            user.save()
+            user_names_dispatcher(User, user)
+
+        assert updated_names == [cinema_person.fullname]
+
+    def test_description_html_is_rendered_on_saving(
+        self, cinema_person_factory, film_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Tom", user__last_name="Hanks"
+        )
+        invalidate_models_cache(CinemaPerson)
+        film = film_factory(description="Starring Tom Hanks.")
+        person_url = reverse("cinema:movie-person-detail", args=(person.pk,))
+        assert film.description_html == (
+            f"Starring <a href='{person_url}'>Tom Hanks</a>."
+        )
+
+    def test_saved_film_is_selected_once_before_saving(self, film_factory):
+        film = film_factory()
+        film.title = "New title"
+        with CaptureQueriesContext(connection) as context:
+            film.save()
+
+        selects_of_film = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "cinema_film" WHERE' in query["sql"]
+        ]
+        assert len(selects_of_film) == 1
+        assert film._changed_criteria == []
+
 
 @pytest.mark.django_db
 class TestCinemaFilmPersonProfessionModel:
@@ -769,6 +938,7 @@ class TestNewsModel:
     label_arg_values = (
         ("title", "title"),
         ("description", "description"),
+        ("description_html", "description html"),
         ("news_source", "news source"),
         ("news_author", "news author"),
         ("film", "film"),
@@ -787,6 +957,7 @@ class TestNewsModel:
         ("news_author", "max_length", 64),
         ("film", "blank", True),
         ("cinema_person", "blank", True),
+        ("mentioned_persons", "blank", True),
         ("news_feed_photo", "blank", True),
         ("news_feed_photo", "null", True),
         ("news_detail_photo", "blank", True),
@@ -869,6 +1040,40 @@ class TestNewsModel:
         expected_data = f"cinema_news_detail/{news.title}_{news.pk}.jpg"
         assert upload_photo_to_news_detail(news, "") == expected_data
 
+    def test_mentioned_persons_are_kept_on_saving(
+        self, cinema_person_factory, news_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Tom", user__last_name="Hanks"
+        )
+        cinema_person_factory()
+        news = news_factory(title="Tom Hanks returns")
+        news_mentions_dispatcher(News, news)
+
+        assert list(news.mentioned_persons.all()) == [person]
+
+        person.user.last_name = "Cruise"
+        person.user.save()
+        user_names_dispatcher(User, person.user)
+
+        assert not news.mentioned_persons.exists()
+
+    def test_single_word_name_is_matched_same_way_from_both_sides(
+        self, cinema_person_factory, news_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Madonna", user__last_name=""
+        )
+        news = news_factory(title="Madonna returns")
+        person_mentions_dispatcher(CinemaPerson, person)
+
+        assert list(person.mentioned_news.all()) == [news]
+
+        news.mentioned_persons.clear()
+        news_mentions_dispatcher(News, news)
+
+        assert list(person.mentioned_news.all()) == [news]
+
 
 @pytest.mark.django_db
 class TestProductModel:
@@ -1121,6 +1326,67 @@ class TestCommentToFilmModel:
     def test_model_ordering(self, comment_to_film):
         assert comment_to_film._meta.ordering == ["-created_at"]
 
+    def test_comments_count_of_film_follows_moderation(
+        self, comment_to_film_factory, film_factory
+    ):
+        film = film_factory()
+        comment = comment_to_film_factory(film=film)
+        comments_count_dispatcher(sender=CommentToFilm, instance=comment)
+        film.refresh_from_db()
+        assert film.comments_count == 1
+
+        comment.is_active = False
+        comment.save()
+        comments_count_dispatcher(sender=CommentToFilm, instance=comment)
+        film.refresh_from_db()
+        assert film.comments_count == 0
+
+        comment.is_active = True
+        comment.save()
+        comments_count_dispatcher(sender=CommentToFilm, instance=comment)
+        comment.save()
+        comments_count_dispatcher(sender=CommentToFilm, instance=comment)
+        film.refresh_from_db()
+        assert film.comments_count == 1
+
+    def test_comments_count_of_film_decreases_after_deleting_comment(
+        self, comment_to_film_factory, film_factory
+    ):
+        film = film_factory()
+        comment = comment_to_film_factory(film=film)
+        inactive_comment = comment_to_film_factory(film=film, is_active=False)
+        Film.objects.filter(pk=film.pk).update(comments_count=1)
+        inactive_comment.delete()
+        comment.delete()
+
+        film.refresh_from_db()
+        assert film.comments_count == 0
+
+    def test_saving_film_keeps_comments_count(self, film_factory):
+        film = film_factory()
+        Film.objects.filter(pk=film.pk).update(comments_count=3)
+        film.title = "New title"
+        film.save()
+
+        film.refresh_from_db()
+        assert film.title == "New title"
+        assert film.comments_count == 3
+
+    def test_deleting_film_doesnt_update_comments_count(
+        self, comment_to_film_factory, film_factory
+    ):
+        film = film_factory()
+        comment_to_film_factory.create_batch(3, film=film)
+        with CaptureQueriesContext(connection) as context:
+            film.delete()
+
+        assert not [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "cinema_film"')
+        ]
+        assert not CommentToFilm.objects.exists()
+
 
 @pytest.mark.django_db
 class TestCommentToNewsModel:
@@ -0,0 +1,306 @@
+import pytest
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cinema import pagination
+from cinema.models import (
+    Film,
+    Genre,
+    News,
+    Product,
+)
+from cinema.pagination import (
+    CachedCountPaginator,
+    KeysetPaginator,
+    encode_cursor,
+    get_queryset_models,
+)
+from cinema.services import update_films_rankings
+
+
+def get_all_pages(paginator):
+    pages = [paginator.page()]
+    while pages[-1].has_next():
+        pages.append(paginator.page(pages[-1].next_cursor))
+    return pages
+
+
+@pytest.mark.django_db
+class TestKeysetPaginator:
+    def test_pages_follow_ordering_with_ties_and_nulls(self, film_factory):
+        for budget in (300, 100, 100, None, 200, 100, None):
+            film_factory(budget=budget)
+        paginator = KeysetPaginator(Film.objects.all(), 3, ("-budget", "-pk"))
+
+        pages = get_all_pages(paginator)
+
+        expected = list(
+            Film.objects.order_by(F("budget").desc(nulls_last=True), "-pk")
+        )
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [film for page in pages for film in page] == expected
+        assert not pages[0].has_previous()
+
+    def test_previous_cursor_returns_preceding_page(self, film_factory):
+        for budget in (300, 100, 100, None, 200, 100, None):
+            film_factory(budget=budget)
+        paginator = KeysetPaginator(Film.objects.all(), 3, ("-budget", "-pk"))
+        pages = get_all_pages(paginator)
+
+        previous_page = paginator.page(pages[2].previous_cursor)
+        first_page = paginator.page(previous_page.previous_cursor)
+
+        assert list(previous_page) == list(pages[1])
+        assert list(first_page) == list(pages[0])
+        assert previous_page.has_next() and previous_page.has_previous()
+        assert not first_page.has_previous()
+
+    def test_ordering_of_queryset_is_replaced(self, news_factory):
+        news_factory.create_batch(5)
+        paginator = KeysetPaginator(
+            News.objects.order_by("title"), 2, ("-created_at", "-pk")
+        )
+
+        pages = get_all_pages(paginator)
+
+        assert [news for page in pages for news in page] == list(
+            News.objects.order_by("-created_at", "-pk")
+        )
+
+    def test_page_is_fetched_by_single_query(
+        self, django_assert_num_queries, film_factory
+    ):
+        film_factory.create_batch(7)
+        paginator = KeysetPaginator(Film.objects.all(), 3, ("title", "pk"))
+        cursor = get_all_pages(paginator)[1].next_cursor
+
+        with django_assert_num_queries(1):
+            assert len(paginator.page(cursor)) == 1
+
+    @pytest.mark.parametrize(
+        "queryset, ordering, keys",
+        (
+            (
+                Film.objects.all(),
+                ("-budget", "-pk"),
+                [(True, True), (True, False)],
+            ),
+            (
+                Film.films.order_by_ranking("budget"),
+                ("rankings__position",),
+                [(False, False)],
+            ),
+            (
+                Product.objects.all(),
+                ("film__title", "film__pk"),
+                [(False, False), (False, False)],
+            ),
+        ),
+    )
+    def test_directions_and_nullability_of_keys(self, queryset, ordering, keys):
+        paginator = KeysetPaginator(queryset, 3, ordering)
+
+        assert [key[1:] for key in paginator.keys] == keys
+
+    def test_page_cursor_selects_page_by_number(self, film_factory):
+        film_factory.create_batch(7)
+        paginator = KeysetPaginator(Film.objects.all(), 3, ("title", "pk"))
+        pages = get_all_pages(paginator)
+
+        assert paginator.get_page_cursor(1) is None
+        assert list(paginator.page(paginator.get_page_cursor(3))) == list(
+            pages[2]
+        )
+        with pytest.raises(InvalidPage):
+            paginator.get_page_cursor(4)
+
+    def test_invalid_cursor_raises_error(self):
+        paginator = KeysetPaginator(Film.objects.all(), 3, ("title", "pk"))
+
+        with pytest.raises(InvalidPage):
+            paginator.page("invalid")
+
+    @pytest.mark.parametrize(
+        "values", [["not a number", 1], [100, "not a number"], [[1], 1]]
+    )
+    def test_tampered_cursor_raises_error(self, values):
+        paginator = KeysetPaginator(Film.objects.all(), 3, ("-budget", "-pk"))
+
+        with pytest.raises(InvalidPage):
+            paginator.page(encode_cursor("next", values))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "get_queryset, ordering",
+    (
+        (lambda: Film.films.all(), ("title", "pk")),
+        (lambda: Film.films.all(), ("-imdb_rating_value", "-pk")),
+        (lambda: Film.films.all(), ("-usa_gross", "-pk")),
+        (lambda: Film.films.all(), ("-world_gross", "-pk")),
+        (
+            lambda: Film.films.order_by_ranking("budget"),
+            ("rankings__position",),
+        ),
+        (lambda: News.objects.all(), ("-created_at", "-pk")),
+        (
+            lambda: Product.products.order_by_name(),
+            ("film__title", "film__pk"),
+        ),
+        (
+            lambda: Product.products.order_by_imdb_rating(),
+            ("-film__imdb_rating_value", "-film__pk"),
+        ),
+        (
+            lambda: Product.products.order_by_release_data(),
+            ("-film__release_data", "-film__pk"),
+        ),
+    ),
+)
+def test_deep_page_is_read_from_index(
+    create_12_films_products_news, get_queryset, ordering
+):
+    update_films_rankings(["budget"])
+    paginator = KeysetPaginator(get_queryset(), 3, ordering)
+    cursor = paginator.page().next_cursor
+
+    with CaptureQueriesContext(connection) as context:
+        paginator.page(cursor)
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_sort = off")
+        cursor.execute(f"EXPLAIN {context.captured_queries[0]['sql']}")
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+
+    assert "Sort" not in plan
+    assert "Seq Scan" not in plan
+
+
+@pytest.mark.django_db
+class TestCachedCountPaginator:
+    def test_queryset_models_include_joined_models(self):
+        queryset = Film.objects.filter(genre__name="Drama")
+
+        assert get_queryset_models(queryset) == [
+            Film,
+            Film.genre.through,
+            Genre,
+        ]
+
+    def test_count_is_kept_in_cache_until_models_are_changed(
+        self, django_assert_num_queries, create_12_films
+    ):
+        queryset = Film.films.filter_by_selected_genre(
+            Genre.objects.get(name="Drama").pk
+        )
+        assert CachedCountPaginator(queryset, 8).count == 6
+
+        with django_assert_num_queries(0):
+            assert CachedCountPaginator(queryset, 8).count == 6
+
+        Genre.objects.get(name="Drama").film_set.add(
+            Film.objects.exclude(genre__name="Drama").first()
+        )
+
+        assert CachedCountPaginator(queryset, 8).count == 7
+
+    def test_estimated_count_is_used_above_threshold(
+        self, monkeypatch, django_assert_num_queries, create_12_films
+    ):
+        monkeypatch.setattr(pagination, "ESTIMATED_COUNT_THRESHOLD", 0)
+
+        with django_assert_num_queries(1) as context:
+            count = CachedCountPaginator(Film.objects.all(), 8).count
+
+        assert context.captured_queries[0]["sql"].startswith("EXPLAIN")
+        assert isinstance(count, int) and count > 0
+
+    def test_count_of_empty_queryset_is_zero(self, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert CachedCountPaginator(Film.objects.none(), 8).count == 0
+
+
+@pytest.mark.django_db
+class TestKeysetPaginationMixin:
+    def test_view_passes_cursor_of_next_page(self, client, create_12_films):
+        response = client.get(reverse("cinema:budget-film-list"))
+        assert response.status_code == 200
+        page_obj = response.context["page_obj"]
+        assert response.context["is_paginated"]
+
+        response = client.get(
+            reverse("cinema:budget-film-list"),
+            {"cursor": page_obj.next_cursor},
+        )
+        assert response.status_code == 200
+        assert len(response.context["film_list"]) == 4
+        assert not response.context["page_obj"].has_next()
+
+    def test_view_paginates_movies_by_ranking(self, client, create_12_films):
+        update_films_rankings(["budget"])
+        url = reverse("cinema:budget-film-list")
+        first_page = client.get(url).context["page_obj"]
+        response = client.get(url, {"cursor": first_page.next_cursor})
+        assert response.status_code == 200
+
+        films = list(first_page) + list(response.context["film_list"])
+        assert films == list(Film.films.order_by_ranking("budget"))
+
+    def test_view_keeps_order_of_movies_after_building_ranking(
+        self, client, film_factory
+    ):
+        for budget in (100, None, 200, 100, None):
+            film_factory(budget=budget)
+        url = reverse("cinema:budget-film-list")
+        films = list(client.get(url).context["film_list"])
+
+        update_films_rankings(["budget"])
+
+        assert list(client.get(url).context["film_list"]) == films
+
+    def test_view_returns_404_for_invalid_cursor(self, client, create_12_films):
+        response = client.get(
+            reverse("cinema:budget-film-list"), {"cursor": "invalid"}
+        )
+        assert response.status_code == 404
+
+    def test_view_returns_404_for_tampered_cursor(
+        self, client, create_12_films
+    ):
+        response = client.get(
+            reverse("cinema:news-list"),
+            {"cursor": encode_cursor("next", ["not a date", 1])},
+        )
+        assert response.status_code == 404
+
+    def test_view_redirects_first_page_link_permanently(
+        self, client, create_12_films
+    ):
+        response = client.get(
+            reverse("cinema:budget-film-list"), {"page": 1, "q": "test"}
+        )
+        assert response.status_code == 301
+        assert response.url == reverse("cinema:budget-film-list") + "?q=test"
+
+    def test_view_redirects_page_link_to_cursor_of_same_page(
+        self, client, create_12_films
+    ):
+        url = reverse("cinema:budget-film-list")
+        next_cursor = client.get(url).context["page_obj"].next_cursor
+
+        response = client.get(url, {"page": 2})
+
+        assert response.status_code == 302
+        assert response.url == f"{url}?cursor={next_cursor}"
+
+    @pytest.mark.parametrize("page", ("3", "0", "last"))
+    def test_view_returns_404_for_invalid_page_link(
+        self, client, create_12_films, page
+    ):
+        response = client.get(
+            reverse("cinema:budget-film-list"), {"page": page}
+        )
+        assert response.status_code == 404
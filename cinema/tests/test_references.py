@@ -0,0 +1,75 @@
+import pytest
+
+from cinema.cache import invalidate_models_cache
+from cinema.models import (
+    Genre,
+    MpaaRating,
+)
+from cinema.references import (
+    REFERENCE_MODELS,
+    finish_request_references,
+    get_reference,
+    get_reference_pk,
+    get_references,
+    start_request_references,
+)
+
+
+@pytest.mark.django_db
+class TestReferences:
+    def test_records_are_keyed_by_primary_keys_and_names(self, genre_factory):
+        genre = genre_factory(name="Drama")
+
+        assert get_reference_pk(Genre, "Drama") == genre.pk
+        assert get_reference(Genre, genre.pk) == {
+            "id": genre.pk,
+            "pk": genre.pk,
+            "name": "Drama",
+        }
+        assert get_reference_pk(Genre, "Western") is None
+
+    def test_references_are_loaded_once(
+        self, django_assert_num_queries, genre_factory
+    ):
+        genre_factory(name="Drama")
+
+        with django_assert_num_queries(len(REFERENCE_MODELS)):
+            get_references()
+
+        with django_assert_num_queries(0):
+            get_references()
+
+    def test_version_is_read_from_cache_once_per_request(
+        self, mocker, genre_factory
+    ):
+        genre_factory(name="Drama")
+        get_models_version = mocker.patch(
+            "cinema.references.get_models_version", return_value="1"
+        )
+
+        start_request_references()
+        get_reference_pk(Genre, "Drama")
+        get_reference_pk(Genre, "Comedy")
+        finish_request_references()
+        get_reference_pk(Genre, "Drama")
+
+        assert get_models_version.call_count == 2
+
+    def test_references_are_built_again_after_changing_records(
+        self, genre_factory
+    ):
+        get_references()
+        genre = genre_factory(name="Comedy")
+        invalidate_models_cache(Genre)
+
+        assert get_reference_pk(Genre, "Comedy") == genre.pk
+
+    def test_mpaa_rating_is_keyed_by_value(self):
+        mpaa_rating = MpaaRating.objects.create(
+            value="PG-13", description="Parents strongly cautioned."
+        )
+
+        assert get_reference_pk(MpaaRating, "PG-13") == mpaa_rating.pk
+        assert get_reference(MpaaRating, mpaa_rating.pk)["description"] == (
+            "Parents strongly cautioned."
+        )
@@ -0,0 +1,798 @@
+from datetime import (
+    date,
+    datetime,
+    timedelta,
+)
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.db.migrations import RunSQL
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from cinema.cache import invalidate_models_cache
+from cinema.models import (
+    COMMENTS_TARGETS,
+    ArchivedComment,
+    CinemaFilmPersonProfession,
+    CinemaPerson,
+    CommentToFilm,
+    CommentToNews,
+    CommentToProduct,
+    Film,
+    FilmRanking,
+    News,
+)
+from cinema.pagination import encode_cursor
+from cinema.services import (
+    archive_comments,
+    get_cast_and_crew,
+    get_comments_page,
+    get_filmography_and_extra_info,
+    get_films_info,
+    get_films_ratings_sets,
+    get_homepage_snapshot,
+    get_latest_comments,
+    get_person_info,
+    get_ranked_criteria,
+    get_thumbnail_url,
+    move_comments_to_archive,
+    recount_comments,
+    update_film_rankings,
+    update_films_rankings,
+    update_homepage_snapshot,
+    update_texts_hyperlinks,
+)
+from cinema.signals import credits_persons_cache_dispatcher
+
+
+@pytest.mark.django_db
+class TestGetCastAndCrew:
+    def test_returns_cast_and_crew_of_selected_films_only(
+        self,
+        cinema_film_person_profession_factory,
+        cinema_profession_factory,
+        film_factory,
+    ):
+        director = cinema_profession_factory(name="Director")
+        actor = cinema_profession_factory(name="Actor")
+        film_1 = film_factory()
+        film_2 = film_factory()
+        credit_1 = cinema_film_person_profession_factory(
+            film=film_1, profession=director
+        )
+        credit_2 = cinema_film_person_profession_factory(
+            film=film_1, profession=actor
+        )
+        cinema_film_person_profession_factory(film=film_2, profession=actor)
+        result = get_cast_and_crew((film_1.pk,))
+
+        assert list(result) == [film_1.pk]
+        assert result[film_1.pk]["Director"] == [
+            {
+                "pk": credit_1.cinema_person.pk,
+                "name": credit_1.cinema_person.fullname,
+            }
+        ]
+        assert result[film_1.pk]["Actor"] == [
+            {
+                "pk": credit_2.cinema_person.pk,
+                "name": credit_2.cinema_person.fullname,
+            }
+        ]
+        assert result[film_1.pk]["Writer"] == []
+
+    def test_returns_empty_professions_for_film_without_cast(
+        self, film_factory
+    ):
+        film = film_factory()
+        result = get_cast_and_crew((film.pk,))
+
+        assert result == {film.pk: {"Director": [], "Actor": [], "Writer": []}}
+
+    def test_queries_number_does_not_depend_on_films_number(
+        self,
+        django_assert_num_queries,
+        cinema_film_person_profession_factory,
+    ):
+        credits = cinema_film_person_profession_factory.create_batch(5)
+        films_pk = [credit.film.pk for credit in credits]
+
+        with django_assert_num_queries(1):
+            get_cast_and_crew(films_pk)
+
+
+@pytest.mark.django_db
+class TestGetFilmsInfo:
+    def test_returns_related_data_of_selected_films_only(
+        self,
+        film_factory,
+        country_factory,
+        genre_factory,
+        language_factory,
+        distributor_factory,
+        news_factory,
+    ):
+        countries = [country_factory(name=name) for name in ("UK", "USA")]
+        genres = genre_factory.create_batch(3)
+        languages = language_factory.create_batch(2)
+        distributors = distributor_factory.create_batch(2)
+        film = film_factory(
+            country=countries,
+            genre=genres,
+            language=languages,
+            distributor=distributors,
+        )
+        other_film = film_factory(country=countries, genre=genres)
+        news = news_factory(film=(film, other_film))
+        result = get_films_info((film.pk,))
+
+        assert list(result) == [film.pk]
+        assert result[film.pk] == {
+            "country__name": ["UK", "USA"],
+            "genre__name": sorted(genre.name for genre in genres),
+            "language__name": sorted(language.name for language in languages),
+            "distributor__name": sorted(
+                distributor.name for distributor in distributors
+            ),
+            "news": {news.pk: news.title},
+        }
+
+    def test_returns_empty_data_for_film_without_related_records(
+        self, film_factory
+    ):
+        film = film_factory()
+        result = get_films_info((film.pk,))
+
+        assert result == {
+            film.pk: {
+                "country__name": [],
+                "genre__name": [],
+                "language__name": [],
+                "distributor__name": [],
+                "news": {},
+            }
+        }
+
+    def test_queries_number_does_not_depend_on_related_data(
+        self, django_assert_num_queries, test_film
+    ):
+        with django_assert_num_queries(5):
+            get_films_info((test_film.pk,))
+
+
+@pytest.mark.django_db
+class TestGetFilmsRatingsSets:
+    def test_returns_top_5_films_by_every_criterion(self, create_12_films):
+        result = get_films_ratings_sets()
+
+        assert list(result) == [
+            "imdb_top_5",
+            "budget_top_5",
+            "usa_gross_top_5",
+            "world_gross_top_5",
+        ]
+        budgets = [film["budget"] for film in result["budget_top_5"]]
+        assert len(budgets) == 5
+        assert budgets == sorted(budgets, reverse=True)
+
+    def test_queries_are_run_once_per_criterion(
+        self, django_assert_num_queries, create_12_films
+    ):
+        with django_assert_num_queries(4):
+            get_films_ratings_sets()
+
+
+@pytest.mark.django_db
+class TestGetPersonInfo:
+    def test_info_contains_data_of_selected_person_only(
+        self,
+        cinema_film_person_profession_factory,
+        genre_factory,
+        news_factory,
+    ):
+        drama = genre_factory(name="Drama")
+        comedy = genre_factory(name="Comedy")
+        credit = cinema_film_person_profession_factory(film__genre=(drama,))
+        cinema_film_person_profession_factory(
+            cinema_person=credit.cinema_person, film__genre=(drama,)
+        )
+        cinema_film_person_profession_factory(film__genre=(comedy,))
+        news = news_factory(cinema_person=(credit.cinema_person,))
+        news_factory()
+
+        assert get_person_info(credit.cinema_person.pk) == {
+            "film__genre__name": ["Drama"],
+            "news": {news.pk: news.title},
+        }
+
+    def test_info_is_kept_in_cache_until_news_links_change(
+        self, django_assert_num_queries, cinema_person_factory, news_factory
+    ):
+        person = cinema_person_factory()
+        news = news_factory()
+
+        with django_assert_num_queries(2):
+            assert get_person_info(person.pk)["news"] == {}
+
+        with django_assert_num_queries(0):
+            get_person_info(person.pk)
+
+        news.cinema_person.add(person)
+
+        assert get_person_info(person.pk)["news"] == {news.pk: news.title}
+
+    def test_info_of_other_persons_is_kept_in_cache_after_news_links_change(
+        self, django_assert_num_queries, cinema_person_factory, news_factory
+    ):
+        person, other_person = cinema_person_factory.create_batch(2)
+        news = news_factory()
+        get_person_info(other_person.pk)
+
+        news.cinema_person.add(person)
+
+        with django_assert_num_queries(0):
+            assert get_person_info(other_person.pk)["news"] == {}
+
+    def test_info_of_both_persons_is_invalidated_after_credit_moves(
+        self,
+        cinema_film_person_profession_factory,
+        cinema_person_factory,
+        genre_factory,
+    ):
+        credit = cinema_film_person_profession_factory(
+            film__genre=(genre_factory(name="Drama"),)
+        )
+        person = credit.cinema_person
+        other_person = cinema_person_factory()
+        get_person_info(person.pk)
+        get_person_info(other_person.pk)
+
+        credit.cinema_person = other_person
+        credit.save()
+        credits_persons_cache_dispatcher(CinemaFilmPersonProfession, credit)
+
+        assert get_person_info(person.pk)["film__genre__name"] == []
+        assert get_person_info(other_person.pk)["film__genre__name"] == [
+            "Drama"
+        ]
+
+
+@pytest.mark.django_db
+class TestGetCommentsPage:
+    def test_page_contains_active_comments_of_target_only(
+        self, comment_to_film_factory, film_factory
+    ):
+        film = film_factory()
+        comment_to_film_factory.create_batch(12, film=film)
+        comment_to_film_factory.create_batch(3, film=film, is_active=False)
+        comment_to_film_factory.create_batch(2)
+
+        first_page = get_comments_page(film.commenttofilm_set, None)
+        last_page = get_comments_page(film.commenttofilm_set, "2")
+
+        assert first_page.paginator.count == 12
+        assert len(first_page) == 10
+        assert len(last_page) == 2
+        assert all(comment.is_active for comment in first_page)
+        assert list(first_page) + list(last_page) == list(
+            film.commenttofilm_set.filter(is_active=True).order_by(
+                "-created_at", "-pk"
+            )
+        )
+
+
+@pytest.mark.django_db
+def test_recount_comments_saves_numbers_of_active_comments(
+    comment_to_film_factory, comment_to_news_factory, film_factory
+):
+    film = film_factory()
+    comment_to_film_factory.create_batch(3, film=film)
+    comment_to_film_factory(film=film, is_active=False)
+    comment = comment_to_news_factory()
+    Film.objects.update(comments_count=10)
+
+    recount_comments()
+
+    film.refresh_from_db()
+    comment.news.refresh_from_db()
+    assert film.comments_count == 3
+    assert comment.news.comments_count == 1
+
+
+@pytest.mark.django_db
+class TestGetLatestComments:
+    @pytest.fixture
+    def create_comments(
+        self,
+        comment_to_film_factory,
+        comment_to_news_factory,
+        comment_to_person_factory,
+        comment_to_product_factory,
+    ):
+        factories = (
+            comment_to_person_factory,
+            comment_to_film_factory,
+            comment_to_news_factory,
+            comment_to_product_factory,
+        )
+        for number in range(12):
+            comment = factories[number % 4]()
+            type(comment).objects.filter(pk=comment.pk).update(
+                created_at=timezone.make_aware(
+                    datetime(2020, 1, 1 + number // 3)
+                )
+            )
+        comment_to_film_factory(is_active=False)
+        invalidate_models_cache(*COMMENTS_TARGETS)
+
+    def test_pages_follow_creation_dates_of_all_comments(self, create_comments):
+        comments = []
+        items, cursor = get_latest_comments(None, 5)
+        comments.extend(items)
+        while cursor:
+            items, cursor = get_latest_comments(cursor, 5)
+            comments.extend(items)
+
+        active_comments = sorted(
+            (
+                (comment.created_at, rank, comment.pk)
+                for rank, model in enumerate(COMMENTS_TARGETS)
+                for comment in model.objects.filter(is_active=True)
+            ),
+            reverse=True,
+        )
+        assert [
+            (item["created_at"], item["rank"], item["pk"]) for item in comments
+        ] == active_comments
+        assert len(comments) == 12
+
+    def test_items_contain_targets_of_comments(
+        self, comment_to_product_factory
+    ):
+        comment = comment_to_product_factory()
+        invalidate_models_cache(CommentToProduct)
+
+        items, cursor = get_latest_comments()
+
+        assert cursor is None
+        assert items[0]["kind"] == "product"
+        assert items[0]["target"] == str(comment.product)
+        assert items[0]["url"] == reverse(
+            "cinema:product-detail", args=(comment.product.pk,)
+        )
+
+    def test_page_is_fetched_by_query_per_comment_model(
+        self, django_assert_num_queries, create_comments
+    ):
+        with django_assert_num_queries(len(COMMENTS_TARGETS)):
+            get_latest_comments()
+
+    def test_only_first_page_is_kept_in_cache(
+        self, django_assert_num_queries, create_comments
+    ):
+        cursor = get_latest_comments()[1]
+
+        with django_assert_num_queries(0):
+            get_latest_comments()
+        for _ in range(2):
+            with django_assert_num_queries(len(COMMENTS_TARGETS)):
+                get_latest_comments(cursor)
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "invalid",
+            encode_cursor("next", ["not a date", 1, 1]),
+            encode_cursor("next", ["2020-01-01T00:00:00+00:00", "rank", 1]),
+            encode_cursor("next", [None, 1, 1]),
+        ],
+    )
+    def test_invalid_cursor_raises_error(self, cursor):
+        with pytest.raises(InvalidPage):
+            get_latest_comments(cursor)
+
+
+@pytest.mark.django_db
+class TestArchiveComments:
+    def test_old_inactive_comments_are_moved_to_archive(
+        self, comment_to_film_factory, comment_to_news_factory
+    ):
+        old_date = timezone.now() - timedelta(days=200)
+        old_comments = comment_to_film_factory.create_batch(3, is_active=False)
+        kept_comments = [
+            comment_to_film_factory(is_active=False),
+            comment_to_film_factory(),
+            comment_to_news_factory(),
+        ]
+        CommentToFilm.objects.filter(
+            pk__in=[comment.pk for comment in old_comments]
+            + [kept_comments[1].pk]
+        ).update(created_at=old_date)
+        CommentToNews.objects.update(created_at=old_date)
+
+        archived = archive_comments(180, 2)
+
+        assert archived["CommentToFilm"] == 3
+        assert archived["CommentToNews"] == 0
+        assert set(CommentToFilm.objects.values_list("pk", flat=True)) == {
+            comment.pk for comment in kept_comments[:2]
+        }
+        assert CommentToNews.objects.count() == 1
+        archived_comment = ArchivedComment.objects.get(
+            comment_id=old_comments[0].pk
+        )
+        assert archived_comment.kind == "film"
+        assert archived_comment.target_id == old_comments[0].film_id
+        assert archived_comment.author == old_comments[0].author
+        assert archived_comment.created_at == old_date
+
+    def test_comments_are_not_archived_twice(self, comment_to_film_factory):
+        comment_to_film_factory(is_active=False)
+        CommentToFilm.objects.update(
+            created_at=timezone.now() - timedelta(days=200)
+        )
+
+        archive_comments()
+
+        assert archive_comments()["CommentToFilm"] == 0
+        assert ArchivedComment.objects.count() == 1
+
+    @pytest.mark.parametrize("comment_model", COMMENTS_TARGETS)
+    def test_batch_is_selected_by_index_of_inactive_comments(
+        self, comment_model
+    ):
+        # Partial indexes are created by migration, which is not applied with
+        # tables created by '--no-migrations' option
+        migration = import_module("cinema.migrations.0012_comments_archive")
+        with connection.cursor() as cursor:
+            for operation in migration.Migration.operations:
+                if isinstance(operation, RunSQL):
+                    cursor.execute(operation.sql)
+        with CaptureQueriesContext(connection) as context:
+            move_comments_to_archive(comment_model, timezone.now(), 10)
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {context.captured_queries[0]['sql']}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        assert "_inactive_idx" in plan
+
+
+@pytest.mark.django_db
+class TestGetFilmographyAndExtraInfo:
+    def test_filmography_is_fetched_by_single_query(
+        self,
+        django_assert_num_queries,
+        cinema_person_factory,
+        cinema_film_person_profession_factory,
+        film_factory,
+    ):
+        person = cinema_person_factory()
+        film_1 = film_factory(release_data=date(1994, 7, 6))
+        film_2 = film_factory(release_data=date(2002, 12, 25))
+        for film in (film_1, film_2):
+            cinema_film_person_profession_factory(
+                cinema_person=person, film=film, profession__name="Actor"
+            )
+        cinema_film_person_profession_factory(
+            cinema_person=person, film=film_2, profession__name="Director"
+        )
+
+        with django_assert_num_queries(1):
+            (
+                filmography,
+                professions,
+                films_number,
+                films_years_range,
+            ) = get_filmography_and_extra_info(person)
+
+        assert professions == ("Actor", "Director")
+        assert [film["pk"] for film in filmography["Actor"]] == [
+            film_2.pk,
+            film_1.pk,
+        ]
+        assert filmography["Director"][0] == {
+            "pk": film_2.pk,
+            "title": film_2.title,
+            "release_data__year": 2002,
+            "imdb_rating_value": film_2.imdb_rating_value,
+        }
+        assert films_number == 2
+        assert films_years_range == "1994 - 2002"
+
+    def test_person_without_films(self, cinema_person_factory):
+        person = cinema_person_factory()
+
+        assert get_filmography_and_extra_info(person) == ({}, (), 0, "")
+
+
+@pytest.mark.django_db
+class TestUpdateFilmsRankings:
+    def get_ranking(self, criterion):
+        return list(
+            FilmRanking.objects.filter(criterion=criterion).values_list(
+                "position", "film_id"
+            )
+        )
+
+    def test_creates_positions_of_films_by_every_criterion(self, film_factory):
+        film_1 = film_factory(budget=100, usa_gross=3, world_gross=5)
+        film_2 = film_factory(budget=None, usa_gross=4, world_gross=5)
+        film_3 = film_factory(budget=300, usa_gross=2, world_gross=6)
+        update_films_rankings()
+
+        assert self.get_ranking("budget") == [
+            (1, film_3.pk),
+            (2, film_1.pk),
+            (3, film_2.pk),
+        ]
+        assert self.get_ranking("usa_gross") == [
+            (1, film_2.pk),
+            (2, film_1.pk),
+            (3, film_3.pk),
+        ]
+        assert self.get_ranking("world_gross") == [
+            (1, film_3.pk),
+            (2, film_2.pk),
+            (3, film_1.pk),
+        ]
+        assert len(self.get_ranking("imdb_rating")) == 3
+
+    def test_ranked_criteria_are_changed_after_updating_rankings(
+        self, film_factory
+    ):
+        film_factory()
+        update_films_rankings(["budget"])
+        assert get_ranked_criteria() == {"budget"}
+
+        update_films_rankings(["usa_gross"])
+        assert get_ranked_criteria() == {"budget", "usa_gross"}
+
+    def test_rewrites_changed_positions_only(self, film_factory):
+        film_1 = film_factory(budget=300)
+        film_2 = film_factory(budget=200)
+        film_3 = film_factory(budget=100)
+        update_films_rankings(("budget",))
+        first_position = FilmRanking.objects.get(criterion="budget", position=1)
+        film_3.budget = 250
+        film_3.save()
+        update_films_rankings(("budget",))
+
+        assert self.get_ranking("budget") == [
+            (1, film_1.pk),
+            (2, film_3.pk),
+            (3, film_2.pk),
+        ]
+        assert (
+            FilmRanking.objects.get(criterion="budget", position=1)
+            == first_position
+        )
+        assert not FilmRanking.objects.exclude(criterion="budget").exists()
+
+    def test_removes_positions_of_deleted_films(self, film_factory):
+        film_1 = film_factory(budget=300)
+        film_2 = film_factory(budget=200)
+        update_films_rankings(("budget",))
+        film_1.delete()
+        update_films_rankings(("budget",))
+
+        assert self.get_ranking("budget") == [(1, film_2.pk)]
+
+
+@pytest.mark.django_db
+class TestUpdateFilmRankings:
+    def get_ranking(self, criterion):
+        return list(
+            FilmRanking.objects.filter(criterion=criterion).values_list(
+                "position", "film_id"
+            )
+        )
+
+    @pytest.fixture
+    def ranked_films(self, film_factory):
+        films = [film_factory(budget=budget) for budget in (400, 300, 200)]
+        update_films_rankings(("budget",))
+        return films
+
+    def test_ranks_new_film_between_neighbours(
+        self, film_factory, ranked_films
+    ):
+        film = film_factory(budget=250)
+        update_film_rankings(film.pk, ("budget",))
+
+        assert self.get_ranking("budget") == [
+            (1, ranked_films[0].pk),
+            (2, ranked_films[1].pk),
+            (3, film.pk),
+            (4, ranked_films[2].pk),
+        ]
+
+    @pytest.mark.parametrize(
+        "index, budget, expected_order",
+        (
+            (2, 500, (2, 0, 1)),
+            (2, 350, (0, 2, 1)),
+            (0, 250, (1, 0, 2)),
+            (0, 100, (1, 2, 0)),
+            (1, None, (0, 2, 1)),
+            (1, 300, (0, 1, 2)),
+        ),
+    )
+    def test_moves_changed_film_between_neighbours(
+        self, ranked_films, index, budget, expected_order
+    ):
+        film = ranked_films[index]
+        film.budget = budget
+        film.save()
+        update_film_rankings(film.pk, ("budget",))
+
+        assert self.get_ranking("budget") == [
+            (position, ranked_films[film_index].pk)
+            for position, film_index in enumerate(expected_order, start=1)
+        ]
+
+    def test_keeps_positions_of_other_criteria(self, ranked_films):
+        update_film_rankings(ranked_films[0].pk, ("budget",))
+
+        assert not FilmRanking.objects.exclude(criterion="budget").exists()
+
+    def test_ranks_movies_by_nulls_and_ties_like_full_update(
+        self, film_factory
+    ):
+        films = [
+            film_factory(budget=budget) for budget in (None, 100, None, 100)
+        ]
+        update_films_rankings(("budget",))
+        expected_ranking = self.get_ranking("budget")
+        for film in films:
+            FilmRanking.objects.filter(film=film).delete()
+            update_film_rankings(film.pk, ("budget",))
+
+        assert [film_pk for _, film_pk in self.get_ranking("budget")] == [
+            film_pk for _, film_pk in expected_ranking
+        ]
+
+    def test_returns_criteria_of_rankings_which_have_not_been_built(
+        self, film_factory, ranked_films
+    ):
+        film = film_factory(budget=350, usa_gross=10)
+
+        assert update_film_rankings(film.pk, ("budget", "usa_gross")) == [
+            "usa_gross"
+        ]
+        assert self.get_ranking("usa_gross") == []
+
+    def test_leaves_gap_after_deleting_film(self, film_factory, ranked_films):
+        ranked_films[1].delete()
+        film = film_factory(budget=350)
+        update_film_rankings(film.pk, ("budget",))
+
+        assert self.get_ranking("budget") == [
+            (1, ranked_films[0].pk),
+            (2, film.pk),
+            (4, ranked_films[2].pk),
+        ]
+
+
+@pytest.mark.django_db
+class TestUpdateTextsHyperlinks:
+    def test_renders_texts_mentioning_cinema_person(
+        self, cinema_person_factory, film_factory, news_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Tom", user__last_name="Hanks"
+        )
+        film = film_factory(description="Starring Tom Hanks.")
+        news = news_factory(description="No names here.")
+        Film.objects.filter(pk=film.pk).update(description_html="")
+        News.objects.filter(pk=news.pk).update(description_html="")
+        person_url = reverse("cinema:movie-person-detail", args=(person.pk,))
+        update_texts_hyperlinks(person.fullname, person_url)
+        film.refresh_from_db()
+        news.refresh_from_db()
+
+        assert film.description_html == (
+            f"Starring <a href='{person_url}'>Tom Hanks</a>."
+        )
+        assert news.description_html == ""
+
+    def test_renders_texts_containing_hyperlink_to_renamed_person(
+        self, cinema_person_factory, film_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Tom", user__last_name="Hanks"
+        )
+        person_url = reverse("cinema:movie-person-detail", args=(person.pk,))
+        film = film_factory(description="Starring Tom Hanks.")
+        Film.objects.filter(pk=film.pk).update(
+            description_html=f"Starring <a href='{person_url}'>Tom Hanks</a>."
+        )
+        person.user.last_name = "Cruise"
+        person.user.save()
+        update_texts_hyperlinks("Tom Cruise", person_url)
+        film.refresh_from_db()
+
+        assert film.description_html == "Starring Tom Hanks."
+
+    def test_renders_all_texts_without_arguments(self, cinema_person_factory):
+        person = cinema_person_factory(bio="Biography.")
+        CinemaPerson.objects.filter(pk=person.pk).update(bio_html="")
+        update_texts_hyperlinks()
+        person.refresh_from_db()
+
+        assert person.bio_html == "Biography."
+
+    def test_migration_renders_texts_of_existing_records(
+        self, cinema_person_factory, film_factory
+    ):
+        person = cinema_person_factory(
+            user__first_name="Tom", user__last_name="Hanks"
+        )
+        film = film_factory(description="Starring Tom Hanks.")
+        Film.objects.filter(pk=film.pk).update(description_html="")
+        migration = import_module("cinema.migrations.0005_texts_html")
+        migration.render_texts_hyperlinks(apps, None)
+        film.refresh_from_db()
+
+        person_url = reverse("cinema:movie-person-detail", args=(person.pk,))
+        assert film.description_html == (
+            f"Starring <a href='{person_url}'>Tom Hanks</a>."
+        )
+
+
+@pytest.mark.django_db
+class TestGetHomepageSnapshot:
+    def test_carousels_are_bounded(self, create_12_films_products_news):
+        snapshot = get_homepage_snapshot()
+
+        assert len(snapshot["top_rated_products"]) == 12
+        assert len(snapshot["new_releases_products"]) == 12
+        assert len(snapshot["slider_news"]) == 5
+        assert len(snapshot["box_news"]) == 4
+        assert [news["pk"] for news in snapshot["slider_news"]] == list(
+            News.objects.values_list("pk", flat=True)[:5]
+        )
+        assert set(snapshot["films_cast_and_crew"]) == set(
+            Film.objects.values_list("pk", flat=True)
+        )
+
+    def test_snapshot_is_kept_in_cache(
+        self, django_assert_num_queries, create_12_films_products_news
+    ):
+        snapshot = get_homepage_snapshot()
+
+        with django_assert_num_queries(0):
+            assert get_homepage_snapshot() == snapshot
+
+    def test_snapshot_is_built_again_after_changing_models(
+        self, create_12_films_products_news
+    ):
+        get_homepage_snapshot()
+        news = News.objects.first()
+        News.objects.filter(pk=news.pk).update(title="Changed title")
+        invalidate_models_cache(News)
+
+        assert get_homepage_snapshot()["slider_news"][0]["title"] == (
+            "Changed title"
+        )
+
+    def test_update_homepage_snapshot_builds_data_again(
+        self, create_12_films_products_news
+    ):
+        get_homepage_snapshot()
+        News.objects.first().delete()
+        update_homepage_snapshot()
+
+        assert [news["pk"] for news in get_homepage_snapshot()["box_news"]] == (
+            list(News.objects.values_list("pk", flat=True)[5:9])
+        )
+
+    def test_thumbnail_url_of_missing_image_file_is_empty(self):
+        poster = Film(poster="films/missing_poster.jpg").poster
+
+        assert get_thumbnail_url(poster, "index") == ""
@@ -0,0 +1,61 @@
+import pytest
+from django.core import mail
+
+from accounts.models import User
+from cinema import tasks
+from cinema.tasks import (
+    get_notified_users,
+    get_pk_ranges,
+    send_new_product_notification,
+    send_new_product_notification_chunk,
+)
+from django_cinema.celery import celery_app
+
+
+@pytest.mark.django_db
+class TestSendNewProductNotification:
+    def test_users_are_split_into_chunks_by_primary_keys(self, user_factory):
+        users = user_factory.create_batch(5)
+
+        pk_ranges = get_pk_ranges(User.objects.all(), 2)
+
+        assert pk_ranges == [
+            [users[0].pk, users[1].pk],
+            [users[2].pk, users[3].pk],
+            [users[4].pk, users[4].pk],
+        ]
+
+    def test_chunk_is_sent_by_single_connection(
+        self, monkeypatch, user_factory
+    ):
+        users = user_factory.create_batch(3)
+        user_factory(email="studio@hollywood.com")
+        connections = []
+        get_connection = tasks.get_connection
+
+        def get_counted_connection(*args, **kwargs):
+            connections.append(get_connection(*args, **kwargs))
+            return connections[-1]
+
+        monkeypatch.setattr(tasks, "get_connection", get_counted_connection)
+
+        send_new_product_notification_chunk(1, users[0].pk, users[1].pk)
+
+        assert len(connections) == 1
+        assert [message.to for message in mail.outbox] == [
+            [users[0].email],
+            [users[1].email],
+        ]
+
+    def test_all_users_are_notified_by_chunks(self, monkeypatch, user_factory):
+        user_factory.create_batch(5)
+        user_factory(email="studio@hollywood.com")
+        monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+        monkeypatch.setattr(tasks, "NEW_PRODUCT_NOTIFICATION_CHUNK_SIZE", 2)
+
+        send_new_product_notification(1)
+
+        assert sorted(message.to[0] for message in mail.outbox) == sorted(
+            get_notified_users().values_list("email", flat=True)
+        )
+        assert len(mail.outbox) == 5
@@ -1,8 +1,29 @@
 import pytest
 from django.urls import reverse
-from pytest_django.asserts import assertTemplateUsed
-
-from cinema.models import Film
+from pytest_django.asserts import (
+    assertContains,
+    assertTemplateUsed,
+)
+
+from cinema.cache import invalidate_models_cache
+from cinema.models import (
+    CommentToFilm,
+    Film,
+    News,
+)
+from cinema.services import (
+    recount_comments,
+    update_films_rankings,
+)
+
+
+def get_page(client, url, number):
+    response = client.get(url)
+    for _ in range(number - 1):
+        response = client.get(
+            url, {"cursor": response.context["page_obj"].next_cursor}
+        )
+    return response
 
 
 @pytest.mark.django_db
@@ -30,7 +51,7 @@ class TestProductListView:
         assert len(response.context["product_list"]) == 8
 
     def test_view_returns_all_products(self, client, create_12_products):
-        response = client.get(reverse("cinema:product-list") + "?page=2")
+        response = get_page(client, reverse("cinema:product-list"), 2)
         assert response.status_code == 200
         assert "is_paginated" in response.context
         assert response.context["is_paginated"]
@@ -67,9 +88,7 @@ class TestTopRatedProductListView:
         assert len(response.context["product_list"]) == 8
 
     def test_view_returns_all_products(self, client, create_12_products):
-        response = client.get(
-            reverse("cinema:top-rated-product-list") + "?page=2"
-        )
+        response = get_page(client, reverse("cinema:top-rated-product-list"), 2)
         assert response.status_code == 200
         assert "is_paginated" in response.context
         assert response.context["is_paginated"]
@@ -78,7 +97,10 @@ class TestTopRatedProductListView:
     def test_view_uses_correct_ordering(self, client, create_12_products):
         response = client.get(reverse("cinema:top-rated-product-list"))
         assert response.status_code == 200
-        assert response.context["view"].ordering == "-film__imdb_rating__value"
+        assert response.context["view"].keyset_ordering == (
+            "-film__imdb_rating_value",
+            "-film__pk",
+        )
 
 
 @pytest.mark.django_db
@@ -106,8 +128,8 @@ class TestNewReleasesProductListView:
         assert len(response.context["product_list"]) == 8
 
     def test_view_returns_all_products(self, client, create_12_products):
-        response = client.get(
-            reverse("cinema:new-releases-product-list") + "?page=2"
+        response = get_page(
+            client, reverse("cinema:new-releases-product-list"), 2
         )
         assert response.status_code == 200
         assert "is_paginated" in response.context
@@ -117,7 +139,10 @@ class TestNewReleasesProductListView:
     def test_view_uses_correct_ordering(self, client, create_12_products):
         response = client.get(reverse("cinema:new-releases-product-list"))
         assert response.status_code == 200
-        assert response.context["view"].ordering == "-film__release_data"
+        assert response.context["view"].keyset_ordering == (
+            "-film__release_data",
+            "-film__pk",
+        )
 
 
 @pytest.mark.django_db
@@ -143,7 +168,7 @@ class TestFilmListView:
         assert len(response.context["film_list"]) == 8
 
     def test_view_returns_all_films(self, client, create_12_films):
-        response = client.get(reverse("cinema:film-list") + "?page=2")
+        response = get_page(client, reverse("cinema:film-list"), 2)
         assert response.status_code == 200
         assert "is_paginated" in response.context
         assert response.context["is_paginated"]
@@ -178,7 +203,7 @@ class TestTopRatedFilmListView:
         assert len(response.context["film_list"]) == 8
 
     def test_view_returns_all_films(self, client, create_12_films):
-        response = client.get(reverse("cinema:top-rated-film-list") + "?page=2")
+        response = get_page(client, reverse("cinema:top-rated-film-list"), 2)
         assert response.status_code == 200
         assert "is_paginated" in response.context
         assert response.context["is_paginated"]
@@ -187,7 +212,10 @@ class TestTopRatedFilmListView:
     def test_view_uses_correct_ordering(self, client, create_12_films):
         response = client.get(reverse("cinema:top-rated-film-list"))
         assert response.status_code == 200
-        assert response.context["view"].ordering == "-imdb_rating__value"
+        assert response.context["view"].keyset_ordering == (
+            "-imdb_rating_value",
+            "-pk",
+        )
 
 
 @pytest.mark.django_db
@@ -213,7 +241,7 @@ class TestBudgetFilmListView:
         assert len(response.context["film_list"]) == 8
 
     def test_view_returns_all_films(self, client, create_12_films):
-        response = client.get(reverse("cinema:budget-film-list") + "?page=2")
+        response = get_page(client, reverse("cinema:budget-film-list"), 2)
         assert response.status_code == 200
         assert "is_paginated" in response.context
         assert response.context["is_paginated"]
@@ -222,7 +250,18 @@ class TestBudgetFilmListView:
     def test_view_uses_correct_ordering(self, client, create_12_films):
         response = client.get(reverse("cinema:budget-film-list"))
         assert response.status_code == 200
-        assert response.context["view"].ordering == "-budget"
+        assert response.context["view"].keyset_ordering == ("-budget", "-pk")
+
+    def test_view_uses_films_ranking_if_it_exists(
+        self, client, create_12_films
+    ):
+        update_films_rankings(("budget",))
+        response = client.get(reverse("cinema:budget-film-list"))
+        assert response.status_code == 200
+
+        budgets = [film.budget for film in response.context["film_list"]]
+        assert len(budgets) == 8
+        assert budgets == sorted(budgets, reverse=True)
 
 
 @pytest.mark.django_db
@@ -248,7 +287,7 @@ class TestUsaGrossFilmListView:
         assert len(response.context["film_list"]) == 8
 
     def test_view_returns_all_films(self, client, create_12_films):
-        response = client.get(reverse("cinema:usa-gross-film-list") + "?page=2")
+        response = get_page(client, reverse("cinema:usa-gross-film-list"), 2)
         assert response.status_code == 200
         assert "is_paginated" in response.context
         assert response.context["is_paginated"]
@@ -257,7 +296,7 @@ class TestUsaGrossFilmListView:
     def test_view_uses_correct_ordering(self, client, create_12_films):
         response = client.get(reverse("cinema:usa-gross-film-list"))
         assert response.status_code == 200
-        assert response.context["view"].ordering == "-usa_gross"
+        assert response.context["view"].keyset_ordering == ("-usa_gross", "-pk")
 
 
 @pytest.mark.django_db
@@ -283,9 +322,7 @@ class TestWorldGrossFilmListView:
         assert len(response.context["film_list"]) == 8
 
     def test_view_returns_all_films(self, client, create_12_films):
-        response = client.get(
-            reverse("cinema:world-gross-film-list") + "?page=2"
-        )
+        response = get_page(client, reverse("cinema:world-gross-film-list"), 2)
         assert response.status_code == 200
         assert "is_paginated" in response.context
         assert response.context["is_paginated"]
@@ -294,7 +331,10 @@ class TestWorldGrossFilmListView:
     def test_view_uses_correct_ordering(self, client, create_12_films):
         response = client.get(reverse("cinema:world-gross-film-list"))
         assert response.status_code == 200
-        assert response.context["view"].ordering == "-world_gross"
+        assert response.context["view"].keyset_ordering == (
+            "-world_gross",
+            "-pk",
+        )
 
 
 @pytest.mark.django_db
@@ -483,6 +523,12 @@ class TestMpaaFilmListView:
         response = client.get(f"/films/by-mpaa/{selected_mpaa}/")
         assert response.status_code == 200
 
+    def test_view_returns_404_for_unknown_mpaa_rating(
+        self, client, create_12_films
+    ):
+        response = client.get(reverse("cinema:mpaa-film-list", args=(999,)))
+        assert response.status_code == 404
+
     def test_view_url_accessible_by_name(self, client, create_12_films):
         selected_mpaa = Film.objects.first().mpaa_rating.pk
         response = client.get(
@@ -532,7 +578,7 @@ class TestNewsListView:
         assert len(response.context["news_list"]) == 5
 
     def test_view_returns_all_news(self, client, create_12_news):
-        response = client.get(reverse("cinema:news-list") + "?page=3")
+        response = get_page(client, reverse("cinema:news-list"), 3)
         assert response.status_code == 200
         assert "is_paginated" in response.context
         assert response.context["is_paginated"]
@@ -543,6 +589,46 @@ class TestNewsListView:
         assert response.status_code == 200
         assert not response.context["view"].ordering
 
+    def test_view_passes_top_5_films_sets(self, client, create_12_news):
+        response = client.get(reverse("cinema:news-list"))
+        assert response.status_code == 200
+
+        for name in (
+            "imdb_top_5",
+            "budget_top_5",
+            "usa_gross_top_5",
+            "world_gross_top_5",
+        ):
+            assert len(response.context[name]) == 5
+
+    def test_view_passes_news_snippets_with_hyperlinks(
+        self, client, film_factory, news_factory
+    ):
+        film = film_factory(title="Forrest Gump")
+        invalidate_models_cache(Film)
+        news = news_factory(description="Forrest Gump " + "text " * 100)
+        news_factory(description="Forrest Gump")
+        News.objects.filter(pk=news.pk).update(description_html="")
+        response = client.get(reverse("cinema:news-list"))
+        assert response.status_code == 200
+
+        snippet = response.context["news_snippets"][news.pk]
+        film_url = reverse("cinema:film-detail", args=(film.pk,))
+        assert snippet.startswith(f"<a href='{film_url}'>Forrest Gump</a>")
+        assert snippet.endswith("…")
+
+    def test_view_passes_latest_comments(
+        self, client, comment_to_film_factory, create_12_news
+    ):
+        comment = comment_to_film_factory()
+        invalidate_models_cache(CommentToFilm)
+        response = client.get(reverse("cinema:news-list"))
+        assert response.status_code == 200
+
+        latest_comments = response.context["latest_comments"]
+        assert [item["pk"] for item in latest_comments] == [comment.pk]
+        assertContains(response, comment.film.title)
+
 
 @pytest.mark.django_db
 class TestCelebrityNewsListView:
@@ -559,6 +645,16 @@ class TestCelebrityNewsListView:
         assert response.status_code == 200
         assertTemplateUsed(response, "cinema/news_list.html")
 
+    def test_view_returns_news_about_celebrities_only(
+        self, client, news_factory, cinema_person_factory
+    ):
+        news = news_factory()
+        news_factory()
+        news.mentioned_persons.add(cinema_person_factory())
+        response = client.get(reverse("cinema:celebrity-news-list"))
+        assert response.status_code == 200
+        assert list(response.context["news_list"]) == [news]
+
 
 @pytest.mark.django_db
 class TestFilmDetail:
@@ -579,6 +675,20 @@ class TestFilmDetail:
         assert response.status_code == 200
         assertTemplateUsed(response, "cinema/film_detail.html")
 
+    def test_view_paginates_active_comments(
+        self, client, test_film, comment_to_film_factory
+    ):
+        comment_to_film_factory.create_batch(11, film=test_film)
+        comment_to_film_factory(film=test_film, is_active=False)
+        recount_comments()
+        response = client.get(
+            reverse("cinema:film-detail", args=(test_film.pk,)),
+            {"comments_page": 2},
+        )
+        assert response.status_code == 200
+        assert response.context["comments"].paginator.count == 11
+        assert len(response.context["comments"]) == 1
+
     def test_view_returns_http404_for_invalid_film(self, client, test_film):
         invalid_pk = 10
         response = client.get(reverse("cinema:film-detail", args=(invalid_pk,)))
@@ -760,6 +870,16 @@ class TestCinemaPersonDetail:
         response = client.get(f"/movie-persons/{test_person.pk}/")
         assert response.status_code == 200
 
+    def test_view_displays_person_without_films(
+        self, client, cinema_person_factory
+    ):
+        person = cinema_person_factory()
+        response = client.get(
+            reverse("cinema:movie-person-detail", args=(person.pk,))
+        )
+        assert response.status_code == 200
+        assert response.context["films_number"] == 0
+
     def test_view_url_accessible_by_name(self, client, test_person):
         response = client.get(
             reverse("cinema:movie-person-detail", args=(test_person.pk,))
@@ -1003,7 +1123,59 @@ class TestSearchResultsView:
             data={"q": "Steven Spielberg"},
         )
         assert response.status_code == 200
-        assert len(response.context["person_list"]) == 1
-        assert response.context["person_list"].get(
-            user__first_name="Steven", user__last_name="Spielberg"
+        assert response.context["person_count"] == 1
+        assert [
+            person.fullname for person in response.context["person_results"]
+        ] == ["Steven Spielberg"]
+
+    def test_view_limits_number_of_results_of_every_section(
+        self, client, film_factory
+    ):
+        film_factory.create_batch(12, title="The Godfather Saga")
+        response = client.get(
+            path=reverse("cinema:search-results"),
+            data={"q": "godfather"},
+        )
+        assert response.status_code == 200
+        assert response.context["film_count"] == 12
+        assert len(response.context["film_results"]) == 10
+        assert response.context["news_count"] == 0
+        assert (
+            reverse("cinema:search-section", args=("film",))
+            in response.content.decode()
         )
+
+
+@pytest.mark.django_db
+class TestSearchSectionListView:
+    def test_view_url_exists_at_desired_location(self, client, test_film):
+        response = client.get("/search/film/", data={"q": "Steven"})
+        assert response.status_code == 200
+
+    def test_view_uses_correct_template(self, client, test_film):
+        response = client.get(
+            path=reverse("cinema:search-section", args=("person",)),
+            data={"q": "Steven Spielberg"},
+        )
+        assert response.status_code == 200
+        assertTemplateUsed(response, "cinema/search_section.html")
+
+    def test_view_returns_404_for_unknown_section(self, client):
+        response = client.get(
+            path=reverse("cinema:search-section", args=("users",)),
+            data={"q": "Steven"},
+        )
+        assert response.status_code == 404
+
+    def test_pagination_and_number_of_results_are_limited(
+        self, client, film_factory
+    ):
+        film_factory.create_batch(12, title="The Godfather Saga")
+        response = client.get(
+            path=reverse("cinema:search-section", args=("film",)),
+            data={"q": "godfather", "page": 2},
+        )
+        assert response.status_code == 200
+        assert response.context["is_paginated"]
+        assert len(response.context["object_list"]) == 2
+        assert response.context["view"].results_limit == 100
@@ -15,6 +15,7 @@ from .views import (
     NewsListView,
     ProductListView,
     SearchResultsView,
+    SearchSectionListView,
     TopRatedFilmListView,
     TopRatedProductListView,
     UsaGrossFilmListView,
@@ -34,6 +35,11 @@ urlpatterns = [
     path("films/", FilmListView.as_view(), name="film-list"),
     path("news/", NewsListView.as_view(), name="news-list"),
     path("search/", SearchResultsView.as_view(), name="search-results"),
+    path(
+        "search/<slug:section>/",
+        SearchSectionListView.as_view(),
+        name="search-section",
+    ),
     path(
         "blu-ray-films/by-top-rated/",
         TopRatedProductListView.as_view(),
@@ -1,10 +1,13 @@
 import re
 
 from django.contrib import messages
+from django.http import Http404
 from django.shortcuts import (
     get_object_or_404,
     render,
 )
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
 from django.views.generic import (
     ListView,
     TemplateView,
@@ -20,20 +23,36 @@ from .forms import (
     UserCommentToPersonForm,
     UserCommentToProductForm,
 )
+from .hyperlinks import get_texts_hyperlinks
 from .models import (
     CinemaPerson,
+    Country,
+    Distributor,
     Film,
+    Genre,
+    Language,
     MpaaRating,
     News,
     Product,
 )
+from .pagination import (
+    CachedCountPaginator,
+    KeysetPaginationMixin,
+)
+from .references import (
+    get_reference,
+    get_reference_pk,
+)
 from .services import (
     get_cast_and_crew,
-    get_celebrity_news_id,
+    get_comments_page,
     get_filmography_and_extra_info,
     get_films_info,
     get_films_ratings_sets,
-    get_persons_info,
+    get_homepage_snapshot,
+    get_latest_comments,
+    get_person_info,
+    get_ranked_criteria,
 )
 
 DESCRIPTION_BLU_RAY = (
@@ -49,18 +68,20 @@ DESCRIPTION_NEWS = (
 )
 
 
-class ProductListView(ListView):
+class ProductListView(KeysetPaginationMixin, ListView):
     """Display page with list of blue-ray movies."""
 
     paginate_by = 8
     queryset = Product.products.order_by_name()
+    keyset_ordering = ("film__title", "film__pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        films_pk = [product.film_id for product in context["object_list"]]
         context.update(
             {
                 "page_title": "Movies on Blu-ray",
-                "films_cast_and_crew": get_cast_and_crew(),
+                "films_cast_and_crew": get_cast_and_crew(films_pk),
             }
         )
         return context
@@ -69,7 +90,7 @@ class ProductListView(ListView):
 class TopRatedProductListView(ProductListView):
     """Display page with list of top rated blue-ray movies."""
 
-    ordering = "-film__imdb_rating__value"
+    keyset_ordering = ("-film__imdb_rating_value", "-film__pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -80,7 +101,7 @@ class TopRatedProductListView(ProductListView):
 class NewReleasesProductListView(ProductListView):
     """Display page with list of new releases blue-ray movies."""
 
-    ordering = "-film__release_data"
+    keyset_ordering = ("-film__release_data", "-film__pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -96,9 +117,6 @@ class IndexView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        top_rated_products = Product.products.order_by_imdb_rating()
-        new_releases_products = Product.products.order_by_release_data()
-        news_list = News.objects.all()
         context.update(
             {
                 "page_title": "Latest Movie News, Movies on Blu-ray",
@@ -108,10 +126,7 @@ class IndexView(TemplateView):
                 "description_blu_ray": DESCRIPTION_BLU_RAY,
                 "title_top_rated": "Top Rated",
                 "title_new_releases": "New Releases",
-                "films_cast_and_crew": get_cast_and_crew(),
-                "news_list": news_list,
-                "new_releases_products": new_releases_products,
-                "top_rated_products": top_rated_products,
+                **get_homepage_snapshot(),
             }
         )
         return context
@@ -126,10 +141,11 @@ def product_detail(request, pk):
     """
     product_list = Product.products.all()
     product = get_object_or_404(product_list, pk=pk)
+    film_pk = product.film.pk
     context = {
         "product": product,
-        "film_info": get_films_info()[product.film.pk],
-        "film_cast_and_crew": get_cast_and_crew()[product.film.pk],
+        "film_info": get_films_info((film_pk,))[film_pk],
+        "film_cast_and_crew": get_cast_and_crew((film_pk,))[film_pk],
     }
     initial = {"product": product.pk}
     if request.user.is_authenticated:
@@ -143,29 +159,55 @@ def product_detail(request, pk):
         c_form = form_class(request.POST)
         if c_form.is_valid():
             c_form.save()
+            product.refresh_from_db(fields=["comments_count"])
             messages.add_message(request, messages.SUCCESS, "Comment added")
         else:
             form = c_form
             messages.add_message(request, messages.WARNING, "No Comment added")
 
     context["form"] = form
+    context["comments"] = get_comments_page(
+        product.commenttoproduct_set,
+        request.GET.get("comments_page"),
+        product.comments_count,
+    )
 
     return render(request, "cinema/product_detail.html", context)
 
 
-class FilmListView(ListView):
+class FilmListView(KeysetPaginationMixin, ListView):
     """Display page with list of movies."""
 
     paginate_by = 8
     queryset = Film.films.all()
+    keyset_ordering = ("title", "pk")
+    ranking_criterion = None
+
+    @cached_property
+    def is_ranked(self):
+        """Check if ranking of movies has been built for criterion of page."""
+        return self.ranking_criterion in get_ranked_criteria()
+
+    def get_queryset(self):
+        """Return movies in order of precomputed ranking, if it has been built
+        for criterion of page, otherwise sort them by ordering."""
+        if self.is_ranked:
+            return Film.films.order_by_ranking(self.ranking_criterion)
+        return super().get_queryset()
+
+    def get_keyset_ordering(self):
+        if self.is_ranked:
+            return ("rankings__position",)
+        return super().get_keyset_ordering()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        films_pk = [film.pk for film in context["object_list"]]
         context.update(
             {
                 "page_title": "Movies [A-Z]",
-                "films_info": get_films_info(),
-                "films_cast_and_crew": get_cast_and_crew(),
+                "films_info": get_films_info(films_pk),
+                "films_cast_and_crew": get_cast_and_crew(films_pk),
             }
         )
         return context
@@ -174,7 +216,8 @@ class FilmListView(ListView):
 class TopRatedFilmListView(FilmListView):
     """Display page with list of top rated movies."""
 
-    ordering = "-imdb_rating__value"
+    keyset_ordering = ("-imdb_rating_value", "-pk")
+    ranking_criterion = "imdb_rating"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -190,7 +233,8 @@ class TopRatedFilmListView(FilmListView):
 class BudgetFilmListView(FilmListView):
     """Display page with list of most expensive movies."""
 
-    ordering = "-budget"
+    keyset_ordering = ("-budget", "-pk")
+    ranking_criterion = "budget"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -203,7 +247,8 @@ class BudgetFilmListView(FilmListView):
 class UsaGrossFilmListView(FilmListView):
     """Display page with list of most USA grossing movies."""
 
-    ordering = "-usa_gross"
+    keyset_ordering = ("-usa_gross", "-pk")
+    ranking_criterion = "usa_gross"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -219,7 +264,8 @@ class UsaGrossFilmListView(FilmListView):
 class WorldGrossFilmListView(FilmListView):
     """Display page with list of most worldwide grossing movies."""
 
-    ordering = "-world_gross"
+    keyset_ordering = ("-world_gross", "-pk")
+    ranking_criterion = "world_gross"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -236,6 +282,8 @@ class YearFilmListView(FilmListView):
     """Display page with list of most popular movies, that are related to
     selected year by visitor."""
 
+    keyset_ordering = ("-imdb_rating_value", "-pk")
+
     def get_queryset(self):
         self.requested_year = self.kwargs.get("year")
         return Film.films.filter_by_selected_year(self.requested_year)
@@ -250,9 +298,13 @@ class GenreFilmListView(FilmListView):
     """Display page with list of most popular movies, that are related to
     selected genre by visitor."""
 
+    keyset_ordering = ("-imdb_rating_value", "-pk")
+
     def get_queryset(self):
         self.requested_genre = self.kwargs.get("genre")
-        return Film.films.filter_by_selected_genre(self.requested_genre)
+        return Film.films.filter_by_selected_genre(
+            get_reference_pk(Genre, self.requested_genre)
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -264,9 +316,13 @@ class CountryFilmListView(FilmListView):
     """Display page with list of most popular movies, that are related to
     selected country by visitor."""
 
+    keyset_ordering = ("-imdb_rating_value", "-pk")
+
     def get_queryset(self):
         self.requested_country = self.kwargs.get("country")
-        return Film.films.filter_by_selected_country(self.requested_country)
+        return Film.films.filter_by_selected_country(
+            get_reference_pk(Country, self.requested_country)
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -278,9 +334,13 @@ class LanguageFilmListView(FilmListView):
     """Display page with list of most popular movies, that are related to
     selected language by visitor."""
 
+    keyset_ordering = ("-imdb_rating_value", "-pk")
+
     def get_queryset(self):
         self.requested_language = self.kwargs.get("language")
-        return Film.films.filter_by_selected_language(self.requested_language)
+        return Film.films.filter_by_selected_language(
+            get_reference_pk(Language, self.requested_language)
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -294,10 +354,12 @@ class DistributorFilmListView(FilmListView):
     """Display page with list of most popular movies, that are related to
     selected distributor by visitor."""
 
+    keyset_ordering = ("-imdb_rating_value", "-pk")
+
     def get_queryset(self):
         self.requested_distributor = self.kwargs.get("distributor")
         return Film.films.filter_by_selected_distributor(
-            self.requested_distributor
+            get_reference_pk(Distributor, self.requested_distributor)
         )
 
     def get_context_data(self, **kwargs):
@@ -312,17 +374,21 @@ class MpaaFilmListView(FilmListView):
     """Display page with list of most popular movies, that are related to
     selected MPAA rating by visitor."""
 
+    keyset_ordering = ("-imdb_rating_value", "-pk")
+
     def get_queryset(self):
         self.requested_mpaa = self.kwargs.get("pk")
         return Film.films.filter_by_selected_mpaa_rating(self.requested_mpaa)
 
     def get_context_data(self, **kwargs):
-        mpaa = MpaaRating.objects.get(pk=self.requested_mpaa)
+        mpaa = get_reference(MpaaRating, self.requested_mpaa)
+        if mpaa is None:
+            raise Http404("MPAA rating does not exist.")
         context = super().get_context_data(**kwargs)
         context.update(
             {
-                "page_title": f"Most Popular Movies with MPAA Rating of {mpaa.value}",
-                "page_description": mpaa.description,
+                "page_title": f"Most Popular Movies with MPAA Rating of {mpaa['value']}",
+                "page_description": mpaa["description"],
             }
         )
         return context
@@ -339,8 +405,8 @@ def film_detail(request, pk):
     film = get_object_or_404(film_list, pk=pk)
     context = {
         "film": film,
-        "film_info": get_films_info()[pk],
-        "film_cast_and_crew": get_cast_and_crew()[pk],
+        "film_info": get_films_info((pk,))[pk],
+        "film_cast_and_crew": get_cast_and_crew((pk,))[pk],
     }
     initial = {"film": film.pk}
     if request.user.is_authenticated:
@@ -354,12 +420,18 @@ def film_detail(request, pk):
         c_form = form_class(request.POST)
         if c_form.is_valid():
             c_form.save()
+            film.refresh_from_db(fields=["comments_count"])
             messages.add_message(request, messages.SUCCESS, "Comment added")
         else:
             form = c_form
             messages.add_message(request, messages.WARNING, "No Comment added")
 
     context["form"] = form
+    context["comments"] = get_comments_page(
+        film.commenttofilm_set,
+        request.GET.get("comments_page"),
+        film.comments_count,
+    )
 
     return render(request, "cinema/film_detail.html", context)
 
@@ -382,7 +454,7 @@ def cinema_person_detail(request, pk):
 
     context = {
         "cinema_person": cinema_person,
-        "person_info": get_persons_info()[pk],
+        "person_info": get_person_info(cinema_person.pk),
         "person_professions": person_professions,
         "films_number": films_number,
         "films_years_range": films_years_range,
@@ -400,33 +472,63 @@ def cinema_person_detail(request, pk):
         c_form = form_class(request.POST)
         if c_form.is_valid():
             c_form.save()
+            cinema_person.refresh_from_db(fields=["comments_count"])
             messages.add_message(request, messages.SUCCESS, "Comment added")
         else:
             form = c_form
             messages.add_message(request, messages.WARNING, "No Comment added")
 
     context["form"] = form
+    context["comments"] = get_comments_page(
+        cinema_person.commenttoperson_set,
+        request.GET.get("comments_page"),
+        cinema_person.comments_count,
+    )
 
     return render(request, "cinema/cinema_person_detail.html", context)
 
 
-class NewsListView(ListView):
+class NewsListView(KeysetPaginationMixin, ListView):
     """Display page with list of latest cinema news."""
 
     model = News
     paginate_by = 5
+    keyset_ordering = ("-created_at", "-pk")
+    snippet_length = 350
+
+    def get_news_snippets(self, news_list):
+        """Get truncated descriptions of news with hyperlinks keyed by primary
+        keys of news.
+
+        Descriptions without stored hyperlinks are rendered together by
+        single matcher.
+        """
+        news_snippets = {}
+        unrendered_news = []
+        for news in news_list:
+            if news.description_html:
+                news_snippets[news.pk] = news.description_html
+            else:
+                unrendered_news.append(news)
+        news_snippets.update(
+            zip(
+                (news.pk for news in unrendered_news),
+                get_texts_hyperlinks(
+                    news.description for news in unrendered_news
+                ),
+            )
+        )
+        return {
+            pk: Truncator(snippet).chars(self.snippet_length, html=True)
+            for pk, snippet in news_snippets.items()
+        }
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context.update(
-            {
-                "page_title": "Latest Movie News",
-                "imdb_top_5": get_films_ratings_sets()["imdb_rating__value"],
-                "budget_top_5": get_films_ratings_sets()["budget"],
-                "usa_gross_top_5": get_films_ratings_sets()["usa_gross"],
-                "world_gross_top_5": get_films_ratings_sets()["world_gross"],
-            }
-        )
+        context["page_title"] = "Latest Movie News"
+        context["news_snippets"] = self.get_news_snippets(context["news_list"])
+        context.update(get_films_ratings_sets())
+        context["latest_comments"] = get_latest_comments()[0]
         return context
 
 
@@ -434,8 +536,7 @@ class CelebrityNewsListView(NewsListView):
     """Display page with list of latest cinema news about celebrities."""
 
     def get_queryset(self):
-        celebrity_news_id = get_celebrity_news_id()
-        return News.news.get_news_about_celebrities(celebrity_news_id)
+        return News.news.get_news_about_celebrities()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -453,10 +554,8 @@ def news_detail(request, pk):
     news = get_object_or_404(News, pk=pk)
     context = {
         "news": news,
-        "imdb_top_5": get_films_ratings_sets()["imdb_rating__value"],
-        "budget_top_5": get_films_ratings_sets()["budget"],
-        "usa_gross_top_5": get_films_ratings_sets()["usa_gross"],
-        "world_gross_top_5": get_films_ratings_sets()["world_gross"],
+        "latest_comments": get_latest_comments()[0],
+        **get_films_ratings_sets(),
     }
     initial = {"news": news.pk}
     if request.user.is_authenticated:
@@ -470,50 +569,102 @@ def news_detail(request, pk):
         c_form = form_class(request.POST)
         if c_form.is_valid():
             c_form.save()
+            news.refresh_from_db(fields=["comments_count"])
             messages.add_message(request, messages.SUCCESS, "Comment added")
         else:
             form = c_form
             messages.add_message(request, messages.WARNING, "No Comment added")
 
     context["form"] = form
+    context["comments"] = get_comments_page(
+        news.commenttonews_set,
+        request.GET.get("comments_page"),
+        news.comments_count,
+    )
 
     return render(request, "cinema/news_detail.html", context)
 
 
+SEARCH_SECTIONS = {
+    "product": Product.products.filter_by_search_word,
+    "film": Film.films.filter_by_search_word,
+    "person": CinemaPerson.persons.filter_by_search_word,
+    "news": News.news.filter_by_search_word,
+}
+
+
+def get_cleaned_search_word(request):
+    """Get search word entered by visitor without extra whitespaces."""
+    return re.sub(r"\s+", " ", request.GET.get("q", "").strip())
+
+
 class SearchResultsView(TemplateView):
-    """Displays page with search results for website."""
+    """Displays page with search results for website.
+
+    Only first results of every section are displayed, other results are
+    available on pages of sections. Number of results is counted up to
+    limit, so it does not depend on size of catalogue.
+    """
 
     template_name = "cinema/search_results.html"
+    results_limit = 10
+    count_limit = 100
 
     def get_context_data(self, **kwargs):
         context = {}
-        search_word = self.request.GET.get("q")
-        cleaned_search_word = re.sub(r"\s+", " ", search_word.strip())
+        search_word = self.request.GET.get("q", "")
+        cleaned_search_word = get_cleaned_search_word(self.request)
 
         if cleaned_search_word:
-            product_list = Product.products.filter_by_search_word(
-                cleaned_search_word
-            )
-            film_list = Film.films.filter_by_search_word(cleaned_search_word)
-            person_list = CinemaPerson.persons.filter_by_search_word(
-                cleaned_search_word
-            )
-            news_list = News.news.filter_by_search_word(cleaned_search_word)
-            context = {
-                "product_list": product_list,
-                "film_list": film_list,
-                "person_list": person_list,
-                "news_list": news_list,
-            }
+            for section, search in SEARCH_SECTIONS.items():
+                section_list = search(cleaned_search_word)
+                context[f"{section}_results"] = section_list[
+                    : self.results_limit
+                ]
+                context[f"{section}_count"] = section_list[
+                    : self.count_limit + 1
+                ].count()
         context.update(
             {
                 "search_title": "Search results for ",
                 "no_results": "No results found for ",
                 "search_word": search_word,
-                "imdb_top_5": get_films_ratings_sets()["imdb_rating__value"],
-                "budget_top_5": get_films_ratings_sets()["budget"],
-                "usa_gross_top_5": get_films_ratings_sets()["usa_gross"],
-                "world_gross_top_5": get_films_ratings_sets()["world_gross"],
+                "results_limit": self.results_limit,
+                "count_limit": self.count_limit,
+                "latest_comments": get_latest_comments()[0],
+                **get_films_ratings_sets(),
+            }
+        )
+        return context
+
+
+class SearchSectionListView(ListView):
+    """Display page with search results of one section of website.
+
+    Number of results is limited, so last pages of short search words do
+    not require reading of most of catalogue.
+    """
+
+    template_name = "cinema/search_section.html"
+    paginate_by = 10
+    paginator_class = CachedCountPaginator
+    results_limit = 100
+
+    def get_queryset(self):
+        search = SEARCH_SECTIONS.get(self.kwargs["section"])
+        if search is None:
+            raise Http404("Unknown section of search results.")
+        return search(get_cleaned_search_word(self.request))[
+            : self.results_limit
+        ]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(
+            {
+                "search_title": "Search results for ",
+                "search_word": self.request.GET.get("q", ""),
+                "section": self.kwargs["section"],
             }
         )
         return context
@@ -1,5 +1,9 @@
 import pytest
-from django.db.models.signals import post_save
+from django.db import connections
+from django.db.models.signals import (
+    post_save,
+    pre_migrate,
+)
 from pytest_factoryboy import register
 
 from accounts.models import user_registrated
@@ -8,6 +12,34 @@ from accounts.tests.factories import UserFactory
 register(UserFactory)
 
 
+def create_trigram_extension(sender, using, **kwargs):
+    """Create 'pg_trgm' extension of PostgreSQL needed by trigram indexes
+    before tables of applications are created."""
+    if sender.label == "accounts":
+        with connections[using].cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(request, django_db_use_migrations):
+    # Extension is created by migration, which is not applied with tables
+    # created by '--no-migrations' option
+    if not django_db_use_migrations:
+        pre_migrate.connect(create_trigram_extension)
+    try:
+        request.getfixturevalue("django_db_setup")
+    finally:
+        pre_migrate.disconnect(create_trigram_extension)
+
+
+@pytest.fixture(autouse=True)
+def local_memory_cache(settings):
+    # Tests don't share cache with running processes of website
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+
+
 @pytest.fixture(autouse=True)
 def mute_signals(request):
     post_save.receivers = []
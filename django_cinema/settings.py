@@ -15,6 +15,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Custom additional apps
     "django.contrib.humanize",
     "bootstrap4",
@@ -27,7 +28,7 @@ INSTALLED_APPS = [
     "django_extensions",
     "storages",
     # Custom main apps
-    "cinema",
+    "cinema.apps.CinemaConfig",
     "accounts",
     "api",
 ]
@@ -261,6 +262,33 @@ CORS_URLS_REGEX = r"^/api/.*$"
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_BACKEND")
 
+# Cache settings
+# Cache is shared by all web and celery processes, so versions of models
+# changed by any process are seen by others (tests use local memory cache)
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django_redis.cache.RedisCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "redis://redis:6379/1"),
+    }
+}
+# Lifetime (in seconds) of data cached by 'cinema.services' functions
+CINEMA_CACHE_TIMEOUT = int(os.environ.get("CINEMA_CACHE_TIMEOUT", 60 * 60))
+# Send changes of models to other nodes through redis, so they drop data
+# kept in memory of their processes. Bus is used only with cache kept in
+# memory of processes (LocMemCache), shared cache invalidates all nodes
+CINEMA_INVALIDATION_BUS = int(os.environ.get("CINEMA_INVALIDATION_BUS", 0))
+# Age (in days) of inactive comments, which are moved to archive by
+# 'archive_comments' management command
+CINEMA_COMMENTS_ARCHIVE_DAYS = int(
+    os.environ.get("CINEMA_COMMENTS_ARCHIVE_DAYS", 180)
+)
+# Number of users notified about new movie on blu-ray by single celery task
+CINEMA_NOTIFICATION_CHUNK_SIZE = int(
+    os.environ.get("CINEMA_NOTIFICATION_CHUNK_SIZE", 500)
+)
+
 GRAPH_MODELS = {
     "all_applications": True,
     "group_models": True,
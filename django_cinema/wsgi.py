@@ -5,3 +5,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_cinema.settings")
 
 application = get_wsgi_application()
+
+# Listener of invalidation bus is started in web processes only, after
+# applications are loaded
+from cinema.bus import (  # noqa: E402 pylint: disable=wrong-import-position
+    start_invalidation_listener,
+)
+
+start_invalidation_listener()